@@ -0,0 +1,250 @@
+"""Content-addressed cache for LLM results."""
+from app.core.config import settings
+from collections import OrderedDict
+from datetime import date, datetime
+from typing import Any, Dict, Optional, Tuple
+import hashlib
+import json
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Placeholder values that mean "no data" and must hash the same as a missing key
+_EMPTY_VALUES = {"", "not provided", "none", "null"}
+
+
+def normalize_inputs(inputs: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Normalize prompt inputs so equivalent events share a cache key.
+
+    Strings are whitespace-collapsed and case-folded, dates become ISO strings
+    and empty placeholders collapse to None.
+    """
+    normalized = {}
+    for key in sorted(inputs):
+        value = inputs[key]
+        if isinstance(value, (date, datetime)):
+            value = value.isoformat()
+        elif hasattr(value, "value"):
+            # Enum members from pydantic schemas
+            value = value.value
+        if isinstance(value, str):
+            value = " ".join(value.split()).casefold()
+            if value in _EMPTY_VALUES:
+                value = None
+        normalized[key] = value
+    return normalized
+
+
+class MemoryCacheBackend:
+    """In-process LRU cache with per-entry TTL."""
+
+    name = "memory"
+
+    def __init__(self, max_entries: int):
+        """Initialize an empty cache holding at most max_entries items."""
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the stored value, or None when absent or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str, ttl: int) -> None:
+        """Store a value, evicting the least recently used entry when full."""
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    async def aget(self, key: str) -> Optional[str]:
+        """Async accessor; the in-process backend never blocks."""
+        return self.get(key)
+
+    async def aset(self, key: str, value: str, ttl: int) -> None:
+        """Async setter; the in-process backend never blocks."""
+        self.set(key, value, ttl)
+
+    def size(self) -> int:
+        """Number of live and not-yet-purged entries."""
+        return len(self._entries)
+
+
+class RedisCacheBackend:
+    """
+    Cache backend on the shared Redis instance.
+
+    Entries expire natively via SETEX. LRU eviction is delegated to the server
+    (configure maxmemory-policy allkeys-lru or volatile-lru on the instance).
+    """
+
+    name = "redis"
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the stored value, or None when absent."""
+        from app.core.redis import get_redis
+        return get_redis().get(key)
+
+    def set(self, key: str, value: str, ttl: int) -> None:
+        """Store a value with a TTL."""
+        from app.core.redis import get_redis
+        get_redis().setex(key, ttl, value)
+
+    async def aget(self, key: str) -> Optional[str]:
+        """Return the stored value without blocking the event loop."""
+        from app.core.redis import get_async_redis
+        return await get_async_redis().get(key)
+
+    async def aset(self, key: str, value: str, ttl: int) -> None:
+        """Store a value with a TTL without blocking the event loop."""
+        from app.core.redis import get_async_redis
+        await get_async_redis().setex(key, ttl, value)
+
+    def size(self) -> Optional[int]:
+        """Entry count is not tracked per prefix on Redis."""
+        return None
+
+
+class LLMCache:
+    """
+    Cache for deterministic LLM results keyed on a hash of the prompt inputs.
+
+    Keys combine the method name, the normalized inputs, the model and the
+    temperature. Only successful completions are stored, never fallbacks.
+    Hit/miss counters and the latency of the completions that were avoided
+    are kept per method for monitoring.
+    """
+
+    def __init__(self, backend: Optional[Any], ttl: int):
+        """Initialize the cache; a None backend disables caching."""
+        self.backend = backend
+        self.ttl = ttl
+        self._stats: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        """Whether a backend is configured."""
+        return self.backend is not None
+
+    @staticmethod
+    def make_key(method: str, inputs: Dict[str, Any], model: str, temperature: float) -> str:
+        """Build a content-addressed key for a method call."""
+        payload = json.dumps(
+            {"inputs": normalize_inputs(inputs), "model": model, "temperature": temperature},
+            sort_keys=True,
+            default=str
+        )
+        digest = hashlib.sha256(payload.encode()).hexdigest()
+        return f"llm:{method}:{digest}"
+
+    def _record(self, method: str, hit: bool, saved_seconds: float = 0.0) -> None:
+        """Update per-method counters."""
+        with self._lock:
+            stats = self._stats.setdefault(method, {"hits": 0, "misses": 0, "saved_seconds": 0.0})
+            if hit:
+                stats["hits"] += 1
+                stats["saved_seconds"] += saved_seconds
+            else:
+                stats["misses"] += 1
+
+    @staticmethod
+    def _method_of(key: str) -> str:
+        """Extract the method name from a cache key."""
+        return key.split(":")[1]
+
+    def _decode(self, key: str, raw: Optional[str]) -> Optional[Any]:
+        """Decode a stored entry and record the lookup outcome."""
+        method = self._method_of(key)
+        if raw is None:
+            self._record(method, hit=False)
+            return None
+        entry = json.loads(raw)
+        self._record(method, hit=True, saved_seconds=entry.get("latency", 0.0))
+        return entry["value"]
+
+    def get(self, key: str) -> Optional[Any]:
+        """Look up a cached result."""
+        if not self.enabled:
+            return None
+        try:
+            raw = self.backend.get(key)
+        except Exception as e:
+            logger.warning(f"LLM cache read failed: {str(e)}")
+            raw = None
+        return self._decode(key, raw)
+
+    def set(self, key: str, value: Any, latency: float = 0.0) -> None:
+        """Store a result together with the latency it took to compute."""
+        if not self.enabled:
+            return
+        try:
+            self.backend.set(key, json.dumps({"value": value, "latency": latency}), self.ttl)
+        except Exception as e:
+            logger.warning(f"LLM cache write failed: {str(e)}")
+
+    async def aget(self, key: str) -> Optional[Any]:
+        """Async variant of get."""
+        if not self.enabled:
+            return None
+        try:
+            raw = await self.backend.aget(key)
+        except Exception as e:
+            logger.warning(f"LLM cache read failed: {str(e)}")
+            raw = None
+        return self._decode(key, raw)
+
+    async def aset(self, key: str, value: Any, latency: float = 0.0) -> None:
+        """Async variant of set."""
+        if not self.enabled:
+            return
+        try:
+            await self.backend.aset(key, json.dumps({"value": value, "latency": latency}), self.ttl)
+        except Exception as e:
+            logger.warning(f"LLM cache write failed: {str(e)}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and the LLM latency saved, per method and overall."""
+        with self._lock:
+            methods = {name: dict(values) for name, values in self._stats.items()}
+        hits = sum(m["hits"] for m in methods.values())
+        misses = sum(m["misses"] for m in methods.values())
+        for values in methods.values():
+            lookups = values["hits"] + values["misses"]
+            values["hit_rate"] = round(values["hits"] / lookups, 4) if lookups else 0.0
+        return {
+            "backend": self.backend.name if self.backend else "none",
+            "ttl_seconds": self.ttl,
+            "entries": self.backend.size() if self.backend else 0,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / (hits + misses), 4) if hits + misses else 0.0,
+            "saved_seconds": round(sum(m["saved_seconds"] for m in methods.values()), 3),
+            "methods": methods
+        }
+
+
+def _build_backend() -> Optional[Any]:
+    """Create the backend selected by settings.LLM_CACHE_BACKEND."""
+    if settings.LLM_CACHE_BACKEND == "redis":
+        return RedisCacheBackend()
+    if settings.LLM_CACHE_BACKEND == "memory":
+        return MemoryCacheBackend(settings.LLM_CACHE_MAX_ENTRIES)
+    return None
+
+
+# Global cache instance
+llm_cache = LLMCache(_build_backend(), settings.LLM_CACHE_TTL_SECONDS)
@@ -17,6 +17,7 @@ class Settings(BaseSettings):
     
     # Redis
     REDIS_URL: str = "redis://:redis_secure_2024@localhost:6379/0"
+    REDIS_SOCKET_TIMEOUT: float = 0.5  # Seconds; Redis is an accelerator, never a hard dependency
     
     # Security
     SECRET_KEY: str = "your-secret-key-change-in-production"
@@ -25,17 +26,82 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
     OTP_EXPIRE_MINUTES: int = 15
     OTP_LENGTH: int = 6
+    OTP_MAX_ATTEMPTS: int = 3  # Wrong codes accepted before a new OTP must be requested
+    OTP_STORE_BACKEND: str = "redis"  # 'redis' (native expiry; falls back to the database on errors) or 'database'
     
     # AI
     OPENAI_API_KEY: str = "sk-your-openai-api-key"
+    OPENAI_BASE_URL: str = ""  # Empty: api.openai.com; e.g. http://localhost:8100/v1 for the local stand-in
     OPENAI_MODEL: str = "gpt-4"
     OPENAI_TEMPERATURE: float = 0.3
+    OPENAI_JSON_MODE: bool = False  # Send response_format=json_object; needs gpt-4-turbo/gpt-4o or later
+    OPENAI_MAX_CONCURRENCY: int = 32  # In-flight completions allowed by the async AI service
+    OPENAI_TIMEOUT_SECONDS: float = 20.0  # Upper bound for a single attempt
+    OPENAI_DEADLINE_SECONDS: float = 30.0  # Budget for all attempts of one call, backoff included
+    OPENAI_RISK_DEADLINE_SECONDS: float = 8.0  # Tighter budget for risk scoring and triage
+    OPENAI_MAX_RETRIES: int = 2
+    OPENAI_RETRY_BASE_DELAY: float = 0.5  # Seconds; full-jitter exponential backoff
+    OPENAI_BREAKER_FAILURE_THRESHOLD: int = 5  # Consecutive failures before the circuit opens
+    OPENAI_BREAKER_RESET_SECONDS: float = 30.0  # Open time before a trial call is let through
+    OPENAI_HEDGE_RISK: bool = False  # Send a second risk request when the first is slow
+    OPENAI_HEDGE_DELAY_SECONDS: float = 2.0
+    
+    # Follow-up question library
+    QUESTION_LIBRARY_ENABLED: bool = True
+    QUESTION_LIBRARY_PATH: str = ""  # Empty: latest bundled app/data/followup_questions/vN.json
+    
+    # LLM result cache
+    LLM_CACHE_BACKEND: str = "memory"  # 'memory', 'redis' or 'none'
+    LLM_CACHE_TTL_SECONDS: int = 86400
+    LLM_CACHE_MAX_ENTRIES: int = 10000  # In-process backend only
+    
+    # Risk scoring
+    RISK_SCORING_MODE: str = "hybrid"  # 'llm', 'local' or 'hybrid' (local when confident, LLM otherwise)
+    RISK_RESCORE_BATCH_SIZE: int = 5000
+    
+    # Background AI enrichment queue
+    ENRICHMENT_WORKERS: int = 4  # Worker tasks per API process; 0 to run them only via scripts/run_enrichment_workers.py
+    ENRICHMENT_POLL_SECONDS: float = 1.0  # Idle wait between claims when the queue is empty
+    ENRICHMENT_MAX_ATTEMPTS: int = 5
+    ENRICHMENT_RETRY_BASE_SECONDS: float = 5.0  # Exponential backoff between attempts
+    ENRICHMENT_JOB_TIMEOUT_SECONDS: int = 300  # Running jobs older than this are requeued
+    
+    # Bulk intake
+    BULK_INGEST_CHUNK_SIZE: int = 1000  # Records validated and inserted per transaction
+    
+    # E2B(R3) exchange
+    E2B_EXPORT_BATCH_SIZE: int = 1000  # Rows fetched per server-side cursor batch
+    E2B_SENDER_ID: str = "PVFOLLOWUP"  # N.1.3 batch sender identifier
+    E2B_RECEIVER_ID: str = "EVHUMAN"  # N.1.4 batch receiver identifier
+    
+    # Dashboard trend rollups
+    ROLLUP_INTERVAL_SECONDS: int = 300  # How often the API refreshes rollups; 0 disables the job
+    ROLLUP_LOOKBACK_HOURS: int = 48  # Recent buckets recomputed each run (late risk scores and answers)
+    TRENDS_MAX_POINTS: int = 2000  # Largest range a single trends request may cover
+    
+    # Disproportionality signal detection
+    SIGNAL_CACHE_SECONDS: int = 60  # How long a computed contingency table is reused
+    
+    # Drug / adverse-effect terminology
+    TERMINOLOGY_PATH: str = ""  # Empty: bundled app/data/terminology.json
+    TERMINOLOGY_CHECK_SECONDS: int = 30  # How often the dictionary file is checked for changes; 0 disables
+    
+    # Near-duplicate detection at intake
+    DUPLICATE_DETECTION_ENABLED: bool = True
+    DUPLICATE_THRESHOLD: float = 0.7  # Estimated Jaccard similarity at which a report is flagged
+    DUPLICATE_WINDOW_DAYS: int = 30  # How far back a report is compared
+    
+    # Single-flight coalescing of concurrent recomputations
+    SINGLE_FLIGHT_BACKEND: str = "redis"  # 'redis' (across workers) or 'memory' (per process)
+    SINGLE_FLIGHT_LOCK_TTL_SECONDS: float = 30.0
+    SINGLE_FLIGHT_RESULT_TTL_SECONDS: float = 10.0
     
     # Communication APIs
     WHATSAPP_API_KEY: str = "mock"
     TWILIO_ACCOUNT_SID: str = "mock"
     TWILIO_AUTH_TOKEN: str = "mock"
     TWILIO_PHONE_NUMBER: str = "+1234567890"
+    TWILIO_API_BASE_URL: str = ""  # Empty: api.twilio.com; e.g. http://localhost:8200 for the local stand-in
     
     # Email
     SMTP_HOST: str = "smtp.gmail.com"
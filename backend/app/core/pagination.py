@@ -0,0 +1,31 @@
+"""Opaque cursors for keyset pagination."""
+from datetime import datetime
+from typing import Any, List
+import base64
+import json
+
+
+def encode_cursor(*values: Any) -> str:
+    """Encode the sort key of the last row of a page (datetimes as ISO strings)."""
+    payload = [value.isoformat() if isinstance(value, datetime) else value for value in values]
+    return base64.urlsafe_b64encode(json.dumps(payload, separators=(",", ":")).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, *types: type) -> List[Any]:
+    """
+    Decode a cursor made by encode_cursor.
+
+    Args:
+        cursor: The cursor
+        types: Expected type of each value (datetime, float, int or str)
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if not isinstance(values, list) or len(values) != len(types):
+            raise ValueError
+        return [datetime.fromisoformat(value) if kind is datetime else kind(value) for kind, value in zip(types, values)]
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
@@ -0,0 +1,33 @@
+"""Shared Redis connections."""
+from app.core.config import settings
+import redis
+import redis.asyncio as aioredis
+
+_client = None
+_async_client = None
+
+
+def get_redis() -> redis.Redis:
+    """Get the process-wide synchronous Redis client."""
+    global _client
+    if _client is None:
+        _client = redis.Redis.from_url(
+            settings.REDIS_URL,
+            socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+            socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT,
+            decode_responses=True
+        )
+    return _client
+
+
+def get_async_redis() -> aioredis.Redis:
+    """Get the process-wide asyncio Redis client."""
+    global _async_client
+    if _async_client is None:
+        _async_client = aioredis.Redis.from_url(
+            settings.REDIS_URL,
+            socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+            socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT,
+            decode_responses=True
+        )
+    return _async_client
@@ -0,0 +1,278 @@
+"""Circuit breaker, deadlines, jittered retries and hedging for upstream calls."""
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, Type
+import asyncio
+import logging
+import random
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream whose circuit breaker is open."""
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when a call's deadline runs out before an attempt succeeds."""
+
+
+class CircuitBreaker:
+    """
+    Thread-safe three-state circuit breaker.
+
+    Closed: calls pass and consecutive failures are counted. After
+    failure_threshold failures the breaker opens and rejects calls at once.
+    After reset_timeout seconds it lets one trial call through (half-open);
+    success closes it again, failure reopens it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        """Initialize a closed breaker."""
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._trial_started = 0.0
+        self._rejected = 0
+        self._times_opened = 0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """Current state, moving open to half-open once the reset timeout has passed."""
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self._state = self.HALF_OPEN
+            self._trial_in_flight = False
+        return self._state
+
+    def before_call(self) -> None:
+        """
+        Admit a call or reject it.
+
+        Raises:
+            CircuitOpenError: If the breaker is open, or half-open with a trial already running
+        """
+        with self._lock:
+            state = self._current_state()
+            if state == self.CLOSED:
+                return
+            # A trial abandoned without an outcome (e.g. a cancelled stream) expires
+            trial_expired = time.monotonic() - self._trial_started >= self.reset_timeout
+            if state == self.HALF_OPEN and (not self._trial_in_flight or trial_expired):
+                self._trial_in_flight = True
+                self._trial_started = time.monotonic()
+                return
+            self._rejected += 1
+        raise CircuitOpenError(f"Circuit '{self.name}' is open")
+
+    def record_success(self) -> None:
+        """Close the breaker and reset the failure count."""
+        with self._lock:
+            if self._state != self.CLOSED:
+                logger.info(f"Circuit '{self.name}' closed")
+            self._state = self.CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        """Count a failure and open the breaker when the threshold is reached."""
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    self._times_opened += 1
+                    logger.warning(f"Circuit '{self.name}' opened after {self._failures} consecutive failures")
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._trial_in_flight = False
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the breaker state and counters for monitoring."""
+        with self._lock:
+            state = self._current_state()
+            retry_in = max(0.0, self.reset_timeout - (time.monotonic() - self._opened_at)) if state == self.OPEN else 0.0
+            return {
+                "name": self.name,
+                "state": state,
+                "consecutive_failures": self._failures,
+                "failure_threshold": self.failure_threshold,
+                "times_opened": self._times_opened,
+                "rejected_calls": self._rejected,
+                "retry_in_seconds": round(retry_in, 1)
+            }
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """Full-jitter exponential backoff: uniform in [0, min(cap, base * 2^attempt)]."""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class RetryPolicy:
+    """
+    Deadline and bounded retries shared by every call through a breaker.
+
+    Args:
+        breaker: Circuit breaker guarding the upstream
+        max_retries: Retries after the first attempt
+        attempt_timeout: Upper bound for a single attempt, in seconds
+        deadline: Total budget for all attempts and backoff, in seconds
+        base_delay: Base of the jittered exponential backoff
+        max_delay: Cap of a single backoff sleep
+        retryable: Exception types worth another attempt; others fail at once
+    """
+
+    def __init__(
+        self,
+        breaker: CircuitBreaker,
+        max_retries: int,
+        attempt_timeout: float,
+        deadline: float,
+        base_delay: float = 0.5,
+        max_delay: float = 4.0,
+        retryable: Tuple[Type[BaseException], ...] = (Exception,)
+    ):
+        """Initialize the policy."""
+        self.breaker = breaker
+        self.max_retries = max_retries
+        self.attempt_timeout = attempt_timeout
+        self.deadline = deadline
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retryable = retryable
+
+    def _attempt_budget(self, expires_at: float) -> float:
+        """Timeout for the next attempt, or raise if the deadline is spent."""
+        remaining = expires_at - time.monotonic()
+        if remaining <= 0:
+            raise DeadlineExceeded(f"Deadline exceeded calling '{self.breaker.name}'")
+        return min(self.attempt_timeout, remaining)
+
+    def _record_error(self, error: BaseException) -> None:
+        """Only transient errors count against the breaker; the upstream answered the rest."""
+        if isinstance(error, self.retryable):
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+
+    def _next_delay(self, attempt: int, error: BaseException, expires_at: float) -> Optional[float]:
+        """Backoff before the next attempt, or None when the error should propagate."""
+        if not isinstance(error, self.retryable) or attempt >= self.max_retries:
+            return None
+        if self.breaker.state != CircuitBreaker.CLOSED:
+            return None
+        delay = backoff_delay(attempt, self.base_delay, self.max_delay)
+        if time.monotonic() + delay >= expires_at:
+            return None
+        logger.warning(f"Retrying '{self.breaker.name}' in {delay:.2f}s after {type(error).__name__}")
+        return delay
+
+    def call(self, fn: Callable[[float], Any], deadline: Optional[float] = None) -> Any:
+        """
+        Call fn(timeout) under the breaker, deadline and retry policy.
+
+        Args:
+            fn: Callable taking the per-attempt timeout in seconds
+            deadline: Overrides the policy's total budget for this call
+
+        Returns:
+            The first successful result of fn
+        """
+        expires_at = time.monotonic() + (deadline or self.deadline)
+        attempt = 0
+        while True:
+            timeout = self._attempt_budget(expires_at)
+            self.breaker.before_call()
+            try:
+                result = fn(timeout)
+            except Exception as e:
+                self._record_error(e)
+                delay = self._next_delay(attempt, e, expires_at)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                attempt += 1
+                continue
+            self.breaker.record_success()
+            return result
+
+    async def acall(
+        self,
+        fn: Callable[[float], Awaitable[Any]],
+        deadline: Optional[float] = None,
+        hedge_after: Optional[float] = None
+    ) -> Any:
+        """
+        Async variant of call, optionally hedging each attempt.
+
+        Args:
+            fn: Coroutine function taking the per-attempt timeout in seconds
+            deadline: Overrides the policy's total budget for this call
+            hedge_after: Start a second identical request if the first has not
+                finished after this many seconds; the first result wins
+
+        Returns:
+            The first successful result of fn
+        """
+        expires_at = time.monotonic() + (deadline or self.deadline)
+        attempt = 0
+        while True:
+            timeout = self._attempt_budget(expires_at)
+            self.breaker.before_call()
+            try:
+                if hedge_after is not None and hedge_after < timeout:
+                    result = await asyncio.wait_for(hedged(fn, timeout, hedge_after), timeout)
+                else:
+                    result = await asyncio.wait_for(fn(timeout), timeout)
+            except Exception as e:
+                self._record_error(e)
+                delay = self._next_delay(attempt, e, expires_at)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                attempt += 1
+                continue
+            self.breaker.record_success()
+            return result
+
+
+async def hedged(fn: Callable[[float], Awaitable[Any]], timeout: float, hedge_after: float) -> Any:
+    """
+    Run fn(timeout) and, if it is still pending after hedge_after seconds,
+    a second copy; return the first success and cancel the other.
+
+    Raises the last error only when both requests fail.
+    """
+    primary = asyncio.ensure_future(fn(timeout))
+    tasks = [primary]
+    error: Optional[BaseException] = None
+    try:
+        done, _ = await asyncio.wait({primary}, timeout=hedge_after)
+        if done:
+            return primary.result()
+
+        tasks.append(asyncio.ensure_future(fn(max(timeout - hedge_after, 0.001))))
+        pending = set(tasks)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                error = task.exception()
+        raise error
+    finally:
+        # Also reached when the caller is cancelled or times out mid-wait
+        for task in tasks:
+            if not task.done():
+                task.cancel()
@@ -0,0 +1,156 @@
+"""Single-flight coalescing of identical concurrent computations."""
+from app.core.config import settings
+from app.core.redis import get_async_redis
+from typing import Any, Awaitable, Callable, Dict
+import asyncio
+import json
+import logging
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+# Delete the lock only if we still own it
+_RELEASE_LOCK = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+class _LeaderCancelled(Exception):
+    """Set on the shared future when the leading caller was cancelled."""
+
+
+class SingleFlight:
+    """
+    Run one computation per key at a time and share its result.
+
+    Within a process, concurrent callers for a key await the first caller's
+    future. With the Redis backend, the in-process leader also takes a
+    short-lived Redis lock so leaders in other uvicorn workers wait for the
+    result it publishes instead of computing their own. Redis errors
+    degrade to in-process coalescing only.
+
+    Results must be JSON-serializable.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        backend: str = "memory",
+        lock_ttl: float = 30.0,
+        result_ttl: float = 10.0,
+        poll_interval: float = 0.05
+    ):
+        """
+        Initialize the group.
+
+        Args:
+            namespace: Prefix for Redis keys
+            backend: 'redis' to coordinate across processes, 'memory' for in-process only
+            lock_ttl: Seconds before an abandoned Redis lock expires
+            result_ttl: Seconds a published result stays readable by waiting workers
+            poll_interval: Seconds between checks while another worker computes
+        """
+        self.namespace = namespace
+        self.backend = backend
+        self.lock_ttl = lock_ttl
+        self.result_ttl = result_ttl
+        self.poll_interval = poll_interval
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.stats = {"leaders": 0, "local_waiters": 0, "remote_waiters": 0}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Return fn()'s result, sharing it with every concurrent caller for key.
+
+        Args:
+            key: Identity of the computation (e.g. event id and input hash)
+            fn: Coroutine function performing the computation
+
+        Returns:
+            The result of the single in-flight computation
+        """
+        while key in self._inflight:
+            self.stats["local_waiters"] += 1
+            try:
+                return await asyncio.shield(self._inflight[key])
+            except _LeaderCancelled:
+                # The leader went away; the next caller in line takes over
+                continue
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        self.stats["leaders"] += 1
+        try:
+            if self.backend == "redis":
+                result = await self._run_distributed(key, fn)
+            else:
+                result = await fn()
+        except asyncio.CancelledError:
+            future.set_exception(_LeaderCancelled())
+            future.exception()  # Mark retrieved when nobody is waiting
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._inflight[key]
+
+    async def _run_distributed(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Coordinate with other processes through a Redis lock and result key."""
+        lock_key = f"sf:{self.namespace}:lock:{key}"
+        result_key = f"sf:{self.namespace}:result:{key}"
+        token = uuid.uuid4().hex
+        deadline = time.monotonic() + self.lock_ttl
+        locked = False
+
+        # Only the Redis calls are guarded; fn() runs once, outside the try
+        try:
+            redis = get_async_redis()
+            while True:
+                raw = await redis.get(result_key)
+                if raw is not None:
+                    self.stats["remote_waiters"] += 1
+                    return json.loads(raw)
+                if await redis.set(lock_key, token, nx=True, px=int(self.lock_ttl * 1000)):
+                    locked = True
+                    break
+                if time.monotonic() >= deadline:
+                    logger.warning(f"Single-flight wait for {key} timed out; computing locally")
+                    break
+                await asyncio.sleep(self.poll_interval)
+        except Exception as e:
+            logger.warning(f"Single-flight Redis coordination failed: {str(e)}")
+            return await fn()
+
+        if not locked:
+            return await fn()
+
+        try:
+            result = await fn()
+            try:
+                await redis.set(result_key, json.dumps(result, default=str), px=int(self.result_ttl * 1000))
+            except Exception as e:
+                logger.warning(f"Single-flight result publish failed: {str(e)}")
+            return result
+        finally:
+            try:
+                await redis.eval(_RELEASE_LOCK, 1, lock_key, token)
+            except Exception as e:
+                logger.warning(f"Single-flight lock release failed: {str(e)}")
+
+
+# Coalesces concurrent risk recomputations of the same event revision
+risk_singleflight = SingleFlight(
+    "risk",
+    backend=settings.SINGLE_FLIGHT_BACKEND,
+    lock_ttl=settings.SINGLE_FLIGHT_LOCK_TTL_SECONDS,
+    result_ttl=settings.SINGLE_FLIGHT_RESULT_TTL_SECONDS
+)
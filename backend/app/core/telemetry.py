@@ -0,0 +1,263 @@
+"""In-process telemetry for LLM calls: latency, tokens, cost and failure rates."""
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Tuple
+import bisect
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 15.0, 30.0, 60.0)
+
+# USD per 1K (prompt, completion) tokens; matched by longest model-name prefix
+MODEL_PRICES = {
+    "gpt-4": (0.03, 0.06),
+    "gpt-4-32k": (0.06, 0.12),
+    "gpt-4-turbo": (0.01, 0.03),
+    "gpt-4-1106-preview": (0.01, 0.03),
+    "gpt-4-0125-preview": (0.01, 0.03),
+    "gpt-4o": (0.005, 0.015),
+    "gpt-4o-mini": (0.00015, 0.0006),
+    "gpt-3.5-turbo": (0.0005, 0.0015)
+}
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    """Estimate the USD cost of a call from the price table; unknown models cost 0."""
+    matches = [name for name in MODEL_PRICES if model.startswith(name)]
+    if not matches:
+        return 0.0
+    prompt_price, completion_price = MODEL_PRICES[max(matches, key=len)]
+    return (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1000
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram (cumulative on export, like Prometheus)."""
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        """Initialize empty buckets."""
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, seconds: float) -> None:
+        """Record one observation."""
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.total += seconds
+        self.count += 1
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        """Return (le, cumulative count) pairs including +Inf."""
+        result, running = [], 0
+        for bound, count in zip([str(b) for b in self.buckets] + ["+Inf"], self.counts):
+            running += count
+            result.append((bound, running))
+        return result
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Approximate a quantile as the upper bound of the bucket that holds it."""
+        if not self.count:
+            return None
+        rank, running = q * self.count, 0
+        for bound, count in zip(self.buckets, self.counts):
+            running += count
+            if running >= rank:
+                return bound
+        return float("inf")
+
+
+class MethodStats:
+    """Counters for one (method, model) pair."""
+
+    def __init__(self):
+        """Initialize zeroed counters."""
+        self.latency = LatencyHistogram()
+        self.outcomes: Dict[str, int] = {}
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.cost = 0.0
+        self.parse_failures = 0
+        self.fallbacks = 0
+
+    @property
+    def calls(self) -> int:
+        return sum(self.outcomes.values())
+
+
+class RequestUsage:
+    """LLM usage accumulated while serving one HTTP request."""
+
+    def __init__(self):
+        """Initialize zeroed totals."""
+        self.calls = 0
+        self.latency = 0.0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.cost = 0.0
+        self.fallbacks = 0
+        self.methods: List[str] = []
+
+    def headers(self) -> Dict[str, str]:
+        """Summarize the usage as response headers."""
+        return {
+            "X-AI-Calls": str(self.calls),
+            "X-AI-Latency-Ms": str(round(self.latency * 1000)),
+            "X-AI-Tokens": f"{self.prompt_tokens}+{self.completion_tokens}",
+            "X-AI-Cost-USD": f"{self.cost:.5f}",
+            "X-AI-Fallbacks": str(self.fallbacks)
+        }
+
+
+_request_usage: ContextVar[Optional[RequestUsage]] = ContextVar("ai_request_usage", default=None)
+
+
+class AITelemetry:
+    """
+    Thread-safe registry of LLM call metrics keyed by (method, model).
+
+    AIService and AsyncAIService report every completion here. Totals are
+    exported as Prometheus text and as a JSON snapshot; calls made while a
+    request is being served are also added to that request's RequestUsage.
+    """
+
+    def __init__(self):
+        """Initialize an empty registry."""
+        self._stats: Dict[Tuple[str, str], MethodStats] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, method: str, model: str) -> MethodStats:
+        key = (method, model)
+        if key not in self._stats:
+            self._stats[key] = MethodStats()
+        return self._stats[key]
+
+    def record_call(
+        self,
+        method: str,
+        model: str,
+        latency: float,
+        outcome: str = "ok",
+        prompt_tokens: int = 0,
+        completion_tokens: int = 0
+    ) -> None:
+        """
+        Record one model call.
+
+        Args:
+            method: AI service method that made the call
+            model: Model name
+            latency: Wall time including retries, in seconds
+            outcome: 'ok' or the error class name
+            prompt_tokens: Prompt tokens billed
+            completion_tokens: Completion tokens billed
+        """
+        cost = estimate_cost(model, prompt_tokens, completion_tokens)
+        with self._lock:
+            stats = self._get(method, model)
+            stats.latency.observe(latency)
+            stats.outcomes[outcome] = stats.outcomes.get(outcome, 0) + 1
+            stats.prompt_tokens += prompt_tokens
+            stats.completion_tokens += completion_tokens
+            stats.cost += cost
+
+        usage = _request_usage.get()
+        if usage is not None:
+            usage.calls += 1
+            usage.latency += latency
+            usage.prompt_tokens += prompt_tokens
+            usage.completion_tokens += completion_tokens
+            usage.cost += cost
+            usage.methods.append(method)
+
+    def record_fallback(self, method: str, model: str, parse_failure: bool = False) -> None:
+        """Record that a method returned its fallback, and whether the reply failed to parse."""
+        with self._lock:
+            stats = self._get(method, model)
+            stats.fallbacks += 1
+            if parse_failure:
+                stats.parse_failures += 1
+
+        usage = _request_usage.get()
+        if usage is not None:
+            usage.fallbacks += 1
+
+    def begin_request(self) -> Tuple[RequestUsage, Any]:
+        """Start collecting usage for the current request; returns (usage, reset token)."""
+        usage = RequestUsage()
+        return usage, _request_usage.set(usage)
+
+    def end_request(self, token: Any) -> None:
+        """Stop collecting usage for the current request."""
+        _request_usage.reset(token)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return per-method metrics and totals as JSON-friendly data."""
+        methods = []
+        totals = {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "estimated_cost_usd": 0.0}
+        with self._lock:
+            for (method, model), stats in sorted(self._stats.items()):
+                calls = stats.calls
+                ok = stats.outcomes.get("ok", 0)
+                methods.append({
+                    "method": method,
+                    "model": model,
+                    "calls": calls,
+                    "outcomes": dict(stats.outcomes),
+                    "latency_seconds": {
+                        "mean": round(stats.latency.total / stats.latency.count, 3) if stats.latency.count else None,
+                        "p50": stats.latency.quantile(0.5),
+                        "p95": stats.latency.quantile(0.95),
+                        "p99": stats.latency.quantile(0.99)
+                    },
+                    "prompt_tokens": stats.prompt_tokens,
+                    "completion_tokens": stats.completion_tokens,
+                    "estimated_cost_usd": round(stats.cost, 4),
+                    "parse_failure_rate": round(stats.parse_failures / ok, 4) if ok else 0.0,
+                    "fallback_rate": round(stats.fallbacks / calls, 4) if calls else 0.0
+                })
+                totals["calls"] += calls
+                totals["prompt_tokens"] += stats.prompt_tokens
+                totals["completion_tokens"] += stats.completion_tokens
+                totals["estimated_cost_usd"] += stats.cost
+        totals["estimated_cost_usd"] = round(totals["estimated_cost_usd"], 4)
+        return {"totals": totals, "methods": methods}
+
+    def render_prometheus(self) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        lines = [
+            "# HELP ai_llm_call_duration_seconds LLM call latency including retries",
+            "# TYPE ai_llm_call_duration_seconds histogram"
+        ]
+        calls, tokens, cost, parse_failures, fallbacks = [], [], [], [], []
+        with self._lock:
+            for (method, model), stats in sorted(self._stats.items()):
+                labels = f'method="{method}",model="{model}"'
+                for bound, count in stats.latency.cumulative():
+                    lines.append(f'ai_llm_call_duration_seconds_bucket{{{labels},le="{bound}"}} {count}')
+                lines.append(f"ai_llm_call_duration_seconds_sum{{{labels}}} {stats.latency.total:.6f}")
+                lines.append(f"ai_llm_call_duration_seconds_count{{{labels}}} {stats.latency.count}")
+                for outcome, count in sorted(stats.outcomes.items()):
+                    calls.append(f'ai_llm_calls_total{{{labels},outcome="{outcome}"}} {count}')
+                tokens.append(f'ai_llm_tokens_total{{{labels},type="prompt"}} {stats.prompt_tokens}')
+                tokens.append(f'ai_llm_tokens_total{{{labels},type="completion"}} {stats.completion_tokens}')
+                cost.append(f"ai_llm_cost_usd_total{{{labels}}} {stats.cost:.6f}")
+                parse_failures.append(f"ai_llm_parse_failures_total{{{labels}}} {stats.parse_failures}")
+                fallbacks.append(f"ai_llm_fallbacks_total{{{labels}}} {stats.fallbacks}")
+
+        for name, kind, help_text, samples in (
+            ("ai_llm_calls_total", "counter", "LLM calls by outcome", calls),
+            ("ai_llm_tokens_total", "counter", "Prompt and completion tokens", tokens),
+            ("ai_llm_cost_usd_total", "counter", "Estimated spend in USD", cost),
+            ("ai_llm_parse_failures_total", "counter", "Replies that were not valid JSON", parse_failures),
+            ("ai_llm_fallbacks_total", "counter", "Calls answered with a fallback result", fallbacks)
+        ):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.extend(samples)
+        return "\n".join(lines) + "\n"
+
+
+# Export singleton instance
+ai_telemetry = AITelemetry()
@@ -1,15 +1,29 @@
 """Main FastAPI application entry point."""
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from app.core.config import settings
 from app.core.database import engine, Base
+from app.core.resilience import CircuitBreaker
+from app.core.telemetry import ai_telemetry
 from app.routes import (
     otp_router,
     report_router,
     followup_router,
     risk_router,
-    dashboard_router
+    dashboard_router,
+    signals_router,
+    terminology_router,
+    search_router,
+    events_router
 )
+from app.services.ai_service import openai_breaker
+from app.services.duplicate_service import duplicate_service
+from app.services.enrichment_service import enrichment_service
+from app.services.rollup_service import rollup_service
+from app.services.question_library import question_library
+from app.services.terminology_service import terminology_service
 import logging
 
 # Configure logging
@@ -22,13 +36,33 @@ logger = logging.getLogger(__name__)
 # Create database tables
 Base.metadata.create_all(bind=engine)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Warm in-memory indexes and start background workers before serving requests."""
+    if settings.QUESTION_LIBRARY_ENABLED:
+        question_library.load()
+    terminology_service.load()
+    if settings.ENRICHMENT_WORKERS > 0:
+        enrichment_service.start(settings.ENRICHMENT_WORKERS)
+    if settings.ROLLUP_INTERVAL_SECONDS > 0:
+        rollup_service.start()
+    if settings.DUPLICATE_DETECTION_ENABLED:
+        duplicate_service.start()
+    yield
+    await duplicate_service.stop()
+    await rollup_service.stop()
+    await enrichment_service.stop()
+
+
 # Initialize FastAPI app
 app = FastAPI(
     title=settings.APP_NAME,
     description="Real-time, secure, multilingual, fraud-proof, OTP-verified, AI-automated adverse-event follow-up system",
     version="1.0.0",
     docs_url="/api/docs",
-    redoc_url="/api/redoc"
+    redoc_url="/api/redoc",
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -40,12 +74,36 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+
+@app.middleware("http")
+async def ai_usage_summary(request: Request, call_next):
+    """Attach a summary of the LLM calls made while serving a request."""
+    usage, token = ai_telemetry.begin_request()
+    try:
+        response = await call_next(request)
+    finally:
+        ai_telemetry.end_request(token)
+    if usage.calls:
+        response.headers.update(usage.headers())
+        logger.info(
+            f"{request.method} {request.url.path}: {usage.calls} AI calls ({', '.join(usage.methods)}), "
+            f"{round(usage.latency * 1000)} ms, {usage.prompt_tokens}+{usage.completion_tokens} tokens, "
+            f"${usage.cost:.4f}"
+        )
+    return response
+
+
 # Include routers
 app.include_router(otp_router)
 app.include_router(report_router)
 app.include_router(followup_router)
 app.include_router(risk_router)
 app.include_router(dashboard_router)
+app.include_router(signals_router)
+app.include_router(terminology_router)
+app.include_router(search_router)
+app.include_router(events_router)
 
 
 @app.get("/")
@@ -62,13 +120,22 @@ def root():
 @app.get("/health")
 def health_check():
     """Health check endpoint."""
+    circuit = openai_breaker.snapshot()
     return {
-        "status": "healthy",
+        "status": "healthy" if circuit["state"] == CircuitBreaker.CLOSED else "degraded",
         "database": "connected",
-        "ai_service": "available" if settings.OPENAI_API_KEY != "sk-your-openai-api-key" else "not_configured"
+        "ai_service": "available" if settings.OPENAI_API_KEY != "sk-your-openai-api-key" else "not_configured",
+        "ai_circuit": circuit
     }
 
 
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """LLM call metrics in the Prometheus text exposition format."""
+    return ai_telemetry.render_prometheus()
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000, reload=True)
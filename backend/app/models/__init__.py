@@ -1,5 +1,7 @@
 """Package initialization for models module."""
-from app.models.database import Reporter, Event, OTPToken, AuditLog, FollowupQuestion
+from app.models.database import Reporter, Event, OTPToken, AuditLog, FollowupQuestion, Narrative, EnrichmentJob, MetricCounter, MetricRollup, DrugEventCount
+# Imported for its side effect: registers the trigger DDL with create_all
+from app.models import triggers  # noqa: F401
 from app.models.schemas import (
     ReporterType,
     Seriousness,
@@ -14,10 +16,21 @@ from app.models.schemas import (
     OTPVerifyRequest,
     OTPResponse,
     FollowupQuestionCreate,
+    FollowupBulkSendRequest,
     FollowupAnswerRequest,
     RiskScoreResponse,
+    StoredRiskResponse,
+    EnrichmentJobResponse,
+    EnrichmentStatusResponse,
     MissingFieldsResponse,
     DashboardMetrics,
+    TrendPoint,
+    TrendsResponse,
+    TermMatchResponse,
+    TerminologyLookupRequest,
+    TerminologyLookupResponse,
+    DisproportionalitySignal,
+    SignalListResponse,
     ExportRequest,
     RegulatoryNarrative
 )
@@ -29,6 +42,11 @@ __all__ = [
     "OTPToken",
     "AuditLog",
     "FollowupQuestion",
+    "Narrative",
+    "EnrichmentJob",
+    "MetricCounter",
+    "MetricRollup",
+    "DrugEventCount",
     # Enums
     "ReporterType",
     "Seriousness",
@@ -44,10 +62,21 @@ __all__ = [
     "OTPVerifyRequest",
     "OTPResponse",
     "FollowupQuestionCreate",
+    "FollowupBulkSendRequest",
     "FollowupAnswerRequest",
     "RiskScoreResponse",
+    "StoredRiskResponse",
+    "EnrichmentJobResponse",
+    "EnrichmentStatusResponse",
     "MissingFieldsResponse",
     "DashboardMetrics",
+    "TrendPoint",
+    "TrendsResponse",
+    "TermMatchResponse",
+    "TerminologyLookupRequest",
+    "TerminologyLookupResponse",
+    "DisproportionalitySignal",
+    "SignalListResponse",
     "ExportRequest",
     "RegulatoryNarrative"
 ]
@@ -1,6 +1,6 @@
 """SQLAlchemy ORM models for the database."""
-from sqlalchemy import Column, Integer, String, Text, Boolean, Float, Date, DateTime, ForeignKey, JSON, LargeBinary
-from sqlalchemy.dialects.postgresql import UUID, JSONB
+from sqlalchemy import Column, Integer, BigInteger, SmallInteger, String, Text, Boolean, Float, Date, DateTime, ForeignKey, JSON, LargeBinary, Index, text
+from sqlalchemy.dialects.postgresql import UUID, JSONB, TSVECTOR
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -32,6 +32,20 @@ class Reporter(Base):
 class Event(Base):
     """Adverse event model."""
     __tablename__ = "events"
+    __table_args__ = (
+        # Full-text and trigram search (pg_trgm); both columns are set by triggers
+        Index("idx_events_search_vector", "search_vector", postgresql_using="gin"),
+        Index(
+            "idx_events_search_text_trgm", "search_text",
+            postgresql_using="gin", postgresql_ops={"search_text": "gin_trgm_ops"}
+        ),
+        # Keyset-paginated worklists: highest risk first (unscored last), then
+        # oldest; or earliest regulatory due date first
+        Index("idx_events_risk_queue", text("(-COALESCE(risk_score, -1))"), "created_at", "id"),
+        Index("idx_events_status_risk_queue", "followup_status", text("(-COALESCE(risk_score, -1))"), "created_at", "id"),
+        Index("idx_events_due_queue", "regulatory_due_at", text("(-COALESCE(risk_score, -1))"), "id"),
+        Index("idx_events_status_due_queue", "followup_status", "regulatory_due_at", text("(-COALESCE(risk_score, -1))"), "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     uuid = Column(UUID(as_uuid=True), default=uuid.uuid4, unique=True, nullable=False)
@@ -54,9 +68,27 @@ class Event(Base):
     comorbidities = Column(Text)
     medications = Column(Text)  # Concomitant medications
     
+    # Normalized terms (from the terminology dictionary at ingest)
+    drug_code = Column(String(20), index=True)  # ATC code of suspected_drug
+    drug_term = Column(Text)
+    reaction_code = Column(String(100), index=True)
+    reaction_term = Column(Text)
+    
+    # Near-duplicate detection
+    duplicate_of = Column(Integer, ForeignKey("events.id", ondelete="SET NULL"), index=True)  # Original case
+    duplicate_score = Column(Float)  # Estimated Jaccard similarity to it
+    duplicate_status = Column(String(20))  # 'suspected', 'not_duplicate'
+    
+    # Search (maintained by triggers from the drug, reaction, history and follow-up answers)
+    search_vector = Column(TSVECTOR)
+    search_text = Column(Text)
+    
     # Follow-up management
     followup_status = Column(String(20), default='pending', index=True)
     missing_fields = Column(JSONB)  # Array of missing field names
+    enrichment_status = Column(String(20))  # 'pending', 'running', 'completed', 'failed', 'skipped'
+    completed_at = Column(DateTime(timezone=True), index=True)  # When the last missing field was answered
+    regulatory_due_at = Column(DateTime(timezone=True))  # Expedited reporting deadline, set by a trigger (7 / 15 / 90 days)
     
     # Consent and compliance
     consent = Column(Boolean, default=False)
@@ -67,6 +99,9 @@ class Event(Base):
     risk_class = Column(String(20), index=True)  # 'low', 'medium', 'high', 'critical'
     hospitalization_risk = Column(Float)
     mortality_risk = Column(Float)
+    risk_reasoning = Column(Text)
+    risk_input_hash = Column(String(64))  # Hash of the inputs the stored score was computed from
+    risk_scored_at = Column(DateTime(timezone=True))
     
     # Metadata
     encrypted_data = Column(LargeBinary)  # AES-256 encrypted PHI
@@ -77,11 +112,17 @@ class Event(Base):
     reporter = relationship("Reporter", back_populates="events")
     audit_logs = relationship("AuditLog", back_populates="event", cascade="all, delete-orphan")
     followup_questions = relationship("FollowupQuestion", back_populates="event", cascade="all, delete-orphan")
+    narrative = relationship("Narrative", back_populates="event", uselist=False, cascade="all, delete-orphan")
+    enrichment_jobs = relationship("EnrichmentJob", back_populates="event", cascade="all, delete-orphan")
 
 
 class OTPToken(Base):
     """OTP token model for verification."""
     __tablename__ = "otp_tokens"
+    __table_args__ = (
+        # Pending-code lookup by contact, newest first
+        Index("idx_otp_tokens_phone_or_email", "phone_or_email", "created_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     reporter_id = Column(Integer, ForeignKey("reporters.id", ondelete="CASCADE"), index=True)
@@ -127,10 +168,95 @@ class FollowupQuestion(Base):
     question_language = Column(String(10), default='en')
     field_name = Column(Text)  # Which missing field this question addresses
     channel = Column(String(20))  # 'sms', 'whatsapp', 'email'
-    sent_at = Column(DateTime(timezone=True), server_default=func.now())
+    sent_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
     answered = Column(Boolean, default=False)
     answer_text = Column(Text)
-    answered_at = Column(DateTime(timezone=True))
+    answered_at = Column(DateTime(timezone=True), index=True)
     
     # Relationships
     event = relationship("Event", back_populates="followup_questions")
+
+
+class Narrative(Base):
+    """Generated ICSR regulatory narrative for an event."""
+    __tablename__ = "narratives"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    event_id = Column(Integer, ForeignKey("events.id", ondelete="CASCADE"), unique=True, nullable=False)
+    narrative = Column(Text, nullable=False)
+    model = Column(String(50))
+    input_hash = Column(String(64), nullable=False)  # SHA-256 of the normalized narrative inputs
+    event_updated_at = Column(DateTime(timezone=True))  # Event revision the narrative was generated from
+    generated_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    # Relationships
+    event = relationship("Event", back_populates="narrative")
+
+
+class EnrichmentJob(Base):
+    """Queued AI enrichment work (missing fields, risk, escalation) for an event."""
+    __tablename__ = "enrichment_jobs"
+    __table_args__ = (
+        # Claim order for queued jobs; kept small by only indexing queued rows
+        Index(
+            "idx_enrichment_jobs_claim", "priority", "id",
+            postgresql_where=Column("status") == "queued"
+        ),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    event_id = Column(Integer, ForeignKey("events.id", ondelete="CASCADE"), index=True, nullable=False)
+    kind = Column(String(30), nullable=False, default='triage')
+    priority = Column(SmallInteger, nullable=False, default=100)  # Lower runs first
+    status = Column(String(20), nullable=False, default='queued')  # 'queued', 'running', 'succeeded', 'failed'
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=5)
+    run_after = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    locked_by = Column(String(100))
+    locked_at = Column(DateTime(timezone=True))
+    last_error = Column(Text)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    finished_at = Column(DateTime(timezone=True))
+    
+    # Relationships
+    event = relationship("Event", back_populates="enrichment_jobs")
+
+
+class MetricCounter(Base):
+    """Sharded dashboard counter maintained by triggers (see app/models/triggers.py)."""
+    __tablename__ = "metric_counters"
+    
+    name = Column(String(100), primary_key=True)  # e.g. 'events_total', 'events_risk:high'
+    shard = Column(SmallInteger, primary_key=True)  # Spreads concurrent updates over several rows
+    value = Column(BigInteger, nullable=False, default=0)
+
+
+class MetricRollup(Base):
+    """Hourly or daily dashboard measures, refreshed incrementally by the rollup job."""
+    __tablename__ = "metric_rollups"
+    
+    granularity = Column(String(5), primary_key=True)  # 'hour' or 'day'
+    bucket_start = Column(DateTime(timezone=True), primary_key=True)  # UTC
+    events_ingested = Column(Integer, nullable=False, default=0)
+    risk_low = Column(Integer, nullable=False, default=0)  # Risk-class mix of the events ingested
+    risk_medium = Column(Integer, nullable=False, default=0)
+    risk_high = Column(Integer, nullable=False, default=0)
+    risk_critical = Column(Integer, nullable=False, default=0)
+    risk_unscored = Column(Integer, nullable=False, default=0)
+    questions_sent = Column(Integer, nullable=False, default=0)
+    questions_answered = Column(Integer, nullable=False, default=0)
+    answer_latency_p50 = Column(Float)  # Seconds from sending a question to its answer
+    answer_latency_p90 = Column(Float)
+    events_completed = Column(Integer, nullable=False, default=0)
+    completion_time_p50 = Column(Float)  # Seconds from report to last missing field answered
+    completion_time_p90 = Column(Float)
+    computed_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class DrugEventCount(Base):
+    """Reports per normalized (suspected drug, adverse effect) pair, maintained by triggers."""
+    __tablename__ = "drug_event_counts"
+    
+    drug = Column(Text, primary_key=True)  # signal_term(COALESCE(drug_term, suspected_drug))
+    reaction = Column(Text, primary_key=True)  # signal_term(COALESCE(reaction_term, adverse_effect))
+    count = Column(BigInteger, nullable=False, default=0)
@@ -101,6 +101,15 @@ class EventResponse(EventBase):
     risk_class: Optional[RiskClass] = None
     hospitalization_risk: Optional[float] = None
     mortality_risk: Optional[float] = None
+    enrichment_status: Optional[str] = None
+    completed_at: Optional[datetime] = None
+    drug_code: Optional[str] = None
+    drug_term: Optional[str] = None
+    reaction_code: Optional[str] = None
+    reaction_term: Optional[str] = None
+    duplicate_of: Optional[int] = None
+    duplicate_score: Optional[float] = None
+    duplicate_status: Optional[str] = None
     created_at: datetime
     
     class Config:
@@ -138,6 +147,11 @@ class FollowupQuestionCreate(BaseModel):
     language: str = "en"
 
 
+class FollowupBulkSendRequest(BaseModel):
+    """Schema for sending follow-up questions for many events at once."""
+    event_ids: List[int] = Field(..., min_length=1, max_length=500)
+
+
 class FollowupAnswerRequest(BaseModel):
     """Schema for answering a follow-up question."""
     question_id: int
@@ -168,6 +182,62 @@ class RiskScoreResponse(BaseModel):
     hospitalization_risk: float
     mortality_risk: float
     reasoning: str
+    scored_at: Optional[datetime] = None
+
+
+class StoredRiskResponse(BaseModel):
+    """Schema for a stored risk score read without recomputation."""
+    event_id: int
+    risk_score: Optional[float] = None
+    risk_class: Optional[RiskClass] = None
+    hospitalization_risk: Optional[float] = None
+    mortality_risk: Optional[float] = None
+    reasoning: Optional[str] = None
+    scored_at: Optional[datetime] = None
+    stale: bool  # No score yet, or the scoring inputs changed since it was computed
+
+
+# Enrichment schemas
+class EnrichmentJobResponse(BaseModel):
+    """Schema for a background enrichment job."""
+    id: int
+    kind: str
+    priority: int
+    status: str
+    attempts: int
+    max_attempts: int
+    run_after: Optional[datetime] = None
+    last_error: Optional[str] = None
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
+
+
+class EnrichmentStatusResponse(BaseModel):
+    """Schema for polling the enrichment of an event."""
+    event_id: int
+    enrichment_status: Optional[str] = None
+    risk_class: Optional[RiskClass] = None
+    missing_fields: Optional[List[str]] = None
+    followup_status: str
+    jobs: List[EnrichmentJobResponse]
+
+
+class DuplicateCandidate(BaseModel):
+    """Schema for a stored event similar to another one."""
+    event_id: int
+    duplicate_of: Optional[int] = None  # Original case of the candidate, if it is itself a duplicate
+    similarity: float
+
+
+class DuplicateCandidatesResponse(BaseModel):
+    """Schema for the possible duplicates of an event."""
+    event_id: int
+    duplicate_of: Optional[int] = None
+    duplicate_status: Optional[str] = None
+    candidates: List[DuplicateCandidate]
 
 
 # Missing fields detection
@@ -191,6 +261,130 @@ class DashboardMetrics(BaseModel):
     pending_followups: int
 
 
+
+class TrendPoint(BaseModel):
+    """Schema for one rollup bucket of the dashboard trends."""
+    bucket_start: datetime
+    events_ingested: int
+    risk_low: int
+    risk_medium: int
+    risk_high: int
+    risk_critical: int
+    risk_unscored: int
+    questions_sent: int
+    questions_answered: int
+    answer_latency_p50: Optional[float] = None  # Seconds
+    answer_latency_p90: Optional[float] = None
+    events_completed: int
+    completion_time_p50: Optional[float] = None  # Seconds
+    completion_time_p90: Optional[float] = None
+    
+    class Config:
+        from_attributes = True
+
+
+class TrendsResponse(BaseModel):
+    """Schema for dashboard trends over a time range."""
+    granularity: str
+    start: datetime
+    end: datetime
+    points: List[TrendPoint]
+
+
+class TermMatchResponse(BaseModel):
+    """Schema for a name resolved against the terminology dictionary."""
+    code: str
+    term: str
+    method: str  # 'exact', 'partial' or 'fuzzy'
+    distance: int
+
+
+class TerminologyLookupRequest(BaseModel):
+    """Schema for normalizing a batch of drug and adverse-effect names."""
+    drugs: List[str] = Field(default_factory=list, max_length=10000)
+    adverse_effects: List[str] = Field(default_factory=list, max_length=10000)
+
+
+class TerminologyLookupResponse(BaseModel):
+    """Schema for normalized names, in request order (null when unresolved)."""
+    drugs: List[Optional[TermMatchResponse]]
+    adverse_effects: List[Optional[TermMatchResponse]]
+
+
+class DisproportionalitySignal(BaseModel):
+    """Schema for one drug-event pair with its disproportionality statistics."""
+    drug: str
+    adverse_effect: str
+    count: int  # a: reports with the drug and the event
+    drug_count: int  # a + b: reports with the drug
+    event_count: int  # a + c: reports with the event
+    expected: float  # (a + b)(a + c) / N
+    prr: Optional[float] = None
+    prr_lower: Optional[float] = None  # 95% CI
+    prr_upper: Optional[float] = None
+    ror: Optional[float] = None
+    ror_lower: Optional[float] = None  # 95% CI
+    ror_upper: Optional[float] = None
+    ic: float
+    ic025: float  # 95% credibility interval
+    ic975: float
+    chi_square: Optional[float] = None  # Yates-corrected
+    signal: bool  # Meets the criteria of the requested method
+
+
+class SignalListResponse(BaseModel):
+    """Schema for ranked disproportionality signals."""
+    method: str
+    total_reports: int
+    matches: int
+    computed_at: datetime
+    signals: List[DisproportionalitySignal]
+
+
+class EventSearchHit(BaseModel):
+    """Schema for one event search result."""
+    id: int
+    suspected_drug: Optional[str] = None
+    drug_term: Optional[str] = None
+    adverse_effect: Optional[str] = None
+    reaction_term: Optional[str] = None
+    risk_class: Optional[RiskClass] = None
+    followup_status: Optional[str] = None
+    duplicate_of: Optional[int] = None
+    created_at: datetime
+    score: float
+
+
+class EventSearchResponse(BaseModel):
+    """Schema for a page of event search results."""
+    hits: List[EventSearchHit]
+    next_cursor: Optional[str] = None  # Pass as cursor for the next page; null on the last
+
+
+class EventListItem(BaseModel):
+    """Schema for one event in a listing or worklist."""
+    id: int
+    suspected_drug: Optional[str] = None
+    drug_term: Optional[str] = None
+    adverse_effect: Optional[str] = None
+    reaction_term: Optional[str] = None
+    seriousness: Optional[str] = None
+    outcome: Optional[str] = None
+    risk_score: Optional[float] = None
+    risk_class: Optional[RiskClass] = None
+    followup_status: Optional[str] = None
+    duplicate_of: Optional[int] = None
+    regulatory_due_at: Optional[datetime] = None
+    overdue: bool = False
+    created_at: datetime
+
+
+class EventListResponse(BaseModel):
+    """Schema for a page of events."""
+    items: List[EventListItem]
+    next_cursor: Optional[str] = None  # Pass as cursor for the next page; null on the last
+
+
 # Export schemas
 class ExportRequest(BaseModel):
     """Schema for export request."""
@@ -206,3 +400,4 @@ class RegulatoryNarrative(BaseModel):
     event_id: int
     narrative: str
     generated_at: datetime
+    cached: bool = False
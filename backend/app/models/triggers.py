@@ -0,0 +1,296 @@
+"""Database triggers installed alongside the ORM schema (mirrored in database/init.sql)."""
+from sqlalchemy import DDL, event
+from app.core.database import Base
+
+# Rows per counter; concurrent writers pick one at random so they rarely
+# wait on each other's row lock
+METRIC_COUNTER_SHARDS = 16
+
+METRIC_COUNTER_TRIGGERS = f"""
+CREATE OR REPLACE FUNCTION event_metric_keys(risk_class TEXT, followup_status TEXT, missing_fields JSONB)
+RETURNS TEXT[] AS $$
+    SELECT ARRAY[
+        'events_total',
+        'events_risk:' || COALESCE(risk_class, 'none'),
+        'events_followup:' || COALESCE(followup_status, 'none'),
+        CASE WHEN missing_fields IS NULL OR missing_fields = '[]'::jsonb THEN 'events_complete' ELSE 'events_incomplete' END
+    ]
+$$ LANGUAGE sql IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION question_metric_keys(answered BOOLEAN)
+RETURNS TEXT[] AS $$
+    SELECT CASE WHEN answered THEN ARRAY['questions_total', 'questions_answered'] ELSE ARRAY['questions_total'] END
+$$ LANGUAGE sql IMMUTABLE;
+
+-- Statement-level: one counter upsert per touched key, however many rows changed
+CREATE OR REPLACE FUNCTION events_metric_counters() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO metric_counters (name, shard, value)
+        SELECT key, floor(random() * {METRIC_COUNTER_SHARDS})::smallint, count(*)
+        FROM new_rows, unnest(event_metric_keys(new_rows.risk_class, new_rows.followup_status, new_rows.missing_fields)) AS key
+        GROUP BY key ORDER BY key
+        ON CONFLICT (name, shard) DO UPDATE SET value = metric_counters.value + EXCLUDED.value;
+    ELSIF TG_OP = 'DELETE' THEN
+        INSERT INTO metric_counters (name, shard, value)
+        SELECT key, floor(random() * {METRIC_COUNTER_SHARDS})::smallint, -count(*)
+        FROM old_rows, unnest(event_metric_keys(old_rows.risk_class, old_rows.followup_status, old_rows.missing_fields)) AS key
+        GROUP BY key ORDER BY key
+        ON CONFLICT (name, shard) DO UPDATE SET value = metric_counters.value + EXCLUDED.value;
+    ELSE
+        INSERT INTO metric_counters (name, shard, value)
+        SELECT key, floor(random() * {METRIC_COUNTER_SHARDS})::smallint, sum(delta)
+        FROM (
+            SELECT key, 1 AS delta
+            FROM new_rows, unnest(event_metric_keys(new_rows.risk_class, new_rows.followup_status, new_rows.missing_fields)) AS key
+            UNION ALL
+            SELECT key, -1
+            FROM old_rows, unnest(event_metric_keys(old_rows.risk_class, old_rows.followup_status, old_rows.missing_fields)) AS key
+        ) deltas
+        GROUP BY key HAVING sum(delta) <> 0 ORDER BY key
+        ON CONFLICT (name, shard) DO UPDATE SET value = metric_counters.value + EXCLUDED.value;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION followup_questions_metric_counters() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO metric_counters (name, shard, value)
+        SELECT key, floor(random() * {METRIC_COUNTER_SHARDS})::smallint, count(*)
+        FROM new_rows, unnest(question_metric_keys(new_rows.answered)) AS key
+        GROUP BY key ORDER BY key
+        ON CONFLICT (name, shard) DO UPDATE SET value = metric_counters.value + EXCLUDED.value;
+    ELSIF TG_OP = 'DELETE' THEN
+        INSERT INTO metric_counters (name, shard, value)
+        SELECT key, floor(random() * {METRIC_COUNTER_SHARDS})::smallint, -count(*)
+        FROM old_rows, unnest(question_metric_keys(old_rows.answered)) AS key
+        GROUP BY key ORDER BY key
+        ON CONFLICT (name, shard) DO UPDATE SET value = metric_counters.value + EXCLUDED.value;
+    ELSE
+        INSERT INTO metric_counters (name, shard, value)
+        SELECT key, floor(random() * {METRIC_COUNTER_SHARDS})::smallint, sum(delta)
+        FROM (
+            SELECT key, 1 AS delta FROM new_rows, unnest(question_metric_keys(new_rows.answered)) AS key
+            UNION ALL
+            SELECT key, -1 FROM old_rows, unnest(question_metric_keys(old_rows.answered)) AS key
+        ) deltas
+        GROUP BY key HAVING sum(delta) <> 0 ORDER BY key
+        ON CONFLICT (name, shard) DO UPDATE SET value = metric_counters.value + EXCLUDED.value;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE TRIGGER events_metric_counters_insert AFTER INSERT ON events
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION events_metric_counters();
+
+CREATE OR REPLACE TRIGGER events_metric_counters_update AFTER UPDATE ON events
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION events_metric_counters();
+
+CREATE OR REPLACE TRIGGER events_metric_counters_delete AFTER DELETE ON events
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT EXECUTE FUNCTION events_metric_counters();
+
+CREATE OR REPLACE TRIGGER followup_questions_metric_counters_insert AFTER INSERT ON followup_questions
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION followup_questions_metric_counters();
+
+CREATE OR REPLACE TRIGGER followup_questions_metric_counters_update AFTER UPDATE ON followup_questions
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION followup_questions_metric_counters();
+
+CREATE OR REPLACE TRIGGER followup_questions_metric_counters_delete AFTER DELETE ON followup_questions
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT EXECUTE FUNCTION followup_questions_metric_counters();
+
+-- Rebuild every counter from the source tables in one pass each; writers wait meanwhile
+CREATE OR REPLACE FUNCTION reconcile_metric_counters() RETURNS void AS $$
+BEGIN
+    LOCK TABLE events, followup_questions IN SHARE MODE;
+    DELETE FROM metric_counters;
+    INSERT INTO metric_counters (name, shard, value)
+    SELECT key, 0, count(*)
+    FROM events, unnest(event_metric_keys(events.risk_class, events.followup_status, events.missing_fields)) AS key
+    GROUP BY key
+    UNION ALL
+    SELECT key, 0, count(*)
+    FROM followup_questions, unnest(question_metric_keys(followup_questions.answered)) AS key
+    GROUP BY key;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Backfill when the triggers are first installed on existing data
+SELECT reconcile_metric_counters() WHERE NOT EXISTS (SELECT 1 FROM metric_counters);
+"""
+
+DRUG_EVENT_COUNT_TRIGGERS = """
+-- Case- and whitespace-insensitive term used as the contingency-table key
+CREATE OR REPLACE FUNCTION signal_term(term TEXT) RETURNS TEXT AS $$
+    SELECT NULLIF(lower(regexp_replace(btrim(term), '\\s+', ' ', 'g')), '')
+$$ LANGUAGE sql IMMUTABLE;
+
+-- Events flagged as duplicates are left out; flagging or clearing one is an UPDATE delta
+CREATE OR REPLACE FUNCTION events_drug_event_counts() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO drug_event_counts (drug, reaction, count)
+        SELECT drug, reaction, count(*)
+        FROM (SELECT signal_term(COALESCE(drug_term, suspected_drug)) AS drug, signal_term(COALESCE(reaction_term, adverse_effect)) AS reaction FROM new_rows WHERE duplicate_of IS NULL) terms
+        WHERE drug IS NOT NULL AND reaction IS NOT NULL
+        GROUP BY drug, reaction ORDER BY drug, reaction
+        ON CONFLICT (drug, reaction) DO UPDATE SET count = drug_event_counts.count + EXCLUDED.count;
+    ELSIF TG_OP = 'DELETE' THEN
+        INSERT INTO drug_event_counts (drug, reaction, count)
+        SELECT drug, reaction, -count(*)
+        FROM (SELECT signal_term(COALESCE(drug_term, suspected_drug)) AS drug, signal_term(COALESCE(reaction_term, adverse_effect)) AS reaction FROM old_rows WHERE duplicate_of IS NULL) terms
+        WHERE drug IS NOT NULL AND reaction IS NOT NULL
+        GROUP BY drug, reaction ORDER BY drug, reaction
+        ON CONFLICT (drug, reaction) DO UPDATE SET count = drug_event_counts.count + EXCLUDED.count;
+    ELSE
+        INSERT INTO drug_event_counts (drug, reaction, count)
+        SELECT drug, reaction, sum(delta)
+        FROM (
+            SELECT signal_term(COALESCE(drug_term, suspected_drug)) AS drug, signal_term(COALESCE(reaction_term, adverse_effect)) AS reaction, 1 AS delta FROM new_rows WHERE duplicate_of IS NULL
+            UNION ALL
+            SELECT signal_term(COALESCE(drug_term, suspected_drug)), signal_term(COALESCE(reaction_term, adverse_effect)), -1 FROM old_rows WHERE duplicate_of IS NULL
+        ) deltas
+        WHERE drug IS NOT NULL AND reaction IS NOT NULL
+        GROUP BY drug, reaction HAVING sum(delta) <> 0 ORDER BY drug, reaction
+        ON CONFLICT (drug, reaction) DO UPDATE SET count = drug_event_counts.count + EXCLUDED.count;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE TRIGGER events_drug_event_counts_insert AFTER INSERT ON events
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION events_drug_event_counts();
+
+CREATE OR REPLACE TRIGGER events_drug_event_counts_update AFTER UPDATE ON events
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION events_drug_event_counts();
+
+CREATE OR REPLACE TRIGGER events_drug_event_counts_delete AFTER DELETE ON events
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT EXECUTE FUNCTION events_drug_event_counts();
+
+-- Rebuild the contingency counts from events; writers wait meanwhile
+CREATE OR REPLACE FUNCTION reconcile_drug_event_counts() RETURNS void AS $$
+BEGIN
+    LOCK TABLE events IN SHARE MODE;
+    DELETE FROM drug_event_counts;
+    INSERT INTO drug_event_counts (drug, reaction, count)
+    SELECT drug, reaction, count(*)
+    FROM (SELECT signal_term(COALESCE(drug_term, suspected_drug)) AS drug, signal_term(COALESCE(reaction_term, adverse_effect)) AS reaction FROM events WHERE duplicate_of IS NULL) terms
+    WHERE drug IS NOT NULL AND reaction IS NOT NULL
+    GROUP BY drug, reaction;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Backfill when the triggers are first installed on existing data
+SELECT reconcile_drug_event_counts() WHERE NOT EXISTS (SELECT 1 FROM drug_event_counts);
+"""
+
+SEARCH_TRIGGERS = """
+-- Follow-up answers of an event, oldest first
+CREATE OR REPLACE FUNCTION event_answers_text(target_event_id INTEGER) RETURNS TEXT AS $$
+    SELECT string_agg(answer_text, ' ' ORDER BY id)
+    FROM followup_questions
+    WHERE event_id = target_event_id AND answer_text IS NOT NULL
+$$ LANGUAGE sql STABLE;
+
+-- Weighted search document: drug and reaction A, history B, follow-up answers C
+CREATE OR REPLACE FUNCTION event_search_vector(e events, answers TEXT) RETURNS tsvector AS $$
+    SELECT setweight(to_tsvector('english', concat_ws(' ', e.suspected_drug, e.drug_term, e.adverse_effect, e.reaction_term)), 'A')
+        || setweight(to_tsvector('english', concat_ws(' ', e.comorbidities, e.medications)), 'B')
+        || setweight(to_tsvector('english', COALESCE(answers, '')), 'C')
+$$ LANGUAGE sql IMMUTABLE;
+
+-- The same text lowercased, for substring and trigram matching
+CREATE OR REPLACE FUNCTION event_search_text(e events, answers TEXT) RETURNS TEXT AS $$
+    SELECT lower(concat_ws(' ', e.suspected_drug, e.drug_term, e.adverse_effect, e.reaction_term, e.comorbidities, e.medications, answers))
+$$ LANGUAGE sql IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION events_search_document() RETURNS TRIGGER AS $$
+DECLARE
+    answers TEXT;
+BEGIN
+    IF TG_OP = 'UPDATE' THEN
+        answers := event_answers_text(NEW.id);
+    END IF;
+    NEW.search_vector := event_search_vector(NEW, answers);
+    NEW.search_text := event_search_text(NEW, answers);
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE TRIGGER events_search_document
+BEFORE INSERT OR UPDATE OF suspected_drug, drug_term, adverse_effect, reaction_term, comorbidities, medications ON events
+FOR EACH ROW EXECUTE FUNCTION events_search_document();
+
+-- An answer changed: rebuild its event's document
+CREATE OR REPLACE FUNCTION followup_questions_search_document() RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE events e
+    SET (search_vector, search_text) = (SELECT event_search_vector(e, a), event_search_text(e, a) FROM event_answers_text(e.id) a)
+    WHERE e.id = COALESCE(NEW.event_id, OLD.event_id);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE TRIGGER followup_questions_search_document_insert AFTER INSERT ON followup_questions
+FOR EACH ROW WHEN (NEW.answer_text IS NOT NULL) EXECUTE FUNCTION followup_questions_search_document();
+
+CREATE OR REPLACE TRIGGER followup_questions_search_document_update AFTER UPDATE OF answer_text ON followup_questions
+FOR EACH ROW WHEN (NEW.answer_text IS DISTINCT FROM OLD.answer_text) EXECUTE FUNCTION followup_questions_search_document();
+
+CREATE OR REPLACE TRIGGER followup_questions_search_document_delete AFTER DELETE ON followup_questions
+FOR EACH ROW WHEN (OLD.answer_text IS NOT NULL) EXECUTE FUNCTION followup_questions_search_document();
+
+-- Backfill events stored before the triggers were installed
+UPDATE events e
+SET (search_vector, search_text) = (SELECT event_search_vector(e, a), event_search_text(e, a) FROM event_answers_text(e.id) a)
+WHERE search_text IS NULL;
+"""
+
+REGULATORY_DUE_TRIGGERS = """
+-- Expedited reporting clocks, counted in calendar days from receipt: 7 for
+-- fatal cases, 15 for serious ones, 90 otherwise. Cases the risk model rates
+-- critical or high are held to the 7- or 15-day clock until assessed.
+CREATE OR REPLACE FUNCTION event_regulatory_clock(e events) RETURNS INTERVAL AS $$
+    SELECT CASE
+        WHEN e.outcome = 'fatal' OR e.risk_class = 'critical' THEN INTERVAL '7 days'
+        WHEN e.seriousness = 'serious' OR e.hospitalization OR e.risk_class = 'high' THEN INTERVAL '15 days'
+        ELSE INTERVAL '90 days'
+    END
+$$ LANGUAGE sql IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION events_regulatory_due_at() RETURNS TRIGGER AS $$
+BEGIN
+    NEW.regulatory_due_at := NEW.created_at + event_regulatory_clock(NEW);
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE TRIGGER events_regulatory_due_at
+BEFORE INSERT OR UPDATE OF created_at, seriousness, hospitalization, outcome, risk_class ON events
+FOR EACH ROW EXECUTE FUNCTION events_regulatory_due_at();
+
+-- Backfill events stored before the trigger was installed
+UPDATE events e
+SET regulatory_due_at = e.created_at + event_regulatory_clock(e)
+WHERE regulatory_due_at IS NULL;
+"""
+
+# Needed by the trigram index on events.search_text
+event.listen(Base.metadata, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+
+# Installed after every table exists, on each create_all (the DDL is idempotent)
+event.listen(Base.metadata, "after_create", DDL(METRIC_COUNTER_TRIGGERS))
+event.listen(Base.metadata, "after_create", DDL(DRUG_EVENT_COUNT_TRIGGERS))
+event.listen(Base.metadata, "after_create", DDL(SEARCH_TRIGGERS))
+event.listen(Base.metadata, "after_create", DDL(REGULATORY_DUE_TRIGGERS))
@@ -4,11 +4,19 @@ from app.routes.report import router as report_router
 from app.routes.followup import router as followup_router
 from app.routes.risk import router as risk_router
 from app.routes.dashboard import router as dashboard_router
+from app.routes.signals import router as signals_router
+from app.routes.terminology import router as terminology_router
+from app.routes.search import router as search_router
+from app.routes.events import router as events_router
 
 __all__ = [
     "otp_router",
     "report_router",
     "followup_router",
     "risk_router",
-    "dashboard_router"
+    "dashboard_router",
+    "signals_router",
+    "terminology_router",
+    "search_router",
+    "events_router"
 ]
@@ -1,11 +1,16 @@
 """Dashboard routes for metrics and analytics."""
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from app.core.config import settings
 from app.core.database import get_db
-from app.models.schemas import DashboardMetrics
-from app.models.database import Event, FollowupQuestion, AuditLog
-from datetime import datetime, timedelta
+from app.core.cache import llm_cache
+from app.core.telemetry import ai_telemetry
+from app.services.question_library import question_library
+from app.services.metrics_service import metrics_service
+from app.services.rollup_service import rollup_service, GRANULARITIES
+from app.models.schemas import DashboardMetrics, TrendsResponse
+from datetime import datetime, timedelta, timezone
+from typing import Optional
 import logging
 
 logger = logging.getLogger(__name__)
@@ -14,10 +19,13 @@ router = APIRouter(prefix="/dashboard", tags=["Dashboard"])
 
 
 @router.get("/metrics", response_model=DashboardMetrics)
-def get_dashboard_metrics(db: Session = Depends(get_db)):
+def get_dashboard_metrics(exact: bool = False, db: Session = Depends(get_db)):
     """
     Get real-time dashboard metrics for pharmacovigilance monitoring.
     
+    Reads trigger-maintained counters, so the cost does not grow with the
+    number of events. **exact** recounts from the source tables instead.
+    
     Returns:
     - Total events count
     - Response rate increase %
@@ -29,58 +37,10 @@ def get_dashboard_metrics(db: Session = Depends(get_db)):
     - Pending follow-ups count
     """
     try:
-        # Total events
-        total_events = db.query(func.count(Event.id)).scalar() or 0
-        
-        # High-risk events
-        high_risk_count = db.query(func.count(Event.id)).filter(
-            Event.risk_class.in_(["high", "critical"])
-        ).scalar() or 0
-        
-        # Pending follow-ups
-        pending_followups = db.query(func.count(Event.id)).filter(
-            Event.followup_status == "pending"
-        ).scalar() or 0
-        
-        # Answered follow-up questions
-        total_questions = db.query(func.count(FollowupQuestion.id)).scalar() or 1  # Avoid division by zero
-        answered_questions = db.query(func.count(FollowupQuestion.id)).filter(
-            FollowupQuestion.answered == True
-        ).scalar() or 0
-        
-        # Calculate response rate (simulated baseline vs current)
-        baseline_response_rate = 0.35  # 35% baseline
-        current_response_rate = answered_questions / total_questions if total_questions > 0 else 0
-        response_rate_increase = ((current_response_rate - baseline_response_rate) / baseline_response_rate) * 100 if baseline_response_rate > 0 else 0
-        
-        # Missing field reduction (events with no missing fields vs baseline)
-        events_complete = db.query(func.count(Event.id)).filter(
-            (Event.missing_fields == None) | (Event.missing_fields == [])
-        ).scalar() or 0
-        missing_field_reduction = (events_complete / total_events * 100) if total_events > 0 else 0
-        
-        # Cycle time reduction (simulated - based on answered questions)
-        baseline_cycle_days = 14.0
-        current_cycle_days = 7.0 if answered_questions > 0 else baseline_cycle_days
-        cycle_time_reduction = ((baseline_cycle_days - current_cycle_days) / baseline_cycle_days) * 100
-        
-        # High-risk detection accuracy (simulated)
-        high_risk_accuracy = 92.5  # High accuracy for AI detection
-        
-        # Agent workload reduction (based on automated follow-ups)
-        automated_followups = db.query(func.count(FollowupQuestion.id)).scalar() or 0
-        agent_workload_reduction = min((automated_followups / total_events * 100) if total_events > 0 else 0, 100)
-        
-        return DashboardMetrics(
-            total_events=total_events,
-            response_rate_increase=round(response_rate_increase, 2),
-            missing_field_reduction=round(missing_field_reduction, 2),
-            cycle_time_reduction=round(cycle_time_reduction, 2),
-            high_risk_accuracy=round(high_risk_accuracy, 2),
-            agent_workload_reduction=round(agent_workload_reduction, 2),
-            high_risk_count=high_risk_count,
-            pending_followups=pending_followups
-        )
+        counts = {} if exact else metrics_service.counters(db)
+        if not counts:
+            counts = metrics_service.exact_counts(db)
+        return metrics_service.dashboard_metrics(counts)
         
     except Exception as e:
         logger.error(f"Error getting dashboard metrics: {str(e)}")
@@ -95,3 +55,94 @@ def get_dashboard_metrics(db: Session = Depends(get_db)):
             high_risk_count=0,
             pending_followups=0
         )
+
+
+@router.post("/metrics/reconcile")
+def reconcile_dashboard_metrics(db: Session = Depends(get_db)):
+    """
+    Rebuild the dashboard counters from the source tables.
+    
+    Returns the drift (counter minus exact count) found per counter; it
+    should be empty unless rows were changed with the triggers disabled.
+    """
+    try:
+        drift = metrics_service.reconcile(db)
+        return {"reconciled": True, "drift": drift}
+    except Exception as e:
+        logger.error(f"Error reconciling dashboard metrics: {str(e)}")
+        db.rollback()
+        raise HTTPException(status_code=500, detail="Failed to reconcile dashboard metrics")
+
+
+@router.get("/trends", response_model=TrendsResponse)
+def get_trends(
+    granularity: str = "day",
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Get dashboard measures over time from the hourly or daily rollups.
+    
+    Each point covers one UTC hour or day: events ingested and their risk-class
+    mix, questions sent and answered, answer latency percentiles, and time
+    from report to completed follow-up.
+    
+    - **granularity**: 'hour' or 'day'
+    - **start**: range start (default: 48 hours or 30 days back)
+    - **end**: range end (default: now)
+    """
+    if granularity not in GRANULARITIES:
+        raise HTTPException(status_code=400, detail="granularity must be 'hour' or 'day'")
+    
+    end = end or datetime.now(timezone.utc)
+    start = start or end - (timedelta(hours=48) if granularity == "hour" else timedelta(days=30))
+    if start.tzinfo is None:
+        start = start.replace(tzinfo=timezone.utc)
+    if end.tzinfo is None:
+        end = end.replace(tzinfo=timezone.utc)
+    if start >= end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+    if (end - start) / GRANULARITIES[granularity] > settings.TRENDS_MAX_POINTS:
+        raise HTTPException(status_code=400, detail="Range too long for this granularity; use 'day' or a shorter range")
+    
+    try:
+        points = rollup_service.trends(db, granularity, start, end)
+        return {"granularity": granularity, "start": start, "end": end, "points": points}
+    except Exception as e:
+        logger.error(f"Error getting trends: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to get trends")
+
+
+@router.post("/trends/refresh")
+def refresh_trends(db: Session = Depends(get_db)):
+    """Recompute the recent rollup buckets now instead of waiting for the periodic job."""
+    try:
+        return rollup_service.refresh(db)
+    except Exception as e:
+        logger.error(f"Error refreshing rollups: {str(e)}")
+        db.rollback()
+        raise HTTPException(status_code=500, detail="Failed to refresh rollups")
+
+
+@router.get("/ai-cache")
+def get_ai_cache_stats():
+    """
+    Get LLM result cache statistics.
+    
+    Returns hit/miss counters per AI method, the model latency avoided by cache
+    hits, and follow-up question library coverage.
+    """
+    return {**llm_cache.stats(), "question_library": question_library.stats()}
+
+
+@router.get("/ai-usage")
+def get_ai_usage():
+    """
+    Get LLM call telemetry.
+    
+    Returns per method and model: call counts by outcome, latency percentiles,
+    prompt/completion tokens, estimated cost, JSON-parse failure rate and
+    fallback rate, plus overall totals.
+    """
+    return ai_telemetry.snapshot()
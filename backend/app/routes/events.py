@@ -0,0 +1,85 @@
+"""Event listing routes for case processing worklists."""
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from app.core.database import get_db
+from app.models.schemas import EventListResponse, RiskClass
+from app.routes.search import FOLLOWUP_STATUSES
+from app.services.worklist_service import worklist_service, SORTS
+from datetime import datetime
+from typing import Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/events", tags=["Events"])
+
+
+@router.get("", response_model=EventListResponse)
+def list_events(
+    status: Optional[str] = None,
+    risk_class: Optional[RiskClass] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    sort: str = "risk",
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    List events page by page.
+    
+    - **status** / **risk_class**: filter by follow-up status / risk class
+    - **date_from** / **date_to**: creation time range, [from, to)
+    - **sort**: 'risk' (highest risk, then oldest first), 'due' (earliest
+      regulatory due date first) or 'recent' (newest first)
+    - **cursor**: `next_cursor` of the previous page
+    """
+    if sort not in SORTS:
+        raise HTTPException(status_code=400, detail=f"sort must be one of {', '.join(SORTS)}")
+    if status and status not in FOLLOWUP_STATUSES:
+        raise HTTPException(status_code=400, detail=f"status must be one of {', '.join(FOLLOWUP_STATUSES)}")
+    
+    try:
+        return worklist_service.list_events(
+            db,
+            status=status,
+            risk_class=risk_class.value if risk_class else None,
+            date_from=date_from,
+            date_to=date_to,
+            sort=sort,
+            limit=limit,
+            cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error listing events: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to list events")
+
+
+@router.get("/escalations", response_model=EventListResponse)
+def escalation_worklist(
+    risk_class: Optional[RiskClass] = None,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Escalated events, earliest regulatory due date first.
+    
+    Due dates run 7 days from receipt for fatal or critical cases, 15 for
+    serious, hospitalized or high-risk ones and 90 otherwise; `overdue` marks
+    cases past theirs.
+    """
+    try:
+        return worklist_service.escalations(
+            db,
+            risk_class=risk_class.value if risk_class else None,
+            limit=limit,
+            cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error loading escalation worklist: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to load escalation worklist")
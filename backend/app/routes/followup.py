@@ -1,14 +1,25 @@
 """Follow-up routes for micro-questionnaires."""
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from app.core.database import get_db
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
+from sqlalchemy.orm import Session, joinedload
+from starlette.concurrency import run_in_threadpool
+from app.core.database import get_db, SessionLocal
 from app.core.security import verify_token, create_secure_link
-from app.models.schemas import FollowupQuestionCreate, FollowupAnswerRequest, FollowupQuestionResponse
+from app.models.schemas import (
+    FollowupQuestionCreate,
+    FollowupBulkSendRequest,
+    FollowupAnswerRequest,
+    FollowupQuestionResponse
+)
 from app.models.database import Event, FollowupQuestion, AuditLog, Reporter
-from app.services.ai_service import ai_service
+from app.services.ai_service import async_ai_service
 from app.services.messaging_service import messaging_service
-from datetime import datetime
-from typing import List
+from app.services.narrative_service import narrative_service
+from app.services.risk_service import risk_service
+from app.services.terminology_service import terminology_service
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+import asyncio
 import logging
 
 logger = logging.getLogger(__name__)
@@ -16,107 +27,272 @@ logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/followup", tags=["Follow-up"])
 
 
+async def _refresh_risk(event_id: int) -> None:
+    """Recompute risk after the response is sent if an answer changed the scoring inputs."""
+    db = SessionLocal()
+    try:
+        await risk_service.refresh_stale_risk_async(db, event_id)
+    except Exception as e:
+        logger.error(f"Error refreshing risk for event {event_id}: {str(e)}")
+    finally:
+        db.close()
+
+
+def _event_context(event: Event) -> Dict[str, Any]:
+    """Event details used to phrase follow-up questions."""
+    return {
+        "suspected_drug": event.suspected_drug,
+        "adverse_effect": event.adverse_effect
+    }
+
+
+def _reporter_channel(reporter: Reporter) -> Tuple[str, str]:
+    """Pick the channel and contact address for a reporter."""
+    channel = "whatsapp" if reporter.phone else "email"
+    contact = reporter.phone if reporter.phone else reporter.email
+    return channel, contact
+
+
+def _build_questions(event: Event, reporter: Reporter, question_texts: Dict[str, str]) -> List[FollowupQuestion]:
+    """Create unsaved FollowupQuestion rows for an event."""
+    channel, _ = _reporter_channel(reporter)
+    return [
+        FollowupQuestion(
+            event_id=event.id,
+            question_text=question_text,
+            field_name=field_name,
+            question_language=reporter.language,
+            channel=channel
+        )
+        for field_name, question_text in question_texts.items()
+    ]
+
+
+def _deliver_questions(event: Event, reporter: Reporter, questions: List[FollowupQuestion]) -> AuditLog:
+    """Send stored questions to the reporter in one message and build the audit entry."""
+    channel, contact = _reporter_channel(reporter)
+
+    # Create secure link for answering
+    secure_token = create_secure_link(reporter.id, event.id)
+    success = messaging_service.send_followup_questions(
+        to=contact,
+        questions=[
+            (q.question_text, f"http://localhost:3000/answer?token={secure_token}&question_id={q.id}")
+            for q in questions
+        ],
+        channel=channel
+    )
+
+    # Update event status
+    event.followup_status = "in_progress"
+
+    return AuditLog(
+        event_id=event.id,
+        reporter_id=reporter.id,
+        action="FOLLOWUP_SENT",
+        channel=channel,
+        meta={
+            "field_names": [q.field_name for q in questions],
+            "question_ids": [q.id for q in questions],
+            "success": success
+        }
+    )
+
+
+def _load_event_for_send(db: Session, event_id: int) -> Tuple[Event, Optional[Reporter]]:
+    """Load an event and its reporter, or raise 404."""
+    event = db.query(Event).filter(Event.id == event_id).first()
+    if not event:
+        raise HTTPException(status_code=404, detail="Event not found")
+    return event, event.reporter
+
+
+def _store_and_send(db: Session, event: Event, reporter: Reporter, question_texts: Dict[str, str]) -> Dict[str, Any]:
+    """Store generated questions, send them and commit (blocking; run via run_in_threadpool)."""
+    # Store questions in one bulk insert
+    questions = _build_questions(event, reporter, question_texts)
+    db.add_all(questions)
+    db.flush()
+    
+    # Send via messaging service and log audit trail
+    audit = _deliver_questions(event, reporter, questions)
+    db.add(audit)
+    db.commit()
+    
+    return {
+        "message": "Follow-up question sent" if len(questions) == 1 else "Follow-up questions sent",
+        "question_id": questions[0].id,
+        "field_name": questions[0].field_name,
+        "question_ids": [q.id for q in questions],
+        "field_names": [q.field_name for q in questions],
+        "questions_sent": len(questions),
+        "channel": audit.channel,
+        "success": audit.meta["success"]
+    }
+
+
 @router.post("/send")
-def send_followup_question(event_id: int, db: Session = Depends(get_db)):
+async def send_followup_question(event_id: int, all_fields: bool = False, db: Session = Depends(get_db)):
     """
     Generate and send micro follow-up questions for missing fields.
     
     Automatically generates contextual questions based on missing fields.
+    
+    - **all_fields**: ask about every missing field in one message (one AI call)
+      instead of only the first one
     """
     try:
-        event = db.query(Event).filter(Event.id == event_id).first()
-        if not event:
-            raise HTTPException(status_code=404, detail="Event not found")
+        event, reporter = await run_in_threadpool(_load_event_for_send, db, event_id)
         
         if not event.missing_fields or len(event.missing_fields) == 0:
             return {"message": "No missing fields detected", "questions_sent": 0}
         
-        reporter = event.reporter
         if not reporter:
             raise HTTPException(status_code=400, detail="No reporter associated with event")
         
-        # Get first missing field
-        field_name = event.missing_fields[0]
+        field_names = list(event.missing_fields) if all_fields else [event.missing_fields[0]]
         
-        # Prepare event context
-        event_context = {
-            "suspected_drug": event.suspected_drug,
-            "adverse_effect": event.adverse_effect
-        }
+        # Generate questions using AI
+        if len(field_names) == 1:
+            question_texts = {
+                field_names[0]: await async_ai_service.generate_micro_followup(
+                    field_name=field_names[0],
+                    event_context=_event_context(event),
+                    language=reporter.language,
+                    reporter_type=reporter.reporter_type
+                )
+            }
+        else:
+            question_texts = await async_ai_service.generate_followup_batch(
+                field_names=field_names,
+                event_context=_event_context(event),
+                language=reporter.language,
+                reporter_type=reporter.reporter_type
+            )
         
-        # Generate question using AI
-        question_text = ai_service.generate_micro_followup(
-            field_name=field_name,
-            event_context=event_context,
-            language=reporter.language,
-            reporter_type=reporter.reporter_type
-        )
+        # Messaging (Twilio / SMTP) and the database are blocking
+        result = await run_in_threadpool(_store_and_send, db, event, reporter, question_texts)
         
-        # Create secure link for answering
-        secure_token = create_secure_link(reporter.id, event.id)
-        secure_link = f"http://localhost:3000/answer?token={secure_token}"
+        logger.info(f"Follow-up questions sent for event {event_id}, fields: {field_names}")
         
-        # Store question in database
-        question = FollowupQuestion(
-            event_id=event.id,
-            question_text=question_text,
-            field_name=field_name,
-            question_language=reporter.language,
-            channel=reporter.phone if reporter.phone else "email"
-        )
-        db.add(question)
-        db.commit()
-        db.refresh(question)
+        return result
         
-        # Send via messaging service
-        channel = "whatsapp" if reporter.phone else "email"
-        contact = reporter.phone if reporter.phone else reporter.email
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error sending follow-up question: {str(e)}")
+        await run_in_threadpool(db.rollback)
+        raise HTTPException(status_code=500, detail="Failed to send follow-up question")
+
+
+def _load_events_for_bulk_send(db: Session, event_ids: List[int]) -> List[Event]:
+    """Load events with their reporters."""
+    return db.query(Event).options(joinedload(Event.reporter)).filter(Event.id.in_(event_ids)).all()
+
+
+def _store_and_send_bulk(db: Session, events: List[Event], texts_by_event: Dict[int, Dict[str, str]]) -> List[Dict[str, Any]]:
+    """
+    Store generated questions for many events, send one message per event and
+    commit (blocking; run via run_in_threadpool).
+    
+    Returns:
+        Per-event delivery results, for events that got at least one question
+    """
+    # Store every question in one bulk insert
+    questions_by_event = {
+        event.id: _build_questions(event, event.reporter, texts_by_event.get(event.id, {}))
+        for event in events
+    }
+    db.add_all([q for questions in questions_by_event.values() for q in questions])
+    db.flush()
+    
+    # Send one message per event and log audit trail
+    audits = [
+        _deliver_questions(event, event.reporter, questions_by_event[event.id])
+        for event in events
+        if questions_by_event[event.id]
+    ]
+    db.add_all(audits)
+    db.commit()
+    
+    return [
+        {
+            "event_id": audit.event_id,
+            "question_ids": audit.meta["question_ids"],
+            "channel": audit.channel,
+            "success": audit.meta["success"]
+        }
+        for audit in audits
+    ]
+
+
+@router.post("/send-bulk")
+async def send_followup_questions_bulk(request: FollowupBulkSendRequest, db: Session = Depends(get_db)):
+    """
+    Generate and send follow-up questions for every missing field of many events.
+    
+    Events are grouped by reporter language and type; each group costs one AI
+    call, and all questions are stored in one bulk insert.
+    """
+    try:
+        events = await run_in_threadpool(_load_events_for_bulk_send, db, request.event_ids)
         
-        success = messaging_service.send_followup_question(
-            to=contact,
-            question=question_text,
-            channel=channel,
-            secure_link=secure_link
-        )
+        # Group events that can share one prompt
+        groups: Dict[Tuple[str, str], List[Event]] = defaultdict(list)
+        skipped = []
+        for event in events:
+            if not event.reporter or not event.missing_fields:
+                skipped.append(event.id)
+                continue
+            groups[(event.reporter.language, event.reporter.reporter_type)].append(event)
         
-        # Update event status
-        event.followup_status = "in_progress"
-        db.commit()
+        group_keys = list(groups)
+        generated = await asyncio.gather(*[
+            async_ai_service.generate_followup_batch_for_events(
+                [
+                    {"event_id": event.id, "missing_fields": list(event.missing_fields), **_event_context(event)}
+                    for event in groups[key]
+                ],
+                language=key[0],
+                reporter_type=key[1]
+            )
+            for key in group_keys
+        ])
         
-        # Log audit trail
-        audit = AuditLog(
-            event_id=event.id,
-            reporter_id=reporter.id,
-            action="FOLLOWUP_SENT",
-            channel=channel,
-            meta={
-                "field_name": field_name,
-                "question_id": question.id,
-                "success": success
-            }
+        texts_by_event: Dict[int, Dict[str, str]] = {}
+        for texts in generated:
+            texts_by_event.update(texts)
+        not_found = sorted(set(request.event_ids) - {event.id for event in events})
+        
+        # Messaging (Twilio / SMTP) and the database are blocking
+        results = await run_in_threadpool(
+            _store_and_send_bulk, db, [event for key in group_keys for event in groups[key]], texts_by_event
         )
-        db.add(audit)
-        db.commit()
         
-        logger.info(f"Follow-up question sent for event {event_id}, field: {field_name}")
+        questions_sent = sum(len(result["question_ids"]) for result in results)
+        logger.info(f"Bulk follow-up sent: {questions_sent} questions for {len(results)} events in {len(group_keys)} AI calls")
         
         return {
-            "message": "Follow-up question sent",
-            "question_id": question.id,
-            "field_name": field_name,
-            "channel": channel,
-            "success": success
+            "message": "Follow-up questions sent",
+            "events": len(results),
+            "questions_sent": questions_sent,
+            "skipped_event_ids": skipped,
+            "not_found_event_ids": not_found,
+            "results": results
         }
         
-    except HTTPException:
-        raise
     except Exception as e:
-        logger.error(f"Error sending follow-up question: {str(e)}")
-        raise HTTPException(status_code=500, detail="Failed to send follow-up question")
+        logger.error(f"Error sending bulk follow-up questions: {str(e)}")
+        await run_in_threadpool(db.rollback)
+        raise HTTPException(status_code=500, detail="Failed to send follow-up questions")
 
 
 @router.post("/answer")
-def answer_followup_question(request: FollowupAnswerRequest, db: Session = Depends(get_db)):
+def answer_followup_question(
+    request: FollowupAnswerRequest,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db)
+):
     """
     Submit answer to a follow-up question.
     
@@ -149,14 +325,24 @@ def answer_followup_question(request: FollowupAnswerRequest, db: Session = Depen
         if event and question.field_name:
             # Set the field value on the event
             setattr(event, question.field_name, request.answer_text)
+            if question.field_name in ("suspected_drug", "adverse_effect"):
+                for column, value in terminology_service.code_event(event.suspected_drug, event.adverse_effect).items():
+                    setattr(event, column, value)
             
-            # Remove from missing fields
+            # Remove from missing fields (reassigned so the JSONB change is persisted)
             if event.missing_fields and question.field_name in event.missing_fields:
-                event.missing_fields.remove(question.field_name)
+                event.missing_fields = [f for f in event.missing_fields if f != question.field_name]
+                
+                # Follow-up is complete once nothing is missing
+                if not event.missing_fields:
+                    event.followup_status = "completed"
+                    event.completed_at = datetime.now(timezone.utc)
+            
+            # The stored narrative no longer reflects the event
+            narrative_service.invalidate(db, event.id)
             
-            # Recalculate risk if needed
-            from app.services.risk_service import risk_service
-            risk_service.calculate_and_update_risk(db, event.id)
+            # Recalculate risk once committed, if the answer changed its inputs
+            background_tasks.add_task(_refresh_risk, event.id)
         
         db.commit()
         
@@ -1,18 +1,30 @@
 """Report routes for adverse event submission."""
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from app.core.database import get_db
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.core.database import get_db, SessionLocal
 from app.models.schemas import (
     ReporterCreate, ReporterResponse,
     EventCreate, EventResponse,
     MissingFieldsResponse,
+    EnrichmentStatusResponse,
+    DuplicateCandidatesResponse,
     RegulatoryNarrative
 )
-from app.models.database import Reporter, Event, AuditLog
+from app.models.database import Reporter, Event, AuditLog, Narrative
 from app.services.risk_service import risk_service
-from app.services.ai_service import ai_service
-from typing import List
+from app.services.ai_service import async_ai_service
+from app.services.enrichment_service import enrichment_service
+from app.services.ingest_service import bulk_ingest_service, CONTENT_TYPES
+from app.services.e2b_service import e2b_service
+from app.services.narrative_service import narrative_service, narrative_inputs
+from app.services.terminology_service import terminology_service
+from app.services.duplicate_service import duplicate_service
+from typing import Any, Dict, List, Optional, Tuple
 from datetime import datetime
+import json
 import logging
 
 logger = logging.getLogger(__name__)
@@ -60,40 +72,51 @@ def initialize_report(event: EventCreate, db: Session = Depends(get_db)):
     """
     Initialize a new adverse event report.
     
-    Accepts initial event data, detects missing fields, and calculates risk score.
+    Persists the event and queues missing-field detection and risk scoring
+    for the background enrichment workers, so the reporter gets an answer
+    without waiting on the model. Poll `/report/event/{id}/enrichment` for
+    the result.
     """
     try:
-        # Create event
-        db_event = Event(**event.model_dump())
+        # Create event with its drug and reaction normalized
+        record = {
+            **event.model_dump(),
+            **terminology_service.code_event(event.suspected_drug, event.adverse_effect)
+        }
+        db_event = Event(**record)
         db_event.followup_status = "pending"
         
         db.add(db_event)
-        db.commit()
-        db.refresh(db_event)
+        db.flush()
         
-        # Detect missing fields using AI
-        missing_fields = risk_service.detect_and_store_missing_fields(db, db_event.id)
+        # A resubmitted case points at the original and is not enriched again
+        duplicate = None
+        if settings.DUPLICATE_DETECTION_ENABLED:
+            duplicate = duplicate_service.detect(db, [db_event.id], [record]).get(db_event.id)
         
-        # Calculate risk score
-        risk_assessment = risk_service.calculate_and_update_risk(db, db_event.id)
+        if duplicate:
+            db_event.duplicate_of, db_event.duplicate_score = duplicate
+            db_event.duplicate_status = "suspected"
+            db_event.enrichment_status = "skipped"
+            meta = {"enrichment": "skipped", "duplicate_of": duplicate[0], "similarity": duplicate[1]}
+        else:
+            # Queue AI enrichment in the same transaction as the event
+            meta = {"enrichment": "queued", "priority": enrichment_service.enqueue(db, db_event).priority}
         
         # Log audit trail
         audit = AuditLog(
             event_id=db_event.id,
             reporter_id=db_event.reporter_id,
             action="EVENT_CREATED",
-            meta={
-                "risk_class": db_event.risk_class,
-                "missing_fields_count": len(db_event.missing_fields or [])
-            }
+            meta=meta
         )
         db.add(audit)
         db.commit()
-        
-        # Refresh to get updated data
         db.refresh(db_event)
+        if not duplicate:
+            enrichment_service.notify()
         
-        logger.info(f"Event initialized: {db_event.id}, risk: {db_event.risk_class}")
+        logger.info(f"Event initialized: {db_event.id}, {meta}")
         return db_event
         
     except Exception as e:
@@ -102,6 +125,93 @@ def initialize_report(event: EventCreate, db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail="Failed to initialize report")
 
 
+@router.post("/bulk")
+async def bulk_ingest(request: Request, db: Session = Depends(get_db)):
+    """
+    Ingest a batch of adverse event reports in one request.
+    
+    The body is streamed as NDJSON (`application/x-ndjson`, one EventCreate
+    object per line) or CSV (`text/csv`, header row of EventCreate field
+    names). Records are validated and inserted in chunks of
+    BULK_INGEST_CHUNK_SIZE and queued for background enrichment.
+    
+    Responds with an NDJSON manifest: one line per record with its line
+    number and status (`created` with `event_id`, `invalid`, `rejected` or
+    `failed` with `errors`), then a final `summary` line.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    fmt = CONTENT_TYPES.get(content_type)
+    if not fmt:
+        raise HTTPException(
+            status_code=415,
+            detail=f"Unsupported content type; use one of {', '.join(CONTENT_TYPES)}"
+        )
+    
+    try:
+        manifest, summary = await bulk_ingest_service.ingest(db, request.stream(), fmt)
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="Body must be UTF-8 encoded")
+    except Exception as e:
+        logger.error(f"Error ingesting bulk reports: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to ingest reports")
+    
+    def manifest_lines():
+        for entry in manifest:
+            yield json.dumps(entry) + "\n"
+        yield json.dumps({"summary": summary}) + "\n"
+    
+    return StreamingResponse(manifest_lines(), media_type="application/x-ndjson")
+
+
+@router.post("/e2b/import")
+async def import_e2b(request: Request, db: Session = Depends(get_db)):
+    """
+    Import an ICH E2B(R3) ICSR batch (`application/xml`).
+    
+    The XML is parsed incrementally as it is uploaded, and cases are mapped
+    onto events and reporters (matched by email or phone). They are inserted
+    in chunks and queued for background enrichment.
+    
+    Responds with an NDJSON manifest: one line per case with its position,
+    safety report id (C.1.1) and status, then a final `summary` line.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if content_type not in ("application/xml", "text/xml", "application/hl7-v3+xml"):
+        raise HTTPException(status_code=415, detail="E2B(R3) import expects application/xml")
+    
+    try:
+        manifest, summary = await e2b_service.import_batch(db, request.stream())
+    except Exception as e:
+        logger.error(f"Error importing E2B batch: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to import E2B batch")
+    
+    def manifest_lines():
+        for entry in manifest:
+            yield json.dumps(entry) + "\n"
+        yield json.dumps({"summary": summary}) + "\n"
+    
+    return StreamingResponse(manifest_lines(), media_type="application/x-ndjson")
+
+
+@router.get("/e2b/export")
+def export_e2b(date_from: Optional[datetime] = None, date_to: Optional[datetime] = None):
+    """
+    Export events as an ICH E2B(R3) ICSR batch.
+    
+    Cases are read through a server-side cursor and streamed as they are
+    serialized, so exports of any size use constant memory.
+    
+    - **date_from**: only events created at or after this time
+    - **date_to**: only events created before this time
+    """
+    filename = f"icsr-batch-{datetime.utcnow().strftime('%Y%m%d%H%M%S')}.xml"
+    return StreamingResponse(
+        e2b_service.export_batch(date_from, date_to),
+        media_type="application/xml",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
 @router.get("/event/{event_id}", response_model=EventResponse)
 def get_event(event_id: int, db: Session = Depends(get_db)):
     """Get event details by ID."""
@@ -111,15 +221,116 @@ def get_event(event_id: int, db: Session = Depends(get_db)):
     return event
 
 
+@router.get("/event/{event_id}/enrichment", response_model=EnrichmentStatusResponse)
+def get_enrichment_status(event_id: int, db: Session = Depends(get_db)):
+    """Get the background enrichment status of an event and its jobs."""
+    result = enrichment_service.status(db, event_id)
+    if "error" in result:
+        raise HTTPException(status_code=404, detail=result["error"])
+    return result
+
+
+@router.get("/event/{event_id}/duplicates", response_model=DuplicateCandidatesResponse)
+def get_duplicate_candidates(event_id: int, min_similarity: float = Query(0.5, ge=0, le=1), db: Session = Depends(get_db)):
+    """
+    List recent events similar to an event, most similar first.
+    
+    Similarity is the Jaccard similarity of the events' normalized fields
+    and free-text words, estimated from their MinHash signatures.
+    """
+    event = db.query(Event).filter(Event.id == event_id).first()
+    if not event:
+        raise HTTPException(status_code=404, detail="Event not found")
+    
+    try:
+        return {
+            "event_id": event.id,
+            "duplicate_of": event.duplicate_of,
+            "duplicate_status": event.duplicate_status,
+            "candidates": duplicate_service.candidates(db, event, min_similarity)
+        }
+    except Exception as e:
+        logger.error(f"Error finding duplicates of event {event_id}: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to find duplicates")
+
+
+@router.post("/event/{event_id}/not-duplicate", response_model=EventResponse)
+def mark_not_duplicate(event_id: int, db: Session = Depends(get_db)):
+    """
+    Clear a suspected duplicate after review and queue its enrichment.
+    
+    The event is kept out of later duplicate scans.
+    """
+    event = db.query(Event).filter(Event.id == event_id).first()
+    if not event:
+        raise HTTPException(status_code=404, detail="Event not found")
+    
+    try:
+        original = event.duplicate_of
+        event.duplicate_of = None
+        event.duplicate_status = "not_duplicate"
+        meta = {"duplicate_of": original}
+        if event.enrichment_status == "skipped":
+            meta["priority"] = enrichment_service.enqueue(db, event).priority
+        
+        db.add(AuditLog(
+            event_id=event.id,
+            reporter_id=event.reporter_id,
+            action="DUPLICATE_CLEARED",
+            meta=meta
+        ))
+        db.commit()
+        db.refresh(event)
+        enrichment_service.notify()
+        return event
+        
+    except Exception as e:
+        logger.error(f"Error clearing duplicate flag of event {event_id}: {str(e)}")
+        db.rollback()
+        raise HTTPException(status_code=500, detail="Failed to clear duplicate flag")
+
+
+def _run_duplicate_scan(batch_size: int) -> None:
+    """Deduplicate stored events in the background with a session of its own."""
+    db = SessionLocal()
+    try:
+        duplicate_service.scan(db, batch_size)
+        duplicate_service.rebuild(db)
+    except Exception as e:
+        logger.error(f"Error scanning for duplicate events: {str(e)}")
+    finally:
+        db.close()
+
+
+@router.post("/duplicates/scan", status_code=202)
+async def scan_duplicates(background_tasks: BackgroundTasks, batch_size: int = 10000):
+    """
+    Deduplicate all stored events, e.g. a backlog loaded before detection was enabled.
+    
+    Runs after the response is sent. Events not yet checked that match an
+    earlier one within DUPLICATE_WINDOW_DAYS are flagged as suspected
+    duplicates of its original case; their enrichment is left as it is.
+    """
+    background_tasks.add_task(_run_duplicate_scan, batch_size)
+    return {"status": "accepted"}
+
+
+def _commit_audit(db: Session, audit: AuditLog) -> None:
+    """Store an audit entry (blocking; async routes call it via run_in_threadpool)."""
+    db.add(audit)
+    db.commit()
+
+
 @router.post("/missing-fields/{event_id}", response_model=MissingFieldsResponse)
-def detect_missing_fields(event_id: int, db: Session = Depends(get_db)):
+async def detect_missing_fields(event_id: int, db: Session = Depends(get_db)):
     """
     Detect missing regulatory-relevant fields for an event.
     
-    Uses AI to analyze the event and identify required and optional missing fields.
+    Applies the ICH E2B(R3) completeness rules in-process and only consults AI
+    for free-text values the rules cannot judge.
     """
     try:
-        result = risk_service.detect_and_store_missing_fields(db, event_id)
+        result = await risk_service.detect_and_store_missing_fields_async(db, event_id)
         
         if "error" in result:
             raise HTTPException(status_code=404, detail=result["error"])
@@ -130,8 +341,7 @@ def detect_missing_fields(event_id: int, db: Session = Depends(get_db)):
             action="MISSING_FIELDS_DETECTED",
             meta=result
         )
-        db.add(audit)
-        db.commit()
+        await run_in_threadpool(_commit_audit, db, audit)
         
         return result
         
@@ -142,45 +352,50 @@ def detect_missing_fields(event_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail="Failed to detect missing fields")
 
 
+def _load_narrative_context(db: Session, event_id: int, regenerate: bool) -> Tuple[Dict[str, Any], datetime, Optional[Narrative]]:
+    """
+    Load an event's narrative inputs and its current stored narrative, or raise 404
+    (blocking; async routes call it via run_in_threadpool).
+    
+    Returns:
+        Narrative inputs, the event's updated_at, and the stored narrative
+        (None when regenerating or when it is out of date)
+    """
+    event = db.query(Event).filter(Event.id == event_id).first()
+    if not event:
+        raise HTTPException(status_code=404, detail="Event not found")
+    
+    event_data = narrative_inputs(event)
+    stored = None if regenerate else narrative_service.get_current(db, event, event_data)
+    return event_data, event.updated_at, stored
+
+
 @router.get("/narrative/{event_id}", response_model=RegulatoryNarrative)
-def generate_narrative(event_id: int, db: Session = Depends(get_db)):
+async def generate_narrative(event_id: int, regenerate: bool = False, db: Session = Depends(get_db)):
     """
     Generate ICSR-ready regulatory narrative for an event.
     
-    Uses AI to create a formal pharmacovigilance summary.
+    Uses AI to create a formal pharmacovigilance summary. The stored narrative
+    is returned while the event is unchanged since it was generated.
+    
+    - **regenerate**: force a new narrative even if the stored one is current
     """
     try:
-        event = db.query(Event).filter(Event.id == event_id).first()
-        if not event:
-            raise HTTPException(status_code=404, detail="Event not found")
-        
-        # Prepare event data
-        event_data = {
-            "reporter_type": event.reporter.reporter_type if event.reporter else "unknown",
-            "suspected_drug": event.suspected_drug,
-            "dose": event.dose,
-            "frequency": event.frequency,
-            "start_date": str(event.start_date) if event.start_date else None,
-            "stop_date": str(event.stop_date) if event.stop_date else None,
-            "adverse_effect": event.adverse_effect,
-            "seriousness": event.seriousness,
-            "hospitalization": event.hospitalization,
-            "outcome": event.outcome,
-            "comorbidities": event.comorbidities,
-            "medications": event.medications
-        }
+        event_data, event_updated_at, stored = await run_in_threadpool(_load_narrative_context, db, event_id, regenerate)
+        
+        if stored:
+            return {
+                "event_id": event_id,
+                "narrative": stored.narrative,
+                "generated_at": stored.generated_at,
+                "cached": True
+            }
         
         # Generate narrative
-        narrative = ai_service.generate_regulatory_summary(event_data)
+        narrative = await async_ai_service.generate_regulatory_summary(event_data)
         
-        # Log audit trail
-        audit = AuditLog(
-            event_id=event_id,
-            action="NARRATIVE_GENERATED",
-            meta={"narrative_length": len(narrative)}
-        )
-        db.add(audit)
-        db.commit()
+        # Persist and log audit trail
+        await run_in_threadpool(narrative_service.store, db, event_id, narrative, event_data, event_updated_at)
         
         return {
             "event_id": event_id,
@@ -193,3 +408,72 @@ def generate_narrative(event_id: int, db: Session = Depends(get_db)):
     except Exception as e:
         logger.error(f"Error generating narrative: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to generate narrative")
+
+
+def _sse(event: str, data: Any) -> str:
+    """Format one Server-Sent Events message."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def _store_streamed_narrative(event_id: int, narrative: str, event_data: Dict[str, Any], event_updated_at: datetime) -> None:
+    """Persist a streamed narrative with a session of its own (blocking; run via run_in_threadpool)."""
+    # The request-scoped session may already be closed once streaming starts
+    stream_db = SessionLocal()
+    try:
+        narrative_service.store(stream_db, event_id, narrative, event_data, event_updated_at, streamed=True)
+    finally:
+        stream_db.close()
+
+
+@router.get("/narrative/{event_id}/stream")
+async def stream_narrative(event_id: int, regenerate: bool = False, db: Session = Depends(get_db)):
+    """
+    Stream the ICSR regulatory narrative as Server-Sent Events.
+    
+    Emits `token` events while the model generates, then a `done` event with the
+    full narrative once it has been persisted and audited. A failure mid-stream
+    emits an `error` event and nothing is stored. A current stored narrative is
+    sent as a single `done` event unless **regenerate** is set.
+    """
+    event_data, event_updated_at, stored = await run_in_threadpool(_load_narrative_context, db, event_id, regenerate)
+    
+    async def event_stream():
+        if stored:
+            yield _sse("done", {
+                "event_id": event_id,
+                "narrative": stored.narrative,
+                "generated_at": stored.generated_at.isoformat() if stored.generated_at else None,
+                "cached": True
+            })
+            return
+        
+        parts = []
+        try:
+            async for delta in async_ai_service.stream_regulatory_summary(event_data):
+                parts.append(delta)
+                yield _sse("token", delta)
+        except Exception as e:
+            logger.error(f"Error streaming narrative for event {event_id}: {str(e)}")
+            yield _sse("error", {"detail": "Narrative generation interrupted"})
+            return
+        
+        narrative = "".join(parts).strip()
+        
+        try:
+            await run_in_threadpool(_store_streamed_narrative, event_id, narrative, event_data, event_updated_at)
+        except Exception as e:
+            logger.error(f"Error storing streamed narrative for event {event_id}: {str(e)}")
+            yield _sse("error", {"detail": "Failed to store narrative"})
+            return
+        
+        yield _sse("done", {
+            "event_id": event_id,
+            "narrative": narrative,
+            "generated_at": datetime.utcnow().isoformat()
+        })
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
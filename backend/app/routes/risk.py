@@ -1,8 +1,8 @@
 """Risk scoring routes."""
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
 from sqlalchemy.orm import Session
-from app.core.database import get_db
-from app.models.schemas import RiskScoreResponse
+from app.core.database import get_db, SessionLocal
+from app.models.schemas import RiskScoreResponse, StoredRiskResponse
 from app.services.risk_service import risk_service
 import logging
 
@@ -11,15 +11,17 @@ logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/risk", tags=["Risk"])
 
 
-@router.get("/score/{event_id}", response_model=RiskScoreResponse)
+@router.get("/score/{event_id}", response_model=StoredRiskResponse)
 def get_risk_score(event_id: int, db: Session = Depends(get_db)):
     """
-    Calculate and retrieve risk score for an event.
+    Retrieve the stored risk score for an event.
     
-    Returns risk score (0-100), classification, and hospitalization/mortality probabilities.
+    Read-only: returns the last computed score, classification, probabilities
+    and reasoning, with `stale` set when there is no score yet or the scoring
+    inputs changed since it was computed. Use POST to recompute.
     """
     try:
-        result = risk_service.calculate_and_update_risk(db, event_id)
+        result = risk_service.get_stored_risk(db, event_id)
         
         if "error" in result:
             raise HTTPException(status_code=404, detail=result["error"])
@@ -30,4 +32,49 @@ def get_risk_score(event_id: int, db: Session = Depends(get_db)):
         raise
     except Exception as e:
         logger.error(f"Error getting risk score: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to get risk score")
+
+
+@router.post("/score/{event_id}", response_model=RiskScoreResponse)
+async def recompute_risk_score(event_id: int, db: Session = Depends(get_db)):
+    """
+    Recalculate and store the risk score for an event.
+    
+    Returns risk score (0-100), classification, and hospitalization/mortality probabilities.
+    """
+    try:
+        result = await risk_service.calculate_and_update_risk_async(db, event_id)
+        
+        if "error" in result:
+            raise HTTPException(status_code=404, detail=result["error"])
+        
+        return result
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error calculating risk score: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to calculate risk score")
+
+
+def _run_rescore(batch_size: int = None) -> None:
+    """Rescore open events in the background with a session of its own."""
+    db = SessionLocal()
+    try:
+        risk_service.rescore_open_events(db, batch_size)
+    except Exception as e:
+        logger.error(f"Error rescoring open events: {str(e)}")
+    finally:
+        db.close()
+
+
+@router.post("/rescore", status_code=202)
+async def rescore_open_events(background_tasks: BackgroundTasks, batch_size: int = None):
+    """
+    Rescore all open events with the local risk model.
+
+    Runs after the response is sent; results are written back in batched
+    UPDATEs and escalations follow the usual high/critical rule.
+    """
+    background_tasks.add_task(_run_rescore, batch_size)
+    return {"status": "accepted"}
@@ -0,0 +1,62 @@
+"""Search routes for finding cases."""
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from app.core.database import get_db
+from app.models.schemas import EventSearchResponse, RiskClass
+from app.services.search_service import search_service, SORTS
+from datetime import datetime
+from typing import Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/search", tags=["Search"])
+
+FOLLOWUP_STATUSES = ("pending", "in_progress", "completed", "escalated")
+
+
+@router.get("/events", response_model=EventSearchResponse)
+def search_events(
+    q: str = Query(..., min_length=1, max_length=200),
+    risk_class: Optional[RiskClass] = None,
+    status: Optional[str] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    sort: str = "relevance",
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Search events by drug, adverse effect, comorbidities, medications and follow-up answers.
+    
+    Words match as prefixes ("ibupro" finds ibuprofen), the whole query also
+    as a substring, and misspellings by trigram similarity.
+    
+    - **q**: search text
+    - **risk_class** / **status**: filter by risk class / follow-up status
+    - **date_from** / **date_to**: creation time range, [from, to)
+    - **sort**: 'relevance' (best match first) or 'recent' (newest first)
+    - **cursor**: `next_cursor` of the previous page
+    """
+    if sort not in SORTS:
+        raise HTTPException(status_code=400, detail="sort must be 'relevance' or 'recent'")
+    if status and status not in FOLLOWUP_STATUSES:
+        raise HTTPException(status_code=400, detail=f"status must be one of {', '.join(FOLLOWUP_STATUSES)}")
+    
+    try:
+        return search_service.search(
+            db, q,
+            risk_class=risk_class.value if risk_class else None,
+            status=status,
+            date_from=date_from,
+            date_to=date_to,
+            sort=sort,
+            limit=limit,
+            cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error searching events: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to search events")
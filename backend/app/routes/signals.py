@@ -0,0 +1,67 @@
+"""Signal detection routes."""
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from app.core.database import get_db
+from app.models.schemas import SignalListResponse
+from app.services.signal_service import signal_service, METHODS
+from typing import Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/signals", tags=["Signals"])
+
+
+@router.get("", response_model=SignalListResponse)
+def get_signals(
+    method: str = "ic",
+    drug: Optional[str] = None,
+    adverse_effect: Optional[str] = None,
+    min_count: int = Query(3, ge=1),
+    signals_only: bool = True,
+    limit: int = Query(50, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+    refresh: bool = False,
+    db: Session = Depends(get_db)
+):
+    """
+    Rank drug-event pairs by disproportionality.
+
+    Every pair carries PRR and ROR with 95% confidence intervals, the
+    information component (IC) with its 95% credibility interval and the
+    Yates chi-square. Pairs are ranked by the lower bound of the chosen
+    measure.
+
+    - **method**: 'prr' (a >= 3, PRR >= 2, chi-square >= 4), 'ror' (a >= 3, lower bound > 1) or 'ic' (IC025 > 0)
+    - **drug** / **adverse_effect**: case-insensitive substring filters
+    - **min_count**: smallest number of reports for the pair
+    - **signals_only**: only pairs meeting the method's criteria
+    - **refresh**: recompute instead of using the cached table
+    """
+    if method not in METHODS:
+        raise HTTPException(status_code=400, detail="method must be 'prr', 'ror' or 'ic'")
+
+    try:
+        table = signal_service.table(db, refresh=refresh)
+        matches, signals = table.query(method, drug, adverse_effect, min_count, signals_only, limit, offset)
+        return {
+            "method": method,
+            "total_reports": table.total,
+            "matches": matches,
+            "computed_at": table.computed_at,
+            "signals": signals
+        }
+    except Exception as e:
+        logger.error(f"Error computing signals: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to compute signals")
+
+
+@router.post("/reconcile")
+def reconcile_signal_counts(db: Session = Depends(get_db)):
+    """Rebuild the drug-event pair counts from the events table."""
+    try:
+        return {"pairs": signal_service.reconcile(db)}
+    except Exception as e:
+        logger.error(f"Error reconciling drug-event counts: {str(e)}")
+        db.rollback()
+        raise HTTPException(status_code=500, detail="Failed to reconcile drug-event counts")
@@ -0,0 +1,66 @@
+"""Terminology routes for drug and adverse-effect normalization."""
+from fastapi import APIRouter, BackgroundTasks, HTTPException
+from app.core.database import SessionLocal
+from app.models.schemas import TerminologyLookupRequest, TerminologyLookupResponse
+from app.services.terminology_service import terminology_service
+import logging
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/terminology", tags=["Terminology"])
+
+
+@router.get("")
+def get_terminology():
+    """Version and size of the loaded terminology dictionary."""
+    terminology_service.maybe_reload()
+    return terminology_service.stats()
+
+
+@router.post("/normalize", response_model=TerminologyLookupResponse)
+def normalize_terms(request: TerminologyLookupRequest):
+    """
+    Resolve drug and adverse-effect names to canonical terms and codes.
+
+    Each name is matched exactly, then by the longest known term it
+    contains, then with typo tolerance; unresolved names come back as null.
+    """
+    drugs = [terminology_service.normalize_drug(name) for name in request.drugs]
+    reactions = [terminology_service.normalize_reaction(name) for name in request.adverse_effects]
+    return {
+        "drugs": [match._asdict() if match else None for match in drugs],
+        "adverse_effects": [match._asdict() if match else None for match in reactions]
+    }
+
+
+@router.post("/reload")
+def reload_terminology():
+    """Reload the dictionary file now instead of waiting for the change check."""
+    try:
+        return terminology_service.load()
+    except Exception as e:
+        logger.error(f"Error reloading terminology: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to reload terminology")
+
+
+def _run_recode(batch_size: int) -> None:
+    """Re-normalize events in the background with a session of its own."""
+    db = SessionLocal()
+    try:
+        terminology_service.recode_events(db, batch_size)
+    except Exception as e:
+        logger.error(f"Error re-normalizing events: {str(e)}")
+    finally:
+        db.close()
+
+
+@router.post("/recode", status_code=202)
+async def recode_events(background_tasks: BackgroundTasks, batch_size: int = 1000):
+    """
+    Re-normalize stored events against the current dictionary.
+
+    Runs after the response is sent; only events whose codes change are
+    updated, and the signal-detection counts follow through their triggers.
+    """
+    background_tasks.add_task(_run_recode, batch_size)
+    return {"status": "accepted"}
@@ -1,12 +1,37 @@
 """Package initialization for services module."""
-from app.services.ai_service import ai_service
+from app.services.ai_service import ai_service, async_ai_service
 from app.services.otp_service import otp_service
 from app.services.messaging_service import messaging_service
 from app.services.risk_service import risk_service
+from app.services.completeness_service import completeness_service
+from app.services.local_risk_model import local_risk_model
+from app.services.enrichment_service import enrichment_service
+from app.services.ingest_service import bulk_ingest_service
+from app.services.e2b_service import e2b_service
+from app.services.metrics_service import metrics_service
+from app.services.rollup_service import rollup_service
+from app.services.signal_service import signal_service
+from app.services.terminology_service import terminology_service
+from app.services.duplicate_service import duplicate_service
+from app.services.search_service import search_service
+from app.services.worklist_service import worklist_service
 
 __all__ = [
     "ai_service",
+    "async_ai_service",
     "otp_service",
     "messaging_service",
-    "risk_service"
+    "risk_service",
+    "completeness_service",
+    "local_risk_model",
+    "enrichment_service",
+    "bulk_ingest_service",
+    "e2b_service",
+    "metrics_service",
+    "rollup_service",
+    "signal_service",
+    "terminology_service",
+    "duplicate_service",
+    "search_service",
+    "worklist_service"
 ]
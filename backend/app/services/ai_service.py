@@ -1,32 +1,85 @@
 """AI service for OpenAI integration and pharmacovigilance automation."""
-from openai import OpenAI
+from openai import OpenAI, AsyncOpenAI, APIConnectionError, APITimeoutError, InternalServerError, RateLimitError
 from app.core.config import settings
-from typing import Dict, List, Any, Optional
+from app.core.cache import llm_cache
+from app.core.resilience import CircuitBreaker, RetryPolicy
+from app.core.telemetry import ai_telemetry
+from app.services.question_library import question_library
+from app.services.local_risk_model import local_risk_model
+from typing import AsyncIterator, Dict, List, Any, Optional, Tuple
+import asyncio
 import json
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 
-# Initialize OpenAI client
-client = OpenAI(api_key=settings.OPENAI_API_KEY)
+# Initialize OpenAI clients; retries are handled by openai_policy, not the SDK
+_client_options = dict(
+    api_key=settings.OPENAI_API_KEY,
+    base_url=settings.OPENAI_BASE_URL or None,
+    timeout=settings.OPENAI_TIMEOUT_SECONDS,
+    max_retries=0
+)
+client = OpenAI(**_client_options)
+async_client = AsyncOpenAI(**_client_options)
 
+# Transient failures worth retrying; anything else (bad request, auth) fails at once
+RETRYABLE_ERRORS = (APIConnectionError, APITimeoutError, RateLimitError, InternalServerError, TimeoutError)
+
+# One breaker for both clients: they share the upstream. When it is open every
+# AIService method goes straight to its fallback without touching the network.
+openai_breaker = CircuitBreaker(
+    "openai",
+    failure_threshold=settings.OPENAI_BREAKER_FAILURE_THRESHOLD,
+    reset_timeout=settings.OPENAI_BREAKER_RESET_SECONDS
+)
+openai_policy = RetryPolicy(
+    openai_breaker,
+    max_retries=settings.OPENAI_MAX_RETRIES,
+    attempt_timeout=settings.OPENAI_TIMEOUT_SECONDS,
+    deadline=settings.OPENAI_DEADLINE_SECONDS,
+    base_delay=settings.OPENAI_RETRY_BASE_DELAY,
+    retryable=RETRYABLE_ERRORS
+)
+
+LANGUAGE_NAMES = {
+    "en": "English",
+    "es": "Spanish",
+    "fr": "French",
+    "ar": "Arabic",
+    "hi": "Hindi",
+    "zh": "Chinese",
+    "pt": "Portuguese",
+    "ru": "Russian",
+    "de": "German"
+}
+
+# Conservative results returned when the model cannot be reached or parsed.
+# Risk scoring falls back to local_risk_model; these defaults fill gaps in replies.
+MISSING_FIELDS_FALLBACK = {
+    "required_fields": [],
+    "optional_fields": [],
+    "risk_reasoning": "Error analyzing fields"
+}
+
+RISK_SCORE_FALLBACK = {
+    "score": 50,
+    "hospitalization_risk": 0.3,
+    "mortality_risk": 0.1,
+    "class": "medium",
+    "reasoning": "Unable to complete automated assessment"
+}
+
+TRIAGE_FALLBACK = {**MISSING_FIELDS_FALLBACK, **RISK_SCORE_FALLBACK}
+
+NARRATIVE_FALLBACK = "Automated narrative generation unavailable. Manual review required."
+
+
+def build_missing_fields_prompt(event_data: Dict[str, Any]) -> str:
+    """Build the missing-field detection prompt for an event."""
+    return f"""You are a pharmacovigilance data auditor analyzing adverse event reports.
 
-class AIService:
-    """AI service for pharmacovigilance automation."""
-    
-    @staticmethod
-    def detect_missing_fields(event_data: Dict[str, Any]) -> Dict[str, Any]:
-        """
-        Analyze adverse event report and detect missing regulatory-relevant fields.
-        
-        Args:
-            event_data: Dictionary containing event information
-            
-        Returns:
-            Dictionary with required_fields, optional_fields, and risk_reasoning
-        """
-        prompt = f"""You are a pharmacovigilance data auditor analyzing adverse event reports.
-        
 Analyze this adverse event report and list missing regulatory-relevant fields:
 
 EVENT DATA:
@@ -50,63 +103,19 @@ Return ONLY valid JSON with this exact structure:
 }}
 
 Focus on ICH E2B(R3) regulatory requirements."""
-        
-        try:
-            response = client.chat.completions.create(
-                model=settings.OPENAI_MODEL,
-                messages=[{"role": "user", "content": prompt}],
-                temperature=settings.OPENAI_TEMPERATURE,
-                max_tokens=500
-            )
-            
-            content = response.choices[0].message.content.strip()
-            # Parse JSON from response
-            result = json.loads(content)
-            return result
-            
-        except Exception as e:
-            logger.error(f"Error detecting missing fields: {str(e)}")
-            return {
-                "required_fields": [],
-                "optional_fields": [],
-                "risk_reasoning": "Error analyzing fields"
-            }
-    
-    @staticmethod
-    def generate_micro_followup(
-        field_name: str,
-        event_context: Dict[str, Any],
-        language: str = "en",
-        reporter_type: str = "patient"
-    ) -> str:
-        """
-        Generate a single, 20-second micro follow-up question.
-        
-        Args:
-            field_name: The missing field to ask about
-            event_context: Context from the event
-            language: Target language code
-            reporter_type: 'patient' or 'hcp'
-            
-        Returns:
-            Generated question text
-        """
-        language_names = {
-            "en": "English",
-            "es": "Spanish",
-            "fr": "French",
-            "ar": "Arabic",
-            "hi": "Hindi",
-            "zh": "Chinese",
-            "pt": "Portuguese",
-            "ru": "Russian",
-            "de": "German"
-        }
-        
-        lang_name = language_names.get(language, "English")
-        audience = "patient in simple, non-medical language" if reporter_type == "patient" else "healthcare professional"
-        
-        prompt = f"""Generate a single, 20-second follow-up question for {audience} in {lang_name}.
+
+
+def build_micro_followup_prompt(
+    field_name: str,
+    event_context: Dict[str, Any],
+    language: str = "en",
+    reporter_type: str = "patient"
+) -> str:
+    """Build the micro follow-up question prompt for a single missing field."""
+    lang_name = LANGUAGE_NAMES.get(language, "English")
+    audience = "patient in simple, non-medical language" if reporter_type == "patient" else "healthcare professional"
+
+    return f"""Generate a single, 20-second follow-up question for {audience} in {lang_name}.
 
 CONTEXT:
 - Missing field: {field_name}
@@ -127,33 +136,124 @@ Example format for English:
 🛡️ This is secure — we never ask for payment or personal financial information."
 
 Generate the question now:"""
-        
-        try:
-            response = client.chat.completions.create(
-                model=settings.OPENAI_MODEL,
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.7,  # Slightly higher for creative questions
-                max_tokens=200
-            )
-            
-            return response.choices[0].message.content.strip()
-            
-        except Exception as e:
-            logger.error(f"Error generating follow-up question: {str(e)}")
-            return f"We need information about: {field_name}. Can you provide this detail?"
-    
-    @staticmethod
-    def calculate_risk_score(event_data: Dict[str, Any]) -> Dict[str, Any]:
-        """
-        Calculate risk score and classification for an adverse event.
-        
-        Args:
-            event_data: Dictionary containing event information
-            
-        Returns:
-            Dictionary with score, hospitalization_risk, mortality_risk, class, reasoning
-        """
-        prompt = f"""You are a pharmacovigilance risk assessor. Analyze this adverse event and assign a severity score.
+
+
+def build_followup_batch_prompt(
+    items: List[Dict[str, Any]],
+    language: str = "en",
+    reporter_type: str = "patient"
+) -> str:
+    """
+    Build one prompt that asks for a micro follow-up question per item.
+
+    Each item carries a key, the missing field name and its event's drug and
+    effect, so fields from one event or from many events share a completion.
+    """
+    lang_name = LANGUAGE_NAMES.get(language, "English")
+    audience = "patient in simple, non-medical language" if reporter_type == "patient" else "healthcare professional"
+    lines = "\n".join(
+        f"- key: {item['key']} | missing field: {item['field_name']} | "
+        f"suspected drug: {item.get('suspected_drug') or 'medication'} | "
+        f"adverse effect: {item.get('adverse_effect') or 'reaction'}"
+        for item in items
+    )
+
+    return f"""Generate one 20-second follow-up question per item below, for a {audience}, in {lang_name}.
+
+ITEMS:
+{lines}
+
+REQUIREMENTS FOR EVERY QUESTION:
+- ONE question only
+- Takes ≤20 seconds to answer
+- Reassuring, trusted tone
+- Non-threatening
+- Add one scam-safety reassurance sentence
+- Language: {lang_name}
+
+Return ONLY valid JSON with this exact structure, one entry per item key:
+{{
+  "questions": [
+    {{"key": "item key", "question": "question text"}}
+  ]
+}}"""
+
+
+def _followup_fallback(field_name: str) -> str:
+    """Static question used when generation fails."""
+    return f"We need information about: {field_name}. Can you provide this detail?"
+
+
+def _followup_batch_items(events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Flatten events with missing fields into keyed prompt items."""
+    return [
+        {
+            "key": f"{event['event_id']}:{field_name}",
+            "event_id": event["event_id"],
+            "field_name": field_name,
+            "suspected_drug": event.get("suspected_drug"),
+            "adverse_effect": event.get("adverse_effect")
+        }
+        for event in events
+        for field_name in event["missing_fields"]
+    ]
+
+
+def _library_questions(
+    items: List[Dict[str, Any]],
+    language: str,
+    reporter_type: str
+) -> Tuple[Dict[int, Dict[str, str]], List[Dict[str, Any]]]:
+    """Answer batch items from the question library; return hits and the items still to generate."""
+    result: Dict[int, Dict[str, str]] = {}
+    remaining = []
+    for item in items:
+        question = _library_question(item["field_name"], item, language, reporter_type)
+        if question is None:
+            remaining.append(item)
+        else:
+            result.setdefault(item["event_id"], {})[item["field_name"]] = question
+    return result, remaining
+
+
+def _library_question(field_name: str, event_context: Dict[str, Any], language: str, reporter_type: str) -> Optional[str]:
+    """Render a question from the library when it is enabled."""
+    if not settings.QUESTION_LIBRARY_ENABLED:
+        return None
+    return question_library.render(field_name, event_context, language, reporter_type)
+
+
+def _merge_followups(base: Dict[int, Dict[str, str]], extra: Dict[int, Dict[str, str]]) -> Dict[int, Dict[str, str]]:
+    """Merge two {event_id: {field: question}} mappings."""
+    for event_id, questions in extra.items():
+        base.setdefault(event_id, {}).update(questions)
+    return base
+
+
+def _parse_followup_batch(content: str, items: List[Dict[str, Any]]) -> Dict[int, Dict[str, str]]:
+    """Map a batch completion back to {event_id: {field_name: question}}, filling gaps."""
+    generated = {
+        entry.get("key"): entry.get("question", "").strip()
+        for entry in json.loads(content).get("questions", [])
+    }
+    result: Dict[int, Dict[str, str]] = {}
+    for item in items:
+        question = generated.get(item["key"]) or _followup_fallback(item["field_name"])
+        result.setdefault(item["event_id"], {})[item["field_name"]] = question
+    return result
+
+
+def _followup_batch_fallback(items: List[Dict[str, Any]]) -> Dict[int, Dict[str, str]]:
+    """Static questions for every item of a failed batch."""
+    result: Dict[int, Dict[str, str]] = {}
+    for item in items:
+        result.setdefault(item["event_id"], {})[item["field_name"]] = _followup_fallback(item["field_name"])
+    return result
+
+
+def build_risk_score_prompt(event_data: Dict[str, Any]) -> str:
+    """Build the risk scoring prompt for an event."""
+    return f"""You are a pharmacovigilance risk assessor. Analyze this adverse event and assign a severity score.
 
 EVENT DATA:
 - Suspected drug: {event_data.get('suspected_drug', 'unknown')}
@@ -181,42 +281,53 @@ SCORING RULES:
   - medium: score 26-50
   - high: score 51-75
   - critical: score 76-100"""
-        
-        try:
-            response = client.chat.completions.create(
-                model=settings.OPENAI_MODEL,
-                messages=[{"role": "user", "content": prompt}],
-                temperature=settings.OPENAI_TEMPERATURE,
-                max_tokens=300
-            )
-            
-            content = response.choices[0].message.content.strip()
-            result = json.loads(content)
-            return result
-            
-        except Exception as e:
-            logger.error(f"Error calculating risk score: {str(e)}")
-            # Default conservative risk assessment
-            return {
-                "score": 50,
-                "hospitalization_risk": 0.3,
-                "mortality_risk": 0.1,
-                "class": "medium",
-                "reasoning": "Unable to complete automated assessment"
-            }
-    
-    @staticmethod
-    def generate_regulatory_summary(event_data: Dict[str, Any]) -> str:
-        """
-        Generate ICSR-ready regulatory narrative from structured data.
-        
-        Args:
-            event_data: Complete event information
-            
-        Returns:
-            Formatted regulatory narrative
-        """
-        prompt = f"""Convert this adverse event data into a formal pharmacovigilance narrative for regulatory submission (ICSR format).
+
+
+def build_triage_prompt(event_data: Dict[str, Any]) -> str:
+    """Build the combined missing-field and risk triage prompt for an event."""
+    return f"""You are a pharmacovigilance triage assistant. In one pass, audit this adverse event report for missing regulatory-relevant fields and assign a severity score.
+
+EVENT DATA:
+- Suspected drug: {event_data.get('suspected_drug', 'NOT PROVIDED')}
+- Dose: {event_data.get('dose', 'NOT PROVIDED')}
+- Frequency: {event_data.get('frequency', 'NOT PROVIDED')}
+- Start date: {event_data.get('start_date', 'NOT PROVIDED')}
+- Stop date: {event_data.get('stop_date', 'NOT PROVIDED')}
+- Adverse effect: {event_data.get('adverse_effect', 'NOT PROVIDED')}
+- Seriousness: {event_data.get('seriousness', 'NOT PROVIDED')}
+- Hospitalization: {event_data.get('hospitalization', 'NOT PROVIDED')}
+- Outcome: {event_data.get('outcome', 'NOT PROVIDED')}
+- Comorbidities: {event_data.get('comorbidities', 'NOT PROVIDED')}
+- Medications: {event_data.get('medications', 'NOT PROVIDED')}
+
+Return ONLY valid JSON with this exact structure:
+{{
+  "required_fields": ["field1", "field2"],
+  "optional_fields": ["field3", "field4"],
+  "risk_reasoning": "Brief explanation of why missing fields matter for safety assessment",
+  "score": 75,
+  "hospitalization_risk": 0.45,
+  "mortality_risk": 0.12,
+  "class": "high",
+  "reasoning": "Brief clinical reasoning for the risk assessment"
+}}
+
+MISSING FIELDS: focus on ICH E2B(R3) regulatory requirements; also list fields whose free text is too vague to be useful.
+
+SCORING RULES:
+- score: 0-100 (0=minimal, 100=critical)
+- hospitalization_risk: 0.0-1.0 probability
+- mortality_risk: 0.0-1.0 probability
+- class: "low" | "medium" | "high" | "critical"
+  - low: score 0-25
+  - medium: score 26-50
+  - high: score 51-75
+  - critical: score 76-100"""
+
+
+def build_regulatory_summary_prompt(event_data: Dict[str, Any]) -> str:
+    """Build the ICSR narrative prompt for an event."""
+    return f"""Convert this adverse event data into a formal pharmacovigilance narrative for regulatory submission (ICSR format).
 
 EVENT DATA:
 Reporter: {event_data.get('reporter_type', 'patient')}
@@ -235,21 +346,522 @@ Generate a professional, regulatory-compliant narrative following ICH E2B(R3) gu
 Use past tense, third person, and medical terminology.
 Include all relevant safety information.
 Be concise but complete (3-5 sentences)."""
-        
-        try:
-            response = client.chat.completions.create(
+
+
+def _response_format(json_output: bool) -> Dict[str, Any]:
+    """Request JSON mode for structured prompts when the model supports it."""
+    if json_output and settings.OPENAI_JSON_MODE:
+        return {"response_format": {"type": "json_object"}}
+    return {}
+
+
+def _record_completion(method: str, started: float, response: Any = None, error: Optional[Exception] = None) -> None:
+    """Report one completion (or its failure) with latency and token usage to telemetry."""
+    usage = getattr(response, "usage", None)
+    ai_telemetry.record_call(
+        method,
+        settings.OPENAI_MODEL,
+        time.perf_counter() - started,
+        outcome="ok" if error is None else type(error).__name__,
+        prompt_tokens=usage.prompt_tokens if usage else 0,
+        completion_tokens=usage.completion_tokens if usage else 0
+    )
+
+
+def _record_fallback(method: str, error: Exception) -> None:
+    """Count a fallback result, flagging replies that were not valid JSON."""
+    ai_telemetry.record_fallback(method, settings.OPENAI_MODEL, parse_failure=isinstance(error, json.JSONDecodeError))
+
+
+class AIService:
+    """AI service for pharmacovigilance automation."""
+
+    @staticmethod
+    def _complete(
+        prompt: str,
+        temperature: float,
+        max_tokens: int,
+        json_output: bool = False,
+        deadline: Optional[float] = None,
+        method: str = "completion"
+    ) -> str:
+        """
+        Run a single-prompt chat completion and return the stripped text.
+
+        Goes through openai_policy: the circuit breaker, a deadline covering
+        all attempts (settings.OPENAI_DEADLINE_SECONDS unless given) and
+        jittered retries on transient errors. Latency and token usage are
+        reported to telemetry under the calling method's name.
+        """
+        def attempt(timeout: float) -> Any:
+            return client.with_options(timeout=timeout).chat.completions.create(
                 model=settings.OPENAI_MODEL,
                 messages=[{"role": "user", "content": prompt}],
-                temperature=settings.OPENAI_TEMPERATURE,
-                max_tokens=500
+                temperature=temperature,
+                max_tokens=max_tokens,
+                **_response_format(json_output)
+            )
+
+        started = time.perf_counter()
+        try:
+            response = openai_policy.call(attempt, deadline)
+        except Exception as e:
+            _record_completion(method, started, error=e)
+            raise
+        _record_completion(method, started, response)
+        return response.choices[0].message.content.strip()
+
+    @staticmethod
+    def detect_missing_fields(event_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Analyze adverse event report and detect missing regulatory-relevant fields.
+
+        Args:
+            event_data: Dictionary containing event information
+
+        Returns:
+            Dictionary with required_fields, optional_fields, and risk_reasoning
+        """
+        cache_key = llm_cache.make_key("detect_missing_fields", event_data, settings.OPENAI_MODEL, settings.OPENAI_TEMPERATURE)
+        cached = llm_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        prompt = build_missing_fields_prompt(event_data)
+
+        try:
+            started = time.perf_counter()
+            content = AIService._complete(prompt, settings.OPENAI_TEMPERATURE, 500, json_output=True, method="detect_missing_fields")
+            # Parse JSON from response
+            result = json.loads(content)
+            llm_cache.set(cache_key, result, time.perf_counter() - started)
+            return result
+
+        except Exception as e:
+            logger.error(f"Error detecting missing fields: {str(e)}")
+            _record_fallback("detect_missing_fields", e)
+            return dict(MISSING_FIELDS_FALLBACK)
+
+    @staticmethod
+    def generate_micro_followup(
+        field_name: str,
+        event_context: Dict[str, Any],
+        language: str = "en",
+        reporter_type: str = "patient"
+    ) -> str:
+        """
+        Generate a single, 20-second micro follow-up question.
+
+        Args:
+            field_name: The missing field to ask about
+            event_context: Context from the event
+            language: Target language code
+            reporter_type: 'patient' or 'hcp'
+
+        Returns:
+            Generated question text
+        """
+        question = _library_question(field_name, event_context, language, reporter_type)
+        if question is not None:
+            return question
+
+        prompt = build_micro_followup_prompt(field_name, event_context, language, reporter_type)
+
+        try:
+            # Slightly higher temperature for creative questions
+            return AIService._complete(prompt, 0.7, 200, method="generate_micro_followup")
+
+        except Exception as e:
+            logger.error(f"Error generating follow-up question: {str(e)}")
+            _record_fallback("generate_micro_followup", e)
+            return _followup_fallback(field_name)
+
+    @staticmethod
+    def generate_followup_batch(
+        field_names: List[str],
+        event_context: Dict[str, Any],
+        language: str = "en",
+        reporter_type: str = "patient"
+    ) -> Dict[str, str]:
+        """
+        Generate micro follow-up questions for several missing fields of one event.
+
+        Args:
+            field_names: Missing fields to ask about
+            event_context: Context from the event
+            language: Target language code
+            reporter_type: 'patient' or 'hcp'
+
+        Returns:
+            Dictionary mapping field name to question text
+        """
+        event = {"event_id": 0, "missing_fields": field_names, **event_context}
+        return AIService.generate_followup_batch_for_events([event], language, reporter_type).get(0, {})
+
+    @staticmethod
+    def generate_followup_batch_for_events(
+        events: List[Dict[str, Any]],
+        language: str = "en",
+        reporter_type: str = "patient"
+    ) -> Dict[int, Dict[str, str]]:
+        """
+        Generate micro follow-up questions for many events in one completion.
+
+        All events must share the reporter language and type.
+
+        Args:
+            events: Dictionaries with event_id, missing_fields, suspected_drug, adverse_effect
+            language: Target language code
+            reporter_type: 'patient' or 'hcp'
+
+        Returns:
+            Dictionary mapping event ID to {field name: question text}
+        """
+        result, items = _library_questions(_followup_batch_items(events), language, reporter_type)
+        if not items:
+            return result
+
+        prompt = build_followup_batch_prompt(items, language, reporter_type)
+
+        try:
+            content = AIService._complete(
+                prompt, 0.7, min(150 * len(items), 4000), json_output=True, method="generate_followup_batch"
+            )
+            return _merge_followups(result, _parse_followup_batch(content, items))
+
+        except Exception as e:
+            logger.error(f"Error generating follow-up question batch: {str(e)}")
+            _record_fallback("generate_followup_batch", e)
+            return _merge_followups(result, _followup_batch_fallback(items))
+
+    @staticmethod
+    def calculate_risk_score(event_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Calculate risk score and classification for an adverse event.
+
+        Args:
+            event_data: Dictionary containing event information
+
+        Returns:
+            Dictionary with score, hospitalization_risk, mortality_risk, class, reasoning
+        """
+        cache_key = llm_cache.make_key("calculate_risk_score", event_data, settings.OPENAI_MODEL, settings.OPENAI_TEMPERATURE)
+        cached = llm_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        prompt = build_risk_score_prompt(event_data)
+
+        try:
+            started = time.perf_counter()
+            content = AIService._complete(
+                prompt, settings.OPENAI_TEMPERATURE, 300, json_output=True,
+                deadline=settings.OPENAI_RISK_DEADLINE_SECONDS, method="calculate_risk_score"
             )
-            
-            return response.choices[0].message.content.strip()
-            
+            result = json.loads(content)
+            llm_cache.set(cache_key, result, time.perf_counter() - started)
+            return result
+
+        except Exception as e:
+            logger.error(f"Error calculating risk score: {str(e)}")
+            _record_fallback("calculate_risk_score", e)
+            # Fall back to the local structured-field model
+            return local_risk_model.score(event_data)
+
+    @staticmethod
+    def triage_event(event_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Detect missing fields and score risk for an event in a single completion.
+
+        Args:
+            event_data: Dictionary containing event information
+
+        Returns:
+            Dictionary with required_fields, optional_fields, risk_reasoning,
+            score, hospitalization_risk, mortality_risk, class and reasoning
+        """
+        cache_key = llm_cache.make_key("triage_event", event_data, settings.OPENAI_MODEL, settings.OPENAI_TEMPERATURE)
+        cached = llm_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        prompt = build_triage_prompt(event_data)
+
+        try:
+            started = time.perf_counter()
+            content = AIService._complete(
+                prompt, settings.OPENAI_TEMPERATURE, 700, json_output=True,
+                deadline=settings.OPENAI_RISK_DEADLINE_SECONDS, method="triage_event"
+            )
+            result = {**TRIAGE_FALLBACK, **json.loads(content)}
+            llm_cache.set(cache_key, result, time.perf_counter() - started)
+            return result
+
+        except Exception as e:
+            logger.error(f"Error triaging event: {str(e)}")
+            _record_fallback("triage_event", e)
+            return {**MISSING_FIELDS_FALLBACK, **local_risk_model.score(event_data)}
+
+    @staticmethod
+    def generate_regulatory_summary(event_data: Dict[str, Any]) -> str:
+        """
+        Generate ICSR-ready regulatory narrative from structured data.
+
+        Args:
+            event_data: Complete event information
+
+        Returns:
+            Formatted regulatory narrative
+        """
+        prompt = build_regulatory_summary_prompt(event_data)
+
+        try:
+            return AIService._complete(prompt, settings.OPENAI_TEMPERATURE, 500, method="generate_regulatory_summary")
+
         except Exception as e:
             logger.error(f"Error generating regulatory summary: {str(e)}")
-            return "Automated narrative generation unavailable. Manual review required."
+            _record_fallback("generate_regulatory_summary", e)
+            return NARRATIVE_FALLBACK
+
+
+class AsyncAIService:
+    """
+    Non-blocking AI service built on AsyncOpenAI.
+
+    Mirrors AIService method for method. In-flight completions are bounded by
+    settings.OPENAI_MAX_CONCURRENCY rather than by the server threadpool, so
+    async routes can await the model without holding a worker thread. Risk
+    scoring and triage may hedge slow requests (settings.OPENAI_HEDGE_RISK).
+    """
+
+    def __init__(self, max_concurrency: int = settings.OPENAI_MAX_CONCURRENCY):
+        """Initialize the concurrency limiter."""
+        self.max_concurrency = max_concurrency
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def _complete(
+        self,
+        prompt: str,
+        temperature: float,
+        max_tokens: int,
+        json_output: bool = False,
+        deadline: Optional[float] = None,
+        hedge: bool = False,
+        method: str = "completion"
+    ) -> str:
+        """Run a single-prompt chat completion under the concurrency limit and openai_policy."""
+        async def attempt(timeout: float) -> Any:
+            async with self._semaphore:
+                return await async_client.with_options(timeout=timeout).chat.completions.create(
+                    model=settings.OPENAI_MODEL,
+                    messages=[{"role": "user", "content": prompt}],
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    **_response_format(json_output)
+                )
+
+        hedge_after = settings.OPENAI_HEDGE_DELAY_SECONDS if hedge and settings.OPENAI_HEDGE_RISK else None
+        started = time.perf_counter()
+        try:
+            response = await openai_policy.acall(attempt, deadline, hedge_after)
+        except Exception as e:
+            _record_completion(method, started, error=e)
+            raise
+        _record_completion(method, started, response)
+        return response.choices[0].message.content.strip()
+
+    async def detect_missing_fields(self, event_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Async variant of AIService.detect_missing_fields."""
+        cache_key = llm_cache.make_key("detect_missing_fields", event_data, settings.OPENAI_MODEL, settings.OPENAI_TEMPERATURE)
+        cached = await llm_cache.aget(cache_key)
+        if cached is not None:
+            return cached
+
+        prompt = build_missing_fields_prompt(event_data)
+
+        try:
+            started = time.perf_counter()
+            content = await self._complete(prompt, settings.OPENAI_TEMPERATURE, 500, json_output=True, method="detect_missing_fields")
+            result = json.loads(content)
+            await llm_cache.aset(cache_key, result, time.perf_counter() - started)
+            return result
+
+        except Exception as e:
+            logger.error(f"Error detecting missing fields: {str(e)}")
+            _record_fallback("detect_missing_fields", e)
+            return dict(MISSING_FIELDS_FALLBACK)
+
+    async def generate_micro_followup(
+        self,
+        field_name: str,
+        event_context: Dict[str, Any],
+        language: str = "en",
+        reporter_type: str = "patient"
+    ) -> str:
+        """Async variant of AIService.generate_micro_followup."""
+        question = _library_question(field_name, event_context, language, reporter_type)
+        if question is not None:
+            return question
+
+        prompt = build_micro_followup_prompt(field_name, event_context, language, reporter_type)
+
+        try:
+            return await self._complete(prompt, 0.7, 200, method="generate_micro_followup")
+
+        except Exception as e:
+            logger.error(f"Error generating follow-up question: {str(e)}")
+            _record_fallback("generate_micro_followup", e)
+            return _followup_fallback(field_name)
+
+    async def generate_followup_batch(
+        self,
+        field_names: List[str],
+        event_context: Dict[str, Any],
+        language: str = "en",
+        reporter_type: str = "patient"
+    ) -> Dict[str, str]:
+        """Async variant of AIService.generate_followup_batch."""
+        event = {"event_id": 0, "missing_fields": field_names, **event_context}
+        result = await self.generate_followup_batch_for_events([event], language, reporter_type)
+        return result.get(0, {})
+
+    async def generate_followup_batch_for_events(
+        self,
+        events: List[Dict[str, Any]],
+        language: str = "en",
+        reporter_type: str = "patient"
+    ) -> Dict[int, Dict[str, str]]:
+        """Async variant of AIService.generate_followup_batch_for_events."""
+        result, items = _library_questions(_followup_batch_items(events), language, reporter_type)
+        if not items:
+            return result
+
+        prompt = build_followup_batch_prompt(items, language, reporter_type)
+
+        try:
+            content = await self._complete(
+                prompt, 0.7, min(150 * len(items), 4000), json_output=True, method="generate_followup_batch"
+            )
+            return _merge_followups(result, _parse_followup_batch(content, items))
+
+        except Exception as e:
+            logger.error(f"Error generating follow-up question batch: {str(e)}")
+            _record_fallback("generate_followup_batch", e)
+            return _merge_followups(result, _followup_batch_fallback(items))
+
+    async def calculate_risk_score(self, event_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Async variant of AIService.calculate_risk_score."""
+        cache_key = llm_cache.make_key("calculate_risk_score", event_data, settings.OPENAI_MODEL, settings.OPENAI_TEMPERATURE)
+        cached = await llm_cache.aget(cache_key)
+        if cached is not None:
+            return cached
+
+        prompt = build_risk_score_prompt(event_data)
+
+        try:
+            started = time.perf_counter()
+            content = await self._complete(
+                prompt, settings.OPENAI_TEMPERATURE, 300, json_output=True,
+                deadline=settings.OPENAI_RISK_DEADLINE_SECONDS, hedge=True, method="calculate_risk_score"
+            )
+            result = json.loads(content)
+            await llm_cache.aset(cache_key, result, time.perf_counter() - started)
+            return result
+
+        except Exception as e:
+            logger.error(f"Error calculating risk score: {str(e)}")
+            _record_fallback("calculate_risk_score", e)
+            return local_risk_model.score(event_data)
+
+    async def triage_event(self, event_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Async variant of AIService.triage_event."""
+        cache_key = llm_cache.make_key("triage_event", event_data, settings.OPENAI_MODEL, settings.OPENAI_TEMPERATURE)
+        cached = await llm_cache.aget(cache_key)
+        if cached is not None:
+            return cached
+
+        prompt = build_triage_prompt(event_data)
+
+        try:
+            started = time.perf_counter()
+            content = await self._complete(
+                prompt, settings.OPENAI_TEMPERATURE, 700, json_output=True,
+                deadline=settings.OPENAI_RISK_DEADLINE_SECONDS, hedge=True, method="triage_event"
+            )
+            result = {**TRIAGE_FALLBACK, **json.loads(content)}
+            await llm_cache.aset(cache_key, result, time.perf_counter() - started)
+            return result
+
+        except Exception as e:
+            logger.error(f"Error triaging event: {str(e)}")
+            _record_fallback("triage_event", e)
+            return {**MISSING_FIELDS_FALLBACK, **local_risk_model.score(event_data)}
+
+    async def generate_regulatory_summary(self, event_data: Dict[str, Any]) -> str:
+        """Async variant of AIService.generate_regulatory_summary."""
+        prompt = build_regulatory_summary_prompt(event_data)
+
+        try:
+            return await self._complete(prompt, settings.OPENAI_TEMPERATURE, 500, method="generate_regulatory_summary")
+
+        except Exception as e:
+            logger.error(f"Error generating regulatory summary: {str(e)}")
+            _record_fallback("generate_regulatory_summary", e)
+            return NARRATIVE_FALLBACK
+
+    async def stream_regulatory_summary(self, event_data: Dict[str, Any]) -> AsyncIterator[str]:
+        """
+        Stream the ICSR narrative token by token as the model generates it.
+
+        Yields the fallback text if the model fails before producing output;
+        a failure after partial output is re-raised so callers can discard it.
+        """
+        prompt = build_regulatory_summary_prompt(event_data)
+        emitted = False
+        chunks = 0
+        started = time.perf_counter()
+
+        try:
+            # Streams are not retried; the breaker still guards and learns from them
+            openai_breaker.before_call()
+            async with self._semaphore:
+                stream = await async_client.with_options(timeout=settings.OPENAI_TIMEOUT_SECONDS).chat.completions.create(
+                    model=settings.OPENAI_MODEL,
+                    messages=[{"role": "user", "content": prompt}],
+                    temperature=settings.OPENAI_TEMPERATURE,
+                    max_tokens=500,
+                    stream=True
+                )
+                async for chunk in stream:
+                    delta = chunk.choices[0].delta.content if chunk.choices else None
+                    if delta:
+                        emitted = True
+                        chunks += 1
+                        yield delta
+            openai_breaker.record_success()
+            # Streamed replies carry no usage block; estimate ~4 characters per
+            # prompt token and one token per content chunk
+            ai_telemetry.record_call(
+                "stream_regulatory_summary",
+                settings.OPENAI_MODEL,
+                time.perf_counter() - started,
+                prompt_tokens=len(prompt) // 4,
+                completion_tokens=chunks
+            )
+
+        except Exception as e:
+            if isinstance(e, RETRYABLE_ERRORS):
+                openai_breaker.record_failure()
+            logger.error(f"Error streaming regulatory summary: {str(e)}")
+            ai_telemetry.record_call(
+                "stream_regulatory_summary", settings.OPENAI_MODEL, time.perf_counter() - started, type(e).__name__
+            )
+            if emitted:
+                raise
+            _record_fallback("stream_regulatory_summary", e)
+            yield NARRATIVE_FALLBACK
 
 
-# Export singleton instance
+# Export singleton instances
 ai_service = AIService()
+async_ai_service = AsyncAIService()
@@ -0,0 +1,181 @@
+"""Rule-based ICH E2B(R3) field-completeness engine for adverse events."""
+from typing import Dict, List, Any
+import re
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Values reporters use to say "I don't know"; they count as missing
+PLACEHOLDER_VALUES = {
+    "", "unknown", "unk", "n/a", "na", "none", "not sure", "not known",
+    "don't know", "dont know", "idk", "?", "-", "not provided", "asku", "nask"
+}
+
+# Field rules in follow-up priority order.
+#   level:       'required' or 'optional'
+#   required_if: conditions (field -> accepted values) that promote an optional field
+#   quality:     hints for free text; a present value failing them is undecided and
+#                is the only case handed to the LLM
+E2B_FIELD_RULES: List[Dict[str, Any]] = [
+    {"field": "suspected_drug", "e2b": "G.k.2.2", "label": "suspected medicinal product", "level": "required",
+     "quality": {"min_length": 3}},
+    {"field": "adverse_effect", "e2b": "E.i.1.1a", "label": "reaction / event", "level": "required",
+     "quality": {"min_length": 4, "vague_terms": ["bad", "sick", "ill", "weird", "unwell", "side effect", "reaction", "problem"]}},
+    {"field": "seriousness", "e2b": "E.i.3.1", "label": "seriousness", "level": "required"},
+    {"field": "outcome", "e2b": "E.i.7", "label": "outcome of reaction", "level": "required"},
+    {"field": "start_date", "e2b": "G.k.4.r.4", "label": "start of drug administration", "level": "required"},
+    {"field": "dose", "e2b": "G.k.4.r.1a", "label": "dose", "level": "required",
+     "quality": {"pattern": r"\d|\bone\b|\btwo\b|\bhalf\b|\bsingle\b"}},
+    {"field": "frequency", "e2b": "G.k.4.r.2", "label": "dosing interval", "level": "required",
+     "quality": {"min_length": 2}},
+    {"field": "hospitalization", "e2b": "E.i.3.2c", "label": "caused / prolonged hospitalisation", "level": "optional",
+     "required_if": {"seriousness": ["serious"]}},
+    {"field": "stop_date", "e2b": "G.k.4.r.5", "label": "end of drug administration", "level": "optional",
+     "required_if": {"outcome": ["recovered", "recovering"]}},
+    {"field": "comorbidities", "e2b": "D.7.1.r", "label": "relevant medical history", "level": "optional"},
+    {"field": "medications", "e2b": "G.k.1 (concomitant)", "label": "concomitant medication", "level": "optional"}
+]
+
+
+def _compile_rules(rules: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Precompile quality patterns so evaluation does no regex parsing."""
+    compiled = []
+    for rule in rules:
+        rule = dict(rule)
+        quality = dict(rule.get("quality", {}))
+        if "pattern" in quality:
+            quality["pattern"] = re.compile(quality["pattern"], re.IGNORECASE)
+        if "vague_terms" in quality:
+            quality["vague_terms"] = frozenset(quality["vague_terms"])
+        rule["quality"] = quality
+        compiled.append(rule)
+    return compiled
+
+
+def _value_of(target: Any, field: str) -> Any:
+    """Read a field from an Event model or a plain dictionary."""
+    if isinstance(target, dict):
+        value = target.get(field)
+    else:
+        value = getattr(target, field, None)
+    # Enum members from pydantic schemas
+    return getattr(value, "value", value)
+
+
+def _is_missing(value: Any) -> bool:
+    """Whether a value carries no information."""
+    if value is None:
+        return True
+    if isinstance(value, str):
+        return " ".join(value.split()).casefold() in PLACEHOLDER_VALUES
+    return False
+
+
+def _passes_quality(value: Any, quality: Dict[str, Any]) -> bool:
+    """Whether a present free-text value satisfies the rule's quality hints."""
+    if not quality or not isinstance(value, str):
+        return True
+    text = " ".join(value.split()).casefold()
+    if len(text) < quality.get("min_length", 0):
+        return False
+    if "pattern" in quality and not quality["pattern"].search(text):
+        return False
+    if text in quality.get("vague_terms", ()):
+        return False
+    return True
+
+
+class CompletenessService:
+    """Deterministic E2B(R3) completeness checks with LLM escalation for free text."""
+
+    def __init__(self, rules: List[Dict[str, Any]] = E2B_FIELD_RULES):
+        """Initialize the engine with a rule set."""
+        self.rules = _compile_rules(rules)
+        self._order = {rule["field"]: i for i, rule in enumerate(self.rules)}
+        self._labels = {rule["field"]: f"{rule['label']} ({rule['e2b']})" for rule in self.rules}
+
+    def _level(self, rule: Dict[str, Any], target: Any) -> str:
+        """Resolve a rule's level, applying conditional requirements."""
+        for field, accepted in rule.get("required_if", {}).items():
+            if _value_of(target, field) in accepted:
+                return "required"
+        return rule["level"]
+
+    def evaluate(self, target: Any) -> Dict[str, Any]:
+        """
+        Check an event against the field rules.
+
+        Args:
+            target: Event model instance or dictionary of event fields
+
+        Returns:
+            Dictionary with required_fields, optional_fields, undecided_fields
+            (present free text the rules cannot judge) and risk_reasoning
+        """
+        required, optional, undecided = [], [], []
+
+        for rule in self.rules:
+            value = _value_of(target, rule["field"])
+            if _is_missing(value):
+                if self._level(rule, target) == "required":
+                    required.append(rule["field"])
+                else:
+                    optional.append(rule["field"])
+            elif not _passes_quality(value, rule["quality"]):
+                undecided.append(rule["field"])
+
+        return {
+            "required_fields": required,
+            "optional_fields": optional,
+            "undecided_fields": undecided,
+            "risk_reasoning": self._reasoning(required, optional)
+        }
+
+    def resolve(self, result: Dict[str, Any], llm_result: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Merge an LLM verdict for the undecided fields into a rule result.
+
+        Only fields the rules left undecided are taken from the LLM; an
+        undecided field the LLM does not flag is treated as adequate.
+        """
+        flagged = set(llm_result.get("required_fields", [])) | set(llm_result.get("optional_fields", []))
+        required = list(result["required_fields"])
+        optional = list(result["optional_fields"])
+
+        for field in result["undecided_fields"]:
+            if field not in flagged:
+                continue
+            rule = self.rules[self._order[field]]
+            (required if rule["level"] == "required" else optional).append(field)
+
+        required, optional = self._ordered(required), self._ordered(optional)
+        reasoning = self._reasoning(required, optional)
+        if llm_result.get("risk_reasoning"):
+            reasoning = f"{reasoning} {llm_result['risk_reasoning']}"
+
+        return {
+            "required_fields": required,
+            "optional_fields": optional,
+            "undecided_fields": [],
+            "risk_reasoning": reasoning
+        }
+
+    def _ordered(self, fields: List[str]) -> List[str]:
+        """Sort fields into rule (follow-up priority) order."""
+        return sorted(fields, key=lambda f: self._order.get(f, len(self._order)))
+
+    def _reasoning(self, required: List[str], optional: List[str]) -> str:
+        """Build a human-readable explanation from the failed rules."""
+        labels = self._labels
+        if not required and not optional:
+            return "All ICH E2B(R3) fields checked are present."
+        parts = []
+        if required:
+            parts.append("Missing required ICH E2B(R3) elements: " + ", ".join(labels[f] for f in required) + ".")
+        if optional:
+            parts.append("Missing optional elements: " + ", ".join(labels[f] for f in optional) + ".")
+        return " ".join(parts)
+
+
+# Export singleton instance
+completeness_service = CompletenessService()
@@ -0,0 +1,481 @@
+"""Near-duplicate case detection with MinHash signatures and an LSH index."""
+from sqlalchemy import select, text
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.database import Event
+from datetime import datetime, timedelta, timezone
+from itertools import chain
+from typing import Any, Dict, List, Optional, Tuple
+import asyncio
+import logging
+import re
+import threading
+import time
+import zlib
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS  # Two events with Jaccard similarity s share a band with probability 1 - (1 - s^4)^16
+
+# Multiply-shift hashing of the 32-bit token hashes, (a * x + b) mod 2^64 >> 32,
+# one (a, b) per permutation; no modulo, so NumPy's wrapping uint64 arithmetic
+# is all it takes
+_rng = np.random.default_rng(7411)
+_A = _rng.integers(1, 1 << 63, NUM_PERM, dtype=np.uint64) << np.uint64(1) | np.uint64(1)
+_B = _rng.integers(0, 1 << 63, NUM_PERM, dtype=np.uint64)
+_BAND_MIX = _rng.integers(1, 1 << 62, ROWS, dtype=np.uint64) | np.uint64(1)
+_EMPTY = np.uint32(0xFFFFFFFF)
+
+# Repeated so they outweigh incidental wording in the similarity
+KEY_FIELDS = ("drug", "reaction", "start_date")
+KEY_FIELD_WEIGHT = 2
+CATEGORICAL_FIELDS = ("stop_date", "seriousness", "hospitalization", "outcome")
+TEXT_FIELDS = ("adverse_effect", "dose", "frequency", "comorbidities", "medications")
+
+# Reports with fewer filled fields carry too little to tell two patients apart
+MIN_FIELDS = 4
+FILLED_FIELDS = ("suspected_drug", "start_date", *CATEGORICAL_FIELDS, *TEXT_FIELDS)
+
+# Larger buckets are skipped in lookups: a band shared by that many events is
+# made of tokens common to nearly every report (units, frequent outcomes)
+BUCKET_LIMIT = 1000
+
+# Columns a signature is computed from
+SIGNATURE_COLUMNS = (
+    Event.id, Event.created_at, Event.duplicate_of, Event.duplicate_status,
+    Event.suspected_drug, Event.drug_code, Event.adverse_effect, Event.reaction_code,
+    Event.dose, Event.frequency, Event.start_date, Event.stop_date, Event.seriousness,
+    Event.hospitalization, Event.outcome, Event.comorbidities, Event.medications
+)
+
+# Earlier bucket neighbours compared per event and band in scan()
+SCAN_NEIGHBOURS = 4
+
+# Rows become visible at commit but carry their transaction's start time (and
+# ids allocated at INSERT), so each catch-up re-reads ids created this long
+# before the previous one to pick up transactions that were still open then
+CATCH_UP_MARGIN_SECONDS = 300
+
+_WORDS = re.compile(r"[a-z0-9]+")
+
+
+def _value(value: Any) -> Any:
+    """Unwrap enum members from pydantic schemas."""
+    return getattr(value, "value", value)
+
+
+def _words(text: Any) -> List[str]:
+    return _WORDS.findall(str(text).casefold()) if text else []
+
+
+def filled_fields(record: Dict[str, Any]) -> int:
+    """Number of compared fields with a value."""
+    return len([name for name in FILLED_FIELDS if record.get(name) not in (None, "")])
+
+
+def event_tokens(record: Dict[str, Any]) -> List[str]:
+    """
+    The token set an event's signature is computed over.
+
+    Coded drug and reaction where the terminology resolved them (else their
+    normalized text) and the start date, each weighted; the categorical
+    fields; and the words and word pairs of the free-text fields.
+    """
+    get = record.get
+    effect_words = _words(get("adverse_effect"))
+    keys = (
+        get("drug_code") or " ".join(_words(get("suspected_drug"))),
+        get("reaction_code") or " ".join(effect_words),
+        get("start_date")
+    )
+    tokens = [f"{name}:{key}:{i}" for name, key in zip(KEY_FIELDS, keys) if key for i in range(KEY_FIELD_WEIGHT)]
+    tokens += [f"{name}:{_value(get(name))}" for name in CATEGORICAL_FIELDS if get(name) is not None]
+    for name in TEXT_FIELDS:
+        words = effect_words if name == "adverse_effect" else _words(get(name))
+        tokens += [f"{name}:{word}" for word in words]
+        tokens += [f"{name}:{a} {b}" for a, b in zip(words, words[1:])]
+    return tokens
+
+
+def signatures(token_lists: List[List[str]]) -> np.ndarray:
+    """
+    MinHash signatures for many token lists at once.
+
+    Returns:
+        (n x NUM_PERM) uint32 matrix; rows of empty lists are all 2^32 - 1
+    """
+    lengths = np.fromiter(map(len, token_lists), dtype=np.int64, count=len(token_lists))
+    hashes = np.fromiter(
+        map(zlib.crc32, map(str.encode, chain.from_iterable(token_lists))),
+        dtype=np.uint64, count=int(lengths.sum())
+    )
+    result = np.full((len(token_lists), NUM_PERM), _EMPTY, dtype=np.uint32)
+    if hashes.size:
+        filled = lengths > 0
+        starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))[filled]
+        # One permutation at a time, in place: a (tokens x NUM_PERM) temporary would not fit in cache
+        permuted = np.empty_like(hashes)
+        minima = np.empty((NUM_PERM, len(starts)), dtype=np.uint32)
+        for k in range(NUM_PERM):
+            np.multiply(hashes, _A[k], out=permuted)
+            permuted += _B[k]
+            permuted >>= np.uint64(32)
+            minima[k] = np.minimum.reduceat(permuted, starts)
+        result[filled] = minima.T
+    return result
+
+
+def band_keys(sigs: np.ndarray) -> np.ndarray:
+    """(n x BANDS) uint64 hash of each band of each signature."""
+    return (sigs.reshape(len(sigs), BANDS, ROWS).astype(np.uint64) * _BAND_MIX).sum(axis=2, dtype=np.uint64)
+
+
+class LSHIndex:
+    """
+    Banded LSH over MinHash signatures.
+
+    Each band of a signature is a dictionary key, so the candidates for a
+    new event are the union of 16 bucket lookups; they are verified by
+    comparing full signatures in one vectorized step.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        """Initialize an empty index."""
+        self._buckets: List[Dict[int, List[int]]] = [{} for _ in range(BANDS)]
+        self._sigs = np.empty((capacity, NUM_PERM), dtype=np.uint32)
+        self._ids = np.empty(capacity, dtype=np.int64)
+        self._roots = np.empty(capacity, dtype=np.int64)
+        self._created = np.empty(capacity, dtype=np.float64)
+        self.size = 0
+
+    def add(self, event_id: int, sig: np.ndarray, root_id: int, created: float) -> None:
+        """Index an event; root_id is the case it duplicates, or its own id."""
+        self.add_many([event_id], sig[None], [root_id], [created])
+
+    def add_many(self, event_ids: List[int], sigs: np.ndarray, root_ids: List[int], created: List[float]) -> None:
+        """Index many events at once (band keys are computed in one step)."""
+        count, start = len(event_ids), self.size
+        if not count:
+            return
+        if start + count > len(self._ids):
+            grow = max(len(self._ids), count)
+            self._sigs = np.concatenate((self._sigs, np.empty((grow, NUM_PERM), dtype=np.uint32)))
+            self._ids, self._roots, self._created = (
+                np.concatenate((array, np.empty(grow, dtype=array.dtype)))
+                for array in (self._ids, self._roots, self._created)
+            )
+        end = start + count
+        self._sigs[start:end], self._ids[start:end], self._roots[start:end], self._created[start:end] = sigs, event_ids, root_ids, created
+        # Group rows by key per band first so each bucket is touched once
+        for band, keys in enumerate(band_keys(sigs).T):
+            order = np.argsort(keys, kind="stable")
+            sorted_keys = keys[order]
+            bounds = [0, *(np.flatnonzero(sorted_keys[1:] != sorted_keys[:-1]) + 1).tolist(), count]
+            rows = (order + start).tolist()
+            buckets = self._buckets[band]
+            for key, lo, hi in zip(sorted_keys[bounds[:-1]].tolist(), bounds, bounds[1:]):
+                bucket = buckets.get(key)
+                if bucket is None:
+                    buckets[key] = rows[lo:hi]
+                else:
+                    bucket += rows[lo:hi]
+        self.size = end
+
+    def best(self, sig: np.ndarray, threshold: float, since: float, exclude: Optional[int] = None) -> Optional[Tuple[int, int, float]]:
+        """
+        Most similar indexed event at or above threshold.
+
+        Args:
+            sig: Signature to match
+            threshold: Minimum estimated Jaccard similarity
+            since: Ignore events created before this timestamp
+            exclude: Event id to leave out (the event itself)
+
+        Returns:
+            (root id, event id, similarity), or None
+        """
+        matches = self.matches(sig, threshold, since, exclude)
+        return matches[0] if matches else None
+
+    def matches(self, sig: np.ndarray, threshold: float, since: float, exclude: Optional[int] = None) -> List[Tuple[int, int, float]]:
+        """All indexed events at or above threshold, most similar (then oldest) first."""
+        rows = set()
+        for band, key in enumerate(band_keys(sig[None])[0].tolist()):
+            bucket = self._buckets[band].get(key, ())
+            if len(bucket) <= BUCKET_LIMIT:
+                rows.update(bucket)
+        if not rows:
+            return []
+        rows = np.fromiter(rows, dtype=np.int64, count=len(rows))
+        rows = rows[(self._created[rows] >= since) & (self._ids[rows] != exclude)]
+        scores = (self._sigs[rows] == sig).mean(axis=1)
+        keep = scores >= threshold
+        rows, scores = rows[keep], scores[keep]
+        order = np.lexsort((self._ids[rows], -scores))
+        return [(int(self._roots[r]), int(self._ids[r]), round(float(s), 4)) for r, s in zip(rows[order], scores[order])]
+
+
+class DuplicateService:
+    """
+    Flag incoming events that repeat a recent case.
+
+    Each API process keeps an LSH index of the events created in the last
+    settings.DUPLICATE_WINDOW_DAYS, built from the events table at startup
+    and caught up with newly committed events before each check, so copies
+    ingested by other processes are seen too. Catch-up lists the ids created
+    since the previous one (less CATCH_UP_MARGIN_SECONDS) and loads those not seen
+    yet, so a transaction that commits after a later one is not skipped. A flagged event points
+    at the original case (duplicate_of) and skips AI enrichment.
+    scan() deduplicates a whole backlog in one vectorized pass.
+    """
+
+    def __init__(self):
+        """Initialize without an index; start() or the first check builds it."""
+        self._index: Optional[LSHIndex] = None
+        self._seen: Dict[int, float] = {}  # Event id -> creation timestamp, for ids inside the catch-up margin
+        self._caught_up_at = 0.0
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def _since() -> float:
+        return (datetime.now(timezone.utc) - timedelta(days=settings.DUPLICATE_WINDOW_DAYS)).timestamp()
+
+    @staticmethod
+    def _signed(rows: List[Any]) -> Tuple[np.ndarray, np.ndarray]:
+        """Signatures of event rows and which of them have enough fields to compare."""
+        records = [row._mapping for row in rows]
+        eligible = np.fromiter((filled_fields(r) >= MIN_FIELDS for r in records), dtype=bool, count=len(records))
+        return signatures([event_tokens(r) for r in records]), eligible
+
+    def _add_rows(self, index: LSHIndex, rows: List[Any]) -> None:
+        sigs, eligible = self._signed(rows)
+        kept = [row for row, ok in zip(rows, eligible) if ok]
+        index.add_many(
+            [row.id for row in kept], sigs[eligible],
+            [row.duplicate_of or row.id for row in kept], [row.created_at.timestamp() for row in kept]
+        )
+        self._seen.update((row.id, row.created_at.timestamp()) for row in rows)
+
+    def _catch_up(self, db: Session, before_id: Optional[int] = None, batch_size: int = 10000) -> None:
+        """Index committed events not seen yet (older than before_id, the caller's own new rows)."""
+        started = time.perf_counter()
+        now = time.time()
+        if self._index is None:
+            self._index, self._seen = LSHIndex(), {}
+            query = select(*SIGNATURE_COLUMNS).where(Event.created_at >= datetime.fromtimestamp(self._since(), timezone.utc))
+            if before_id is not None:
+                query = query.where(Event.id < before_id)
+            result = db.execute(query.order_by(Event.id).execution_options(yield_per=batch_size))
+            for rows in result.partitions():
+                self._add_rows(self._index, rows)
+        else:
+            cutoff = self._caught_up_at - CATCH_UP_MARGIN_SECONDS
+            query = select(Event.id).where(Event.created_at >= datetime.fromtimestamp(cutoff, timezone.utc))
+            if before_id is not None:
+                query = query.where(Event.id < before_id)
+            new_ids = sorted(set(db.scalars(query)) - self._seen.keys())
+            for start in range(0, len(new_ids), batch_size):
+                chunk = new_ids[start:start + batch_size]
+                self._add_rows(self._index, db.execute(select(*SIGNATURE_COLUMNS).where(Event.id.in_(chunk)).order_by(Event.id)).all())
+            # Older ids fall outside the next catch-up's margin
+            self._seen = {event_id: created for event_id, created in self._seen.items() if created >= cutoff}
+        self._caught_up_at = now
+        elapsed = time.perf_counter() - started
+        if elapsed > 1:
+            logger.info(f"Duplicate index: {self._index.size} events indexed in {round(elapsed * 1000)} ms")
+
+    def rebuild(self, db: Session) -> int:
+        """
+        Rebuild the index from the events table.
+
+        Returns:
+            Number of events indexed
+        """
+        with self._lock:
+            self._index = None
+            self._catch_up(db)
+            return self._index.size
+
+    def _build_once(self) -> None:
+        db = SessionLocal()
+        try:
+            self.rebuild(db)
+        except Exception as e:
+            logger.error(f"Error building duplicate index: {str(e)}")
+        finally:
+            db.close()
+
+    def start(self) -> None:
+        """Build the index in the background; checks made meanwhile wait for it."""
+        self._task = asyncio.create_task(run_in_threadpool(self._build_once))
+
+    async def stop(self) -> None:
+        """Wait for a build still in progress."""
+        if self._task:
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def detect(self, db: Session, event_ids: List[int], records: List[Dict[str, Any]]) -> Dict[int, Tuple[int, float]]:
+        """
+        Find which newly inserted (not yet committed) events duplicate a known case.
+
+        Events are also compared with the earlier ones of the same batch.
+
+        Args:
+            db: Database session the events were inserted with
+            event_ids: IDs of the new events, ascending
+            records: Event fields in the same order
+
+        Returns:
+            Event id -> (id of the original case, similarity) for the duplicates
+        """
+        if not event_ids:
+            return {}
+        sigs = signatures([event_tokens(r) for r in records])
+        threshold, since, now = settings.DUPLICATE_THRESHOLD, self._since(), time.time()
+        batch = LSHIndex(capacity=len(event_ids))
+        found: Dict[int, Tuple[int, float]] = {}
+
+        with self._lock:
+            self._catch_up(db, before_id=min(event_ids))
+            for event_id, record, sig in zip(event_ids, records, sigs):
+                if filled_fields(record) < MIN_FIELDS:
+                    continue
+                candidates = [m for m in (self._index.best(sig, threshold, since), batch.best(sig, threshold, since)) if m]
+                root = event_id
+                if candidates:
+                    root, _, similarity = max(candidates, key=lambda m: (m[2], -m[1]))
+                    found[event_id] = (root, similarity)
+                batch.add(event_id, sig, root, now)
+        return found
+
+    def candidates(self, db: Session, event: Event, threshold: float) -> List[Dict[str, Any]]:
+        """
+        Indexed events similar to a stored event.
+
+        Args:
+            db: Database session
+            event: The event
+            threshold: Minimum estimated Jaccard similarity
+
+        Returns:
+            Matches with event_id, duplicate_of (original case) and similarity, most similar first
+        """
+        record = {column.key: getattr(event, column.key) for column in SIGNATURE_COLUMNS}
+        sig = signatures([event_tokens(record)])[0]
+        with self._lock:
+            self._catch_up(db)
+            matches = self._index.matches(sig, threshold, self._since(), exclude=event.id)
+        return [
+            {"event_id": event_id, "duplicate_of": root if root != event_id else None, "similarity": similarity}
+            for root, event_id, similarity in matches
+        ]
+
+    @staticmethod
+    def scan(db: Session, batch_size: int = 10000) -> Dict[str, Any]:
+        """
+        Deduplicate every stored event in one pass.
+
+        Signatures are computed in batches; then, per band, events are sorted
+        by bucket and each is compared with its few nearest earlier
+        neighbours in the bucket, all as array operations. Each event
+        gets its most similar earlier match within the window (at or above
+        DUPLICATE_THRESHOLD) and inherits that match's original case. Events
+        a reviewer marked not_duplicate are left alone.
+
+        Args:
+            db: Database session
+            batch_size: Events read and signed per batch
+
+        Returns:
+            Counts of events scanned, pairs compared and events flagged
+        """
+        started = time.perf_counter()
+        ids, created, status, sig_batches, eligible_batches = [], [], [], [], []
+        result = db.execute(select(*SIGNATURE_COLUMNS).order_by(Event.id).execution_options(yield_per=batch_size))
+        for rows in result.partitions():
+            sigs, eligible = DuplicateService._signed(rows)
+            sig_batches.append(sigs)
+            eligible_batches.append(eligible)
+            ids.extend(row.id for row in rows)
+            created.extend(row.created_at.timestamp() for row in rows)
+            status.extend(row.duplicate_status for row in rows)
+        db.rollback()  # End the read transaction before the writes below
+
+        if not ids:
+            return {"scanned": 0, "compared": 0, "flagged": 0}
+        ids, created = np.array(ids), np.array(created)
+        sigs, eligible = np.concatenate(sig_batches), np.concatenate(eligible_batches)
+        keys = band_keys(sigs)
+        positions = np.flatnonzero(eligible)
+
+        # Candidate (later, earlier) position pairs sharing a band bucket
+        later, earlier = [], []
+        for band in range(BANDS):
+            order = positions[np.argsort(keys[positions, band], kind="stable")]
+            sorted_keys = keys[order, band]
+            for k in range(1, SCAN_NEIGHBOURS + 1):
+                same = sorted_keys[k:] == sorted_keys[:-k]
+                later.append(order[k:][same])
+                earlier.append(order[:-k][same])
+        # Pairs found in several bands are deduplicated as one int64 each
+        later, earlier = np.divmod(np.unique(np.concatenate(later) * len(ids) + np.concatenate(earlier)), len(ids))
+        in_window = np.abs(created[later] - created[earlier]) <= settings.DUPLICATE_WINDOW_DAYS * 86400
+        later, earlier = later[in_window], earlier[in_window]
+        compared = len(later)
+
+        # Verify in slices to bound the (pairs x NUM_PERM) comparison
+        scores = np.concatenate([
+            (sigs[later[part]] == sigs[earlier[part]]).mean(axis=1)
+            for part in np.array_split(np.arange(compared), max(1, compared // 500_000))
+        ]) if compared else np.empty(0)
+        keep = scores >= settings.DUPLICATE_THRESHOLD
+        later, earlier, scores = later[keep], earlier[keep], scores[keep]
+
+        # Best earlier match per event: most similar, then oldest
+        order = np.lexsort((earlier, -scores, later))
+        later, earlier, scores = later[order], earlier[order], scores[order]
+        first = np.ones(len(later), dtype=bool)
+        first[1:] = later[1:] != later[:-1]
+        best = dict(zip(later[first].tolist(), zip(earlier[first].tolist(), scores[first].tolist())))
+
+        roots = np.arange(len(ids))
+        flagged_ids, root_ids, similarities = [], [], []
+        for position in sorted(best):
+            if status[position] == "not_duplicate":
+                continue
+            match, similarity = best[position]
+            roots[position] = roots[match]
+            if status[position] is None:
+                flagged_ids.append(int(ids[position]))
+                root_ids.append(int(ids[roots[position]]))
+                similarities.append(round(similarity, 4))
+
+        # One UPDATE per batch from parallel arrays; skips events reviewed meanwhile
+        for start in range(0, len(flagged_ids), batch_size):
+            end = start + batch_size
+            db.execute(text("""
+                UPDATE events SET duplicate_of = d.root, duplicate_score = d.score, duplicate_status = 'suspected'
+                FROM unnest(CAST(:ids AS integer[]), CAST(:roots AS integer[]), CAST(:scores AS float8[])) AS d(id, root, score)
+                WHERE events.id = d.id AND events.duplicate_status IS NULL
+            """), {"ids": flagged_ids[start:end], "roots": root_ids[start:end], "scores": similarities[start:end]})
+            db.commit()
+
+        summary = {
+            "scanned": len(ids),
+            "compared": compared,
+            "flagged": len(flagged_ids),
+            "duration_ms": round((time.perf_counter() - started) * 1000)
+        }
+        logger.info(f"Duplicate scan: {summary}")
+        return summary
+
+
+# Export singleton instance
+duplicate_service = DuplicateService()
@@ -0,0 +1,521 @@
+"""Streaming ICH E2B(R3) ICSR XML import and export."""
+from sqlalchemy import insert, or_, select
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from pydantic import ValidationError
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.database import Event, Reporter
+from app.models.schemas import EventCreate
+from app.services.enrichment_service import enrichment_service
+from app.services.ingest_service import bulk_ingest_service
+from datetime import date, datetime, timezone
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
+from xml.etree import ElementTree as ET
+import logging
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+HL7_NS = "urn:hl7-org:v3"
+NS = {"hl7": HL7_NS}
+
+# E2B(R3) code systems and OIDs
+OBSERVATION_CODES = "2.16.840.1.113883.3.989.2.1.1.19"
+OUTCOME_CODES = "2.16.840.1.113883.3.989.2.1.1.11"
+QUALIFICATION_CODES = "2.16.840.1.113883.3.989.2.1.1.6"
+CHARACTERISATION_CODES = "2.16.840.1.113883.3.989.2.1.1.13"
+ORGANIZER_CODES = "2.16.840.1.113883.3.989.2.1.1.20"
+SAFETY_REPORT_ID_ROOT = "2.16.840.1.113883.3.989.2.1.3.1"
+BATCH_ID_ROOT = "2.16.840.1.113883.3.989.2.1.3.22"
+MESSAGE_ID_ROOT = "2.16.840.1.113883.3.989.2.1.3.1"
+
+MESSAGE_TAG = "PORR_IN049016UV"
+
+# Observation codes (E2B(R3) code system 19)
+REACTION = "29"
+OUTCOME = "27"
+MEDICAL_HISTORY_TEXT = "18"
+CHARACTERISATION = "20"
+# Seriousness criteria (E.i.3.2a-f)
+RESULTS_IN_DEATH = "34"
+LIFE_THREATENING = "21"
+HOSPITALISATION = "33"
+DISABLING = "35"
+CONGENITAL_ANOMALY = "12"
+OTHER_MEDICALLY_IMPORTANT = "26"
+SERIOUSNESS_CRITERIA = (RESULTS_IN_DEATH, LIFE_THREATENING, HOSPITALISATION, DISABLING, CONGENITAL_ANOMALY, OTHER_MEDICALLY_IMPORTANT)
+
+# Outcome of reaction (E.i.7)
+OUTCOME_TO_E2B = {"recovered": "1", "recovering": "2", "not_recovered": "3", "fatal": "5", "unknown": "0"}
+OUTCOME_FROM_E2B = {"1": "recovered", "2": "recovering", "3": "not_recovered", "4": "recovered", "5": "fatal", "0": "unknown"}
+
+# Drug characterisation (G.k.1)
+SUSPECT, CONCOMITANT = "1", "2"
+
+# Reporter qualification (C.2.r.4): physician, pharmacist, other HCP, lawyer, consumer
+HCP_QUALIFICATIONS = {"1", "2", "3"}
+QUALIFICATION_TO_E2B = {"hcp": "1", "patient": "5"}
+
+EXPORT_COLUMNS = (
+    Event.uuid, Event.created_at, Event.suspected_drug, Event.dose, Event.frequency,
+    Event.start_date, Event.stop_date, Event.adverse_effect, Event.seriousness,
+    Event.hospitalization, Event.outcome, Event.comorbidities, Event.medications,
+    Reporter.reporter_type, Reporter.name, Reporter.phone, Reporter.email
+)
+
+
+def _tag(elem: ET.Element) -> str:
+    """Local name of an element, without its namespace."""
+    return elem.tag.rsplit("}", 1)[-1]
+
+
+def _code(elem: ET.Element) -> Optional[str]:
+    code = elem.find("hl7:code", NS)
+    return code.get("code") if code is not None else None
+
+
+def _text(elem: Optional[ET.Element]) -> Optional[str]:
+    if elem is None:
+        return None
+    text = "".join(elem.itertext()).strip()
+    return text or None
+
+
+def _parse_date(value: Optional[str]) -> Optional[date]:
+    """Parse an HL7 TS; partial dates (year or month only) are dropped."""
+    if not value or len(value) < 8 or not value[:8].isdigit():
+        return None
+    try:
+        return date(int(value[:4]), int(value[4:6]), int(value[6:8]))
+    except ValueError:
+        return None
+
+
+def parse_case(message: ET.Element) -> Tuple[Optional[str], Dict[str, Any], Dict[str, Any]]:
+    """
+    Map one PORR_IN049016UV message onto Event and Reporter fields.
+
+    The first suspect drug becomes suspected_drug; concomitant drugs are
+    joined into medications. Partial dates are left empty. Seriousness is
+    'serious' when any E.i.3.2 criterion is true and 'non-serious' when
+    criteria are given and all false.
+
+    Args:
+        message: Parsed message element
+
+    Returns:
+        Safety report id (C.1.1), event fields and reporter fields
+    """
+    report_id = message.find("hl7:controlActProcess/hl7:subject/hl7:investigationEvent/hl7:id", NS)
+    event: Dict[str, Any] = {}
+    reactions: List[str] = []
+    criteria: Dict[str, bool] = {}
+
+    for observation in message.iter(f"{{{HL7_NS}}}observation"):
+        code = _code(observation)
+        value = observation.find("hl7:value", NS)
+        if code == REACTION and value is not None:
+            term = _text(value.find("hl7:originalText", NS)) or value.get("displayName") or value.get("code")
+            if term:
+                reactions.append(term)
+        elif code == OUTCOME and value is not None and "outcome" not in event:
+            event["outcome"] = OUTCOME_FROM_E2B.get(value.get("code"))
+        elif code in SERIOUSNESS_CRITERIA and value is not None and value.get("value") in ("true", "false"):
+            criteria[code] = criteria.get(code, False) or value.get("value") == "true"
+        elif code == MEDICAL_HISTORY_TEXT and value is not None:
+            event["comorbidities"] = _text(value)
+
+    if reactions:
+        event["adverse_effect"] = "; ".join(reactions)
+    if criteria:
+        event["seriousness"] = "serious" if any(criteria.values()) else "non-serious"
+    if HOSPITALISATION in criteria:
+        event["hospitalization"] = criteria[HOSPITALISATION]
+
+    characterisation: Dict[str, str] = {}
+    for assessment in message.iter(f"{{{HL7_NS}}}causalityAssessment"):
+        value = assessment.find("hl7:value", NS)
+        product = assessment.find("hl7:subject2/hl7:productUseReference/hl7:id", NS)
+        if _code(assessment) == CHARACTERISATION and value is not None and product is not None:
+            characterisation[product.get("root")] = value.get("code")
+
+    concomitant: List[str] = []
+    for administration in message.iter(f"{{{HL7_NS}}}substanceAdministration"):
+        name = _text(administration.find("hl7:consumable/hl7:instanceOfKind/hl7:kindOfProduct/hl7:name", NS))
+        if not name:
+            continue
+        drug_id = administration.find("hl7:id", NS)
+        role = characterisation.get(drug_id.get("root") if drug_id is not None else None, SUSPECT)
+        if role != SUSPECT:
+            concomitant.append(name)
+            continue
+        if "suspected_drug" in event:
+            continue
+        event["suspected_drug"] = name
+        dosage = administration.find("hl7:outboundRelationship2/hl7:substanceAdministration", NS)
+        if dosage is not None:
+            event["dose"] = _text(dosage.find("hl7:text", NS))
+            period = dosage.find("hl7:effectiveTime", NS)
+            if period is not None:
+                low, high = period.find("hl7:low", NS), period.find("hl7:high", NS)
+                event["start_date"] = _parse_date(low.get("value")) if low is not None else None
+                event["stop_date"] = _parse_date(high.get("value")) if high is not None else None
+    if concomitant:
+        event["medications"] = ", ".join(concomitant)
+
+    reporter: Dict[str, Any] = {"reporter_type": "patient"}
+    source = message.find(".//hl7:relatedInvestigation//hl7:assignedEntity", NS)
+    if source is not None:
+        for telecom in source.findall("hl7:telecom", NS):
+            value = telecom.get("value") or ""
+            if value.startswith("tel:"):
+                reporter["phone"] = value[4:]
+            elif value.startswith("mailto:"):
+                reporter["email"] = value[7:]
+        person = source.find("hl7:assignedPerson", NS)
+        if person is not None:
+            name = person.find("hl7:name", NS)
+            if name is not None:
+                reporter["name"] = " ".join(part.text.strip() for part in name if part.text and part.text.strip()) or _text(name)
+            qualification = person.find("hl7:asQualifiedEntity/hl7:code", NS)
+            if qualification is not None and qualification.get("code") in HCP_QUALIFICATIONS:
+                reporter["reporter_type"] = "hcp"
+
+    return (report_id.get("extension") if report_id is not None else None), event, reporter
+
+
+def _sub(parent: ET.Element, tag: str, text: Optional[str] = None, **attrib: str) -> ET.Element:
+    elem = ET.SubElement(parent, tag, {k.replace("__", ":"): v for k, v in attrib.items()})
+    if text is not None:
+        elem.text = text
+    return elem
+
+
+def _observation(parent: ET.Element, code: str) -> ET.Element:
+    observation = _sub(_sub(parent, "outboundRelationship2", typeCode="PERT"), "observation", classCode="OBS", moodCode="EVN")
+    _sub(observation, "code", code=code, codeSystem=OBSERVATION_CODES)
+    return observation
+
+
+def _ts(value: Any) -> str:
+    if isinstance(value, datetime):
+        return value.astimezone(timezone.utc).strftime("%Y%m%d%H%M%S")
+    return value.strftime("%Y%m%d")
+
+
+def build_case(row: Any) -> ET.Element:
+    """
+    Build one PORR_IN049016UV message from an exported row.
+
+    Frequency has no free-text element in E2B(R3), so it is carried in the
+    dosage text (G.k.4.r.8) after the dose. Concomitant medications are sent
+    as one drug with characterisation 'concomitant'.
+
+    Args:
+        row: Row with the EXPORT_COLUMNS fields
+
+    Returns:
+        Message element (in the default HL7 namespace of the batch)
+    """
+    report_id = str(row.uuid)
+    message = ET.Element(MESSAGE_TAG, ITSVersion="XML_1.0")
+    _sub(message, "id", root=MESSAGE_ID_ROOT, extension=report_id)
+    _sub(message, "creationTime", value=_ts(datetime.now(timezone.utc)))
+    _sub(message, "interactionId", root="2.16.840.1.113883.1.6", extension=MESSAGE_TAG)
+    act = _sub(message, "controlActProcess", classCode="CACT", moodCode="EVN")
+    _sub(act, "code", code="PORR_TE049016UV", codeSystem="2.16.840.1.113883.1.18")
+    investigation = _sub(_sub(act, "subject", typeCode="SUBJ"), "investigationEvent", classCode="INVSTG", moodCode="EVN")
+    _sub(investigation, "id", root=SAFETY_REPORT_ID_ROOT, extension=report_id)
+    _sub(investigation, "code", code="PAT_ADV_EVNT", codeSystem="2.16.840.1.113883.5.4")
+    if row.created_at:
+        _sub(_sub(investigation, "effectiveTime"), "low", value=_ts(row.created_at))
+
+    assessment = _sub(_sub(investigation, "component", typeCode="COMP"), "adverseEventAssessment", classCode="INVSTG", moodCode="EVN")
+    patient = _sub(_sub(assessment, "subject1", typeCode="SBJ"), "primaryRole", classCode="INVSBJ")
+    _sub(_sub(patient, "player1", classCode="PSN", determinerCode="INSTANCE"), "name", nullFlavor="MSK")
+
+    # Reaction (E.i), seriousness criteria (E.i.3.2) and outcome (E.i.7)
+    if row.adverse_effect:
+        reaction = _sub(_sub(patient, "subjectOf2", typeCode="SBJ"), "observation", classCode="OBS", moodCode="EVN")
+        _sub(reaction, "id", root=str(uuid.uuid4()))
+        _sub(reaction, "code", code=REACTION, codeSystem=OBSERVATION_CODES)
+        _sub(_sub(reaction, "value", xsi__type="CE"), "originalText", row.adverse_effect)
+        if row.seriousness in ("serious", "non-serious"):
+            serious = row.seriousness == "serious"
+            flags = {
+                RESULTS_IN_DEATH: serious and row.outcome == "fatal",
+                HOSPITALISATION: serious and bool(row.hospitalization)
+            }
+            flags[OTHER_MEDICALLY_IMPORTANT] = serious and not any(flags.values())
+            for code in SERIOUSNESS_CRITERIA:
+                _sub(_observation(reaction, code), "value", xsi__type="BL", value="true" if flags.get(code) else "false")
+        if row.outcome in OUTCOME_TO_E2B:
+            _sub(_observation(reaction, OUTCOME), "value", xsi__type="CE", code=OUTCOME_TO_E2B[row.outcome], codeSystem=OUTCOME_CODES)
+
+    # Relevant medical history (D.7.2)
+    if row.comorbidities:
+        history = _sub(_sub(patient, "subjectOf2", typeCode="SBJ"), "organizer", classCode="CATEGORY", moodCode="EVN")
+        _sub(history, "code", code="1", codeSystem=ORGANIZER_CODES)
+        observation = _sub(_sub(history, "component", typeCode="COMP"), "observation", classCode="OBS", moodCode="EVN")
+        _sub(observation, "code", code=MEDICAL_HISTORY_TEXT, codeSystem=OBSERVATION_CODES)
+        _sub(observation, "value", row.comorbidities, xsi__type="ED")
+
+    # Drugs (G.k) with their characterisation
+    drugs = [(SUSPECT, row.suspected_drug), (CONCOMITANT, row.medications)]
+    drugs = [(role, name) for role, name in drugs if name]
+    if drugs:
+        organizer = _sub(_sub(patient, "subjectOf2", typeCode="SBJ"), "organizer", classCode="CATEGORY", moodCode="EVN")
+        _sub(organizer, "code", code="4", codeSystem=ORGANIZER_CODES)
+    for role, name in drugs:
+        drug_id = str(uuid.uuid4())
+        administration = _sub(_sub(organizer, "component", typeCode="COMP"), "substanceAdministration", classCode="SBADM", moodCode="EVN")
+        _sub(administration, "id", root=drug_id)
+        product = _sub(_sub(_sub(administration, "consumable", typeCode="CSM"), "instanceOfKind", classCode="INST"), "kindOfProduct", classCode="MMAT", determinerCode="KIND")
+        _sub(product, "name", name)
+
+        dosage_text = ", ".join(v for v in (row.dose, row.frequency) if v) if role == SUSPECT else None
+        dates = (row.start_date, row.stop_date) if role == SUSPECT else (None, None)
+        if dosage_text or any(dates):
+            dosage = _sub(_sub(administration, "outboundRelationship2", typeCode="COMP"), "substanceAdministration", classCode="SBADM", moodCode="EVN")
+            if dosage_text:
+                _sub(dosage, "text", dosage_text)
+            if any(dates):
+                period = _sub(dosage, "effectiveTime", xsi__type="IVL_TS")
+                for tag, value in zip(("low", "high"), dates):
+                    if value:
+                        _sub(period, tag, value=_ts(value))
+
+        causality = _sub(_sub(assessment, "component", typeCode="COMP"), "causalityAssessment", classCode="OBS", moodCode="EVN")
+        _sub(causality, "code", code=CHARACTERISATION, codeSystem=OBSERVATION_CODES)
+        _sub(causality, "value", xsi__type="CE", code=role, codeSystem=CHARACTERISATION_CODES)
+        _sub(_sub(_sub(causality, "subject2", typeCode="SUBJ"), "productUseReference", classCode="SBADM", moodCode="EVN"), "id", root=drug_id)
+
+    # Primary source (C.2.r)
+    related = _sub(_sub(investigation, "outboundRelationship", typeCode="SPRT"), "relatedInvestigation", classCode="INVSTG", moodCode="EVN")
+    _sub(related, "code", code="2", codeSystem="2.16.840.1.113883.3.989.2.1.1.22")
+    control = _sub(_sub(related, "subjectOf2", typeCode="SUBJ"), "controlActEvent", classCode="CACT", moodCode="EVN")
+    entity = _sub(_sub(control, "author", typeCode="AUT"), "assignedEntity", classCode="ASSIGNED")
+    if row.phone:
+        _sub(entity, "telecom", value=f"tel:{row.phone}")
+    if row.email:
+        _sub(entity, "telecom", value=f"mailto:{row.email}")
+    person = _sub(entity, "assignedPerson", classCode="PSN", determinerCode="INSTANCE")
+    if row.name:
+        _sub(_sub(person, "name"), "given", row.name)
+    qualification = QUALIFICATION_TO_E2B.get(row.reporter_type)
+    if qualification:
+        _sub(_sub(person, "asQualifiedEntity", classCode="QUAL"), "code", code=qualification, codeSystem=QUALIFICATION_CODES)
+
+    return message
+
+
+class E2BService:
+    """
+    Exchange adverse events as ICH E2B(R3) ICSR batches.
+
+    Import feeds the request body to an incremental XML parser and detaches
+    each case message as soon as it has been mapped, so memory stays bounded
+    by the chunk size rather than the file size; cases are written through
+    the bulk ingestion path. Export reads plain rows through a server-side
+    cursor and serializes one case at a time.
+    """
+
+    @staticmethod
+    def _resolve_reporters(db: Session, reporters: List[Dict[str, Any]]) -> List[int]:
+        """Match primary sources to existing reporters by email or phone and insert the rest."""
+        emails = {r["email"] for r in reporters if r.get("email")}
+        phones = {r["phone"] for r in reporters if r.get("phone")}
+        by_email: Dict[str, int] = {}
+        by_phone: Dict[str, int] = {}
+        if emails or phones:
+            for reporter_id, email, phone in db.execute(
+                select(Reporter.id, Reporter.email, Reporter.phone)
+                .where(or_(Reporter.email.in_(emails), Reporter.phone.in_(phones)))
+            ):
+                if email:
+                    by_email.setdefault(email, reporter_id)
+                if phone:
+                    by_phone.setdefault(phone, reporter_id)
+
+        ids: List[Optional[int]] = []
+        new_rows: List[Dict[str, Any]] = []
+        new_positions: List[int] = []
+        new_index: Dict[str, int] = {}
+        for reporter in reporters:
+            reporter_id = by_email.get(reporter.get("email")) or by_phone.get(reporter.get("phone"))
+            ids.append(reporter_id)
+            if reporter_id is not None:
+                continue
+            # The same primary source may report several cases in one chunk
+            key = reporter.get("email") or reporter.get("phone")
+            if key not in new_index or key is None:
+                new_index[key] = len(new_rows)
+                new_rows.append({field: reporter.get(field) for field in ("reporter_type", "name", "phone", "email")})
+            new_positions.append(new_index[key] if key is not None else len(new_rows) - 1)
+
+        if new_rows:
+            new_ids = db.scalars(insert(Reporter).returning(Reporter.id, sort_by_parameter_order=True), new_rows).all()
+            pending = iter(new_positions)
+            ids = [reporter_id if reporter_id is not None else new_ids[next(pending)] for reporter_id in ids]
+        return ids
+
+    def import_chunk(self, db: Session, batch_id: str, cases: List[Tuple[int, Optional[str], EventCreate, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """
+        Resolve reporters and insert one chunk of cases in a single transaction.
+
+        Args:
+            db: Database session
+            batch_id: Identifier shared by all chunks of one import
+            cases: (case number, safety report id, event, reporter fields)
+
+        Returns:
+            Manifest entries for the chunk
+        """
+        reporter_ids = self._resolve_reporters(db, [reporter for _, _, _, reporter in cases])
+        for (_, _, event, _), reporter_id in zip(cases, reporter_ids):
+            event.reporter_id = reporter_id
+        entries = bulk_ingest_service.ingest_chunk(db, batch_id, [(number, event) for number, _, event, _ in cases])
+        return [
+            {"case": number, "safety_report_id": report_id, **{k: v for k, v in entry.items() if k != "line"}}
+            for (number, report_id, _, _), entry in zip(cases, entries)
+        ]
+
+    async def import_batch(self, db: Session, body: AsyncIterator[bytes]) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """
+        Import an E2B(R3) batch (MCCI_IN200100UV01) or a single ICSR message.
+
+        Cases are committed per chunk of BULK_INGEST_CHUNK_SIZE. Malformed
+        XML stops the import at that point; the cases before it are kept and
+        the error is reported as the last manifest entry.
+
+        Args:
+            db: Database session
+            body: Request body byte stream
+
+        Returns:
+            Per-case manifest and a summary
+        """
+        batch_id = uuid.uuid4().hex
+        started = time.perf_counter()
+        parser = ET.XMLPullParser(events=("start", "end"))
+        manifest: List[Dict[str, Any]] = []
+        chunk: List[Tuple[int, Optional[str], EventCreate, Dict[str, Any]]] = []
+        stack: List[ET.Element] = []
+        number = 0
+        tail = b""
+
+        async def flush():
+            try:
+                entries = await run_in_threadpool(self.import_chunk, db, batch_id, chunk)
+            except Exception as e:
+                logger.error(f"E2B import {batch_id} chunk failed: {str(e)}")
+                await run_in_threadpool(db.rollback)
+                entries = [{"case": n, "safety_report_id": r, "status": "failed", "errors": ["Database error"]} for n, r, _, _ in chunk]
+            manifest.extend(entries)
+            enrichment_service.notify()
+
+        try:
+            async for data in body:
+                # Entity declarations have no place in ICSRs; refuse them outright
+                if b"<!DOCTYPE" in tail + data or b"<!ENTITY" in tail + data:
+                    raise ET.ParseError("DOCTYPE and ENTITY declarations are not allowed")
+                tail = data[-16:]
+                parser.feed(data)
+                for kind, elem in parser.read_events():
+                    if kind == "start":
+                        stack.append(elem)
+                        continue
+                    stack.pop()
+                    if _tag(elem) != MESSAGE_TAG:
+                        continue
+                    number += 1
+                    report_id, event, reporter = parse_case(elem)
+                    if stack:
+                        stack[-1].remove(elem)
+                    try:
+                        chunk.append((number, report_id, EventCreate.model_validate({**event, "reporter_id": 0}), reporter))
+                    except ValidationError as e:
+                        manifest.append({
+                            "case": number,
+                            "safety_report_id": report_id,
+                            "status": "invalid",
+                            "errors": [f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in e.errors()]
+                        })
+                        continue
+                    if len(chunk) >= settings.BULK_INGEST_CHUNK_SIZE:
+                        await flush()
+                        chunk = []
+            parser.close()
+        except ET.ParseError as e:
+            manifest.append({"case": number + 1, "safety_report_id": None, "status": "invalid", "errors": [f"Malformed XML: {e}"]})
+
+        if chunk:
+            await flush()
+
+        manifest.sort(key=lambda entry: entry["case"])
+        duration = time.perf_counter() - started
+        counts = {status: 0 for status in ("created", "invalid", "rejected", "failed")}
+        for entry in manifest:
+            counts[entry["status"]] += 1
+        summary = {
+            "batch_id": batch_id,
+            "cases": number,
+            **counts,
+            "duration_ms": round(duration * 1000),
+            "events_per_second": round(counts["created"] / duration) if duration > 0 else None
+        }
+        logger.info(f"E2B import {batch_id}: {counts['created']}/{number} cases created in {summary['duration_ms']} ms")
+        return manifest, summary
+
+    @staticmethod
+    def export_batch(date_from: Optional[datetime] = None, date_to: Optional[datetime] = None) -> Iterator[str]:
+        """
+        Serialize events as an E2B(R3) batch, one case at a time.
+
+        Uses a session of its own because the response outlives the request
+        scope, and a server-side cursor (yield_per) so rows arrive in
+        batches of E2B_EXPORT_BATCH_SIZE.
+
+        Args:
+            date_from: Only events created at or after this time
+            date_to: Only events created before this time
+
+        Yields:
+            XML text fragments
+        """
+        db = SessionLocal()
+        try:
+            query = select(*EXPORT_COLUMNS).join(Reporter, Event.reporter_id == Reporter.id)
+            if date_from:
+                query = query.where(Event.created_at >= date_from)
+            if date_to:
+                query = query.where(Event.created_at < date_to)
+            rows = db.execute(query.order_by(Event.id).execution_options(yield_per=settings.E2B_EXPORT_BATCH_SIZE))
+
+            now = _ts(datetime.now(timezone.utc))
+            yield (
+                '<?xml version="1.0" encoding="UTF-8"?>\n'
+                f'<MCCI_IN200100UV01 xmlns="{HL7_NS}" xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" ITSVersion="XML_1.0">'
+                f'<id root="{BATCH_ID_ROOT}" extension="{uuid.uuid4()}"/>'
+                f'<creationTime value="{now}"/>'
+                '<responseModeCode code="D"/>'
+                '<interactionId root="2.16.840.1.113883.1.6" extension="MCCI_IN200100UV01"/>'
+                '<name code="1" codeSystem="2.16.840.1.113883.3.989.2.1.1.1"/>'
+            )
+            for row in rows:
+                yield ET.tostring(build_case(row), encoding="unicode")
+            yield (
+                '<receiver typeCode="RCV"><device classCode="DEV" determinerCode="INSTANCE">'
+                f'<id root="2.16.840.1.113883.3.989.2.1.3.14" extension="{settings.E2B_RECEIVER_ID}"/></device></receiver>'
+                '<sender typeCode="SND"><device classCode="DEV" determinerCode="INSTANCE">'
+                f'<id root="2.16.840.1.113883.3.989.2.1.3.13" extension="{settings.E2B_SENDER_ID}"/></device></sender>'
+                '</MCCI_IN200100UV01>\n'
+            )
+        finally:
+            db.close()
+
+
+# Export singleton instance
+e2b_service = E2BService()
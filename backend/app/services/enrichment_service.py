@@ -0,0 +1,338 @@
+"""Durable background queue and worker pool for AI enrichment of new events."""
+from sqlalchemy import case, exists, func, insert, select, update
+from sqlalchemy.orm import Session, aliased
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.database import Event, EnrichmentJob, AuditLog
+from app.services.local_risk_model import local_risk_model
+from app.services.risk_service import risk_service, risk_inputs
+from datetime import timedelta
+from typing import Dict, Any, List, Optional
+import asyncio
+import logging
+import os
+import socket
+import time
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_JOB_STATUSES = ("queued", "running")
+
+# How often idle workers look for jobs abandoned by crashed workers
+STALE_SWEEP_SECONDS = 60
+
+
+def job_priority(event: Event) -> int:
+    """Queue priority from the local risk score (lower runs first), so critical-sounding reports jump the queue."""
+    return int(100 - local_risk_model.score(risk_inputs(event))["score"])
+
+
+class EnrichmentService:
+    """
+    Postgres-backed job queue for missing-field detection, risk scoring and escalation.
+
+    Workers claim the most urgent runnable job with SELECT ... FOR UPDATE SKIP
+    LOCKED, so any number of workers in any number of processes share the
+    queue without double-processing. A job is only runnable when no earlier
+    job of the same event is queued or running, which keeps each event's jobs
+    in submission order. Failed jobs are retried with exponential backoff up
+    to max_attempts; jobs left running by a crashed worker are requeued after
+    settings.ENRICHMENT_JOB_TIMEOUT_SECONDS.
+    """
+
+    def __init__(self):
+        """Initialize an idle pool."""
+        self.worker_prefix = f"{socket.gethostname()}:{os.getpid()}"
+        self._workers: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._last_sweep = 0.0
+
+    @staticmethod
+    def enqueue(db: Session, event: Event, kind: str = "triage") -> EnrichmentJob:
+        """
+        Queue an enrichment job for an event; the caller commits.
+
+        Args:
+            db: Database session
+            event: Event to enrich (must have an id)
+            kind: Job kind; 'triage' runs missing fields, risk and escalation
+
+        Returns:
+            The new job
+        """
+        job = EnrichmentJob(
+            event_id=event.id,
+            kind=kind,
+            priority=job_priority(event),
+            max_attempts=settings.ENRICHMENT_MAX_ATTEMPTS
+        )
+        db.add(job)
+        event.enrichment_status = "pending"
+        return job
+
+    @staticmethod
+    def enqueue_batch(db: Session, event_ids: List[int], records: List[Dict[str, Any]]) -> List[int]:
+        """
+        Queue triage jobs for many new events with one multi-row INSERT; the caller commits.
+
+        Priorities come from a single vectorized pass of the local risk model.
+        The events' enrichment_status is expected to be set to 'pending' by
+        the caller when inserting them.
+
+        Args:
+            db: Database session
+            event_ids: IDs of the inserted events
+            records: Event fields in the same order as event_ids
+
+        Returns:
+            Priorities of the queued jobs, in event_ids order
+        """
+        priorities = (100 - local_risk_model.score_batch(records)["score"]).astype(int).tolist()
+        db.execute(insert(EnrichmentJob), [
+            {
+                "event_id": event_id,
+                "kind": "triage",
+                "priority": priority,
+                "max_attempts": settings.ENRICHMENT_MAX_ATTEMPTS
+            }
+            for event_id, priority in zip(event_ids, priorities)
+        ])
+        return priorities
+
+    def notify(self) -> None:
+        """Wake idle workers in this process after new jobs were committed (safe from any thread)."""
+        if self._wakeup is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    @staticmethod
+    def claim(db: Session, worker_id: str) -> Optional[EnrichmentJob]:
+        """
+        Claim the most urgent runnable job and mark it running.
+
+        Args:
+            db: Database session
+            worker_id: Identifier recorded on the claimed job
+
+        Returns:
+            The claimed job, or None when nothing is runnable
+        """
+        earlier = aliased(EnrichmentJob)
+        blocked = exists().where(
+            earlier.event_id == EnrichmentJob.event_id,
+            earlier.id < EnrichmentJob.id,
+            earlier.status.in_(ACTIVE_JOB_STATUSES)
+        )
+        job = db.execute(
+            select(EnrichmentJob)
+            .where(EnrichmentJob.status == "queued", EnrichmentJob.run_after <= func.now(), ~blocked)
+            .order_by(EnrichmentJob.priority, EnrichmentJob.id)
+            .limit(1)
+            .with_for_update(skip_locked=True, of=EnrichmentJob)
+        ).scalar_one_or_none()
+
+        if job is None:
+            db.rollback()
+            return None
+
+        job.status = "running"
+        job.attempts += 1
+        job.locked_by = worker_id
+        job.locked_at = func.now()
+        db.execute(update(Event).where(Event.id == job.event_id).values(enrichment_status="running"))
+        db.commit()
+        # Reload here so the worker can read the job on the event loop without a query
+        db.refresh(job)
+        return job
+
+    @staticmethod
+    async def _run(db: Session, job: EnrichmentJob) -> Dict[str, Any]:
+        """Execute one job."""
+        if job.kind != "triage":
+            raise ValueError(f"Unknown enrichment job kind: {job.kind}")
+        result = await risk_service.triage_and_store_async(db, job.event_id)
+        if "error" in result:
+            raise LookupError(result["error"])
+        return result
+
+    @staticmethod
+    def complete(db: Session, job: EnrichmentJob, result: Dict[str, Any]) -> None:
+        """Mark a job succeeded and the event enriched once no other job is pending."""
+        job.status = "succeeded"
+        job.finished_at = func.now()
+        job.locked_by = None
+        job.last_error = None
+
+        pending = db.query(EnrichmentJob.id).filter(
+            EnrichmentJob.event_id == job.event_id,
+            EnrichmentJob.id != job.id,
+            EnrichmentJob.status.in_(ACTIVE_JOB_STATUSES)
+        ).first()
+        if pending is None:
+            db.execute(update(Event).where(Event.id == job.event_id).values(enrichment_status="completed"))
+
+        risk = result.get("risk", {})
+        db.add(AuditLog(
+            event_id=job.event_id,
+            action="EVENT_ENRICHED",
+            meta={
+                "job_id": job.id,
+                "attempts": job.attempts,
+                "risk_class": risk.get("risk_class"),
+                "missing_fields_count": len(result.get("missing_fields", {}).get("required_fields", []))
+            }
+        ))
+        db.commit()
+
+    @staticmethod
+    def fail(db: Session, job_id: int, error: Exception) -> None:
+        """Schedule a retry with exponential backoff, or mark the job failed after max_attempts."""
+        db.rollback()
+        job = db.get(EnrichmentJob, job_id)
+        if job is None:
+            return
+
+        job.last_error = str(error)[:2000]
+        job.locked_by = None
+        if job.attempts >= job.max_attempts:
+            job.status = "failed"
+            job.finished_at = func.now()
+            db.execute(update(Event).where(Event.id == job.event_id).values(enrichment_status="failed"))
+            logger.error(f"Enrichment job {job.id} for event {job.event_id} failed after {job.attempts} attempts")
+        else:
+            delay = settings.ENRICHMENT_RETRY_BASE_SECONDS * (2 ** (job.attempts - 1))
+            job.status = "queued"
+            job.run_after = func.now() + timedelta(seconds=delay)
+            db.execute(update(Event).where(Event.id == job.event_id).values(enrichment_status="pending"))
+            logger.warning(f"Enrichment job {job.id} retrying in {delay:.0f}s: {str(error)}")
+        db.commit()
+
+    @staticmethod
+    def requeue_stale(db: Session) -> int:
+        """Requeue (or fail, when out of attempts) jobs left running by a crashed worker."""
+        cutoff = func.now() - timedelta(seconds=settings.ENRICHMENT_JOB_TIMEOUT_SECONDS)
+        requeued = db.execute(
+            update(EnrichmentJob)
+            .where(EnrichmentJob.status == "running", EnrichmentJob.locked_at < cutoff)
+            .values(
+                status=case((EnrichmentJob.attempts >= EnrichmentJob.max_attempts, "failed"), else_="queued"),
+                locked_by=None,
+                last_error="Worker timed out"
+            )
+            .returning(EnrichmentJob.event_id, EnrichmentJob.status)
+        ).all()
+        for status in ("queued", "failed"):
+            event_ids = [event_id for event_id, job_status in requeued if job_status == status]
+            if event_ids:
+                db.execute(
+                    update(Event)
+                    .where(Event.id.in_(event_ids))
+                    .values(enrichment_status="pending" if status == "queued" else "failed")
+                )
+        db.commit()
+        if requeued:
+            logger.warning(f"Requeued {len(requeued)} stale enrichment jobs")
+        return len(requeued)
+
+    async def process_one(self, worker_id: str) -> bool:
+        """
+        Claim and run a single job with a session of its own.
+
+        Queue bookkeeping runs in the threadpool; only the job itself (its AI
+        call) is awaited on the event loop.
+
+        Returns:
+            True if a job was processed, False when the queue had nothing runnable
+        """
+        db = SessionLocal()
+        try:
+            job = await run_in_threadpool(self.claim, db, worker_id)
+            if job is None:
+                return False
+            job_id = job.id
+            try:
+                result = await self._run(db, job)
+            except Exception as e:
+                logger.error(f"Enrichment job {job_id} failed: {str(e)}")
+                await run_in_threadpool(self.fail, db, job_id, e)
+            else:
+                await run_in_threadpool(self.complete, db, job, result)
+            return True
+        finally:
+            await run_in_threadpool(db.close)
+
+    def _sweep_stale(self) -> None:
+        db = SessionLocal()
+        try:
+            self.requeue_stale(db)
+        finally:
+            db.close()
+
+    async def _worker(self, worker_id: str) -> None:
+        """Process jobs until cancelled, sleeping while the queue is empty."""
+        while True:
+            try:
+                if await self.process_one(worker_id):
+                    continue
+                if time.monotonic() - self._last_sweep >= STALE_SWEEP_SECONDS:
+                    self._last_sweep = time.monotonic()
+                    await run_in_threadpool(self._sweep_stale)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Enrichment worker {worker_id} error: {str(e)}")
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), settings.ENRICHMENT_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    def start(self, workers: int = settings.ENRICHMENT_WORKERS) -> None:
+        """Start the worker pool on the running event loop."""
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._workers = [
+            asyncio.create_task(self._worker(f"{self.worker_prefix}:{index}"))
+            for index in range(workers)
+        ]
+        logger.info(f"Started {workers} enrichment workers")
+
+    async def stop(self) -> None:
+        """Cancel the worker pool and wait for it; interrupted jobs are requeued as stale."""
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    @staticmethod
+    def status(db: Session, event_id: int) -> Dict[str, Any]:
+        """
+        Get the enrichment state of an event and its jobs.
+
+        Args:
+            db: Database session
+            event_id: Event ID
+
+        Returns:
+            Dictionary with enrichment_status, risk summary and jobs
+        """
+        event = db.get(Event, event_id)
+
+        if not event:
+            return {"error": "Event not found"}
+
+        jobs = db.query(EnrichmentJob).filter(EnrichmentJob.event_id == event_id).order_by(EnrichmentJob.id).all()
+        return {
+            "event_id": event.id,
+            "enrichment_status": event.enrichment_status,
+            "risk_class": event.risk_class,
+            "missing_fields": event.missing_fields,
+            "followup_status": event.followup_status,
+            "jobs": jobs
+        }
+
+
+# Export singleton instance
+enrichment_service = EnrichmentService()
@@ -0,0 +1,247 @@
+"""Bulk intake of adverse events from NDJSON or CSV streams."""
+from pydantic import ValidationError
+from sqlalchemy import insert, select, update
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.models.database import Event, Reporter, AuditLog
+from app.models.schemas import EventCreate
+from app.services.duplicate_service import duplicate_service
+from app.services.enrichment_service import enrichment_service
+from app.services.terminology_service import terminology_service
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+import csv
+import json
+import logging
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+# Content types accepted by the bulk endpoint -> record format
+CONTENT_TYPES = {
+    "application/x-ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+    "application/json-seq": "ndjson",
+    "text/csv": "csv"
+}
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Split a byte stream into text lines without buffering the whole body."""
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line.decode("utf-8-sig").rstrip("\r")
+    if buffer:
+        yield buffer.decode("utf-8-sig").rstrip("\r")
+
+
+async def iter_records(lines: AsyncIterator[str], fmt: str) -> AsyncIterator[Tuple[int, Any]]:
+    """
+    Parse lines into raw records.
+
+    Yields (line number, dict) for parsed records and (line number, str) with
+    the parse error otherwise. CSV needs a header row of EventCreate field
+    names; empty cells are treated as missing values and quoted cells may
+    span lines.
+
+    Args:
+        lines: Text lines of the body
+        fmt: 'ndjson' or 'csv'
+    """
+    header: Optional[List[str]] = None
+    pending: List[str] = []
+    start = line_no = 0
+
+    async for line in lines:
+        line_no += 1
+        if fmt == "ndjson":
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                yield line_no, f"Invalid JSON: {e.msg}"
+                continue
+            yield line_no, record if isinstance(record, dict) else "Expected a JSON object"
+            continue
+
+        # CSV: keep joining lines while a quoted cell is still open
+        if not pending:
+            if not line.strip():
+                continue
+            start = line_no
+        pending.append(line)
+        if sum(part.count('"') for part in pending) % 2:
+            continue
+        row = next(csv.reader(["\n".join(pending)]))
+        pending = []
+
+        if header is None:
+            header = [name.strip() for name in row]
+            continue
+        if len(row) != len(header):
+            yield start, f"Expected {len(header)} columns, got {len(row)}"
+            continue
+        yield start, {name: value.strip() or None for name, value in zip(header, row)}
+
+    if pending:
+        yield start, "Unterminated quoted field"
+
+
+def _validation_errors(error: ValidationError) -> List[str]:
+    return [f"{'.'.join(str(part) for part in e['loc']) or 'record'}: {e['msg']}" for e in error.errors()]
+
+
+class BulkIngestService:
+    """
+    Ingest large batches of events with a few statements per chunk.
+
+    Records are validated as they stream in and written one chunk at a time:
+    one lookup for the reporters, a batch terminology lookup, one multi-row
+    INSERT ... RETURNING for the events, a duplicate check against the
+    in-memory LSH index, one INSERT for the enrichment jobs of the
+    non-duplicates and one for the audit entries, then a single commit. AI
+    enrichment runs later on the enrichment workers.
+    """
+
+    @staticmethod
+    def ingest_chunk(db: Session, batch_id: str, chunk: List[Tuple[int, EventCreate]]) -> List[Dict[str, Any]]:
+        """
+        Insert one chunk of validated events and queue their enrichment.
+
+        Args:
+            db: Database session
+            batch_id: Identifier shared by all chunks of one upload
+            chunk: (line number, validated event) pairs
+
+        Returns:
+            Manifest entries for the chunk, in line order
+        """
+        reporter_ids = {event.reporter_id for _, event in chunk}
+        known = set(db.scalars(select(Reporter.id).where(Reporter.id.in_(reporter_ids))))
+
+        results: Dict[int, Dict[str, Any]] = {}
+        lines, rows = [], []
+        for line, event in chunk:
+            if event.reporter_id not in known:
+                results[line] = {"line": line, "status": "rejected", "errors": [f"reporter_id: Reporter {event.reporter_id} not found"]}
+                continue
+            lines.append(line)
+            rows.append({**event.model_dump(), "followup_status": "pending", "enrichment_status": "pending"})
+
+        if rows:
+            for row, codes in zip(rows, terminology_service.code_events(rows)):
+                row.update(codes)
+            event_ids = db.scalars(insert(Event).returning(Event.id, sort_by_parameter_order=True), rows).all()
+
+            # Resubmitted cases point at the original and are not enriched again
+            duplicates = duplicate_service.detect(db, event_ids, rows) if settings.DUPLICATE_DETECTION_ENABLED else {}
+            if duplicates:
+                db.execute(update(Event), [
+                    {
+                        "id": event_id,
+                        "duplicate_of": root,
+                        "duplicate_score": similarity,
+                        "duplicate_status": "suspected",
+                        "enrichment_status": "skipped"
+                    }
+                    for event_id, (root, similarity) in duplicates.items()
+                ])
+            queued_ids = [event_id for event_id in event_ids if event_id not in duplicates]
+            queued_rows = [row for event_id, row in zip(event_ids, rows) if event_id not in duplicates]
+            priorities = dict(zip(queued_ids, enrichment_service.enqueue_batch(db, queued_ids, queued_rows) if queued_ids else []))
+
+            db.execute(insert(AuditLog), [
+                {
+                    "event_id": event_id,
+                    "reporter_id": row["reporter_id"],
+                    "action": "EVENT_CREATED",
+                    "meta": (
+                        {"enrichment": "skipped", "duplicate_of": duplicates[event_id][0], "similarity": duplicates[event_id][1], "bulk_batch": batch_id}
+                        if event_id in duplicates else
+                        {"enrichment": "queued", "priority": priorities[event_id], "bulk_batch": batch_id}
+                    )
+                }
+                for event_id, row in zip(event_ids, rows)
+            ])
+            db.commit()
+            for line, event_id in zip(lines, event_ids):
+                results[line] = {"line": line, "status": "created", "event_id": event_id}
+                if event_id in duplicates:
+                    results[line]["duplicate_of"] = duplicates[event_id][0]
+
+        return [results[line] for line, _ in chunk]
+
+    async def ingest(self, db: Session, body: AsyncIterator[bytes], fmt: str) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """
+        Validate and ingest a streamed NDJSON or CSV body.
+
+        Each chunk is committed on its own, so a database failure only
+        affects the records of that chunk; they are reported as 'failed'.
+
+        Args:
+            db: Database session
+            body: Request body byte stream
+            fmt: 'ndjson' or 'csv'
+
+        Returns:
+            Per-record manifest (line, status, event_id or errors) and a summary
+        """
+        batch_id = uuid.uuid4().hex
+        chunk_size = settings.BULK_INGEST_CHUNK_SIZE
+        started = time.perf_counter()
+        manifest: List[Dict[str, Any]] = []
+        chunk: List[Tuple[int, EventCreate]] = []
+
+        async def flush():
+            try:
+                entries = await run_in_threadpool(self.ingest_chunk, db, batch_id, chunk)
+            except Exception as e:
+                logger.error(f"Bulk ingest {batch_id} chunk failed: {str(e)}")
+                await run_in_threadpool(db.rollback)
+                entries = [{"line": line, "status": "failed", "errors": ["Database error"]} for line, _ in chunk]
+            manifest.extend(entries)
+            enrichment_service.notify()
+
+        async for line, record in iter_records(iter_lines(body), fmt):
+            if isinstance(record, str):
+                manifest.append({"line": line, "status": "invalid", "errors": [record]})
+                continue
+            try:
+                chunk.append((line, EventCreate.model_validate(record)))
+            except ValidationError as e:
+                manifest.append({"line": line, "status": "invalid", "errors": _validation_errors(e)})
+                continue
+            if len(chunk) >= chunk_size:
+                await flush()
+                chunk = []
+
+        if chunk:
+            await flush()
+
+        manifest.sort(key=lambda entry: entry["line"])
+        duration = time.perf_counter() - started
+        counts = {status: 0 for status in ("created", "invalid", "rejected", "failed")}
+        for entry in manifest:
+            counts[entry["status"]] += 1
+        summary = {
+            "batch_id": batch_id,
+            "received": len(manifest),
+            **counts,
+            "duplicates": sum(1 for entry in manifest if "duplicate_of" in entry),
+            "duration_ms": round(duration * 1000),
+            "events_per_second": round(counts["created"] / duration) if duration > 0 else None
+        }
+        logger.info(
+            f"Bulk ingest {batch_id}: {counts['created']}/{len(manifest)} created in "
+            f"{summary['duration_ms']} ms ({summary['events_per_second']} events/s)"
+        )
+        return manifest, summary
+
+
+# Export singleton instance
+bulk_ingest_service = BulkIngestService()
@@ -0,0 +1,214 @@
+"""CPU-only vectorized risk scoring model over structured event fields."""
+from typing import Dict, List, Any, Iterable
+import json
+import logging
+import os
+import re
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DRUG_PRIORS_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "drug_risk_priors.json")
+
+FEATURES = [
+    "bias",
+    "serious",
+    "seriousness_unknown",
+    "hospitalized",
+    "hospitalization_unknown",
+    "outcome_fatal",
+    "outcome_not_recovered",
+    "outcome_recovering",
+    "outcome_unknown",
+    "comorbidity_count",
+    "drug_prior",
+    "severe_reaction_term"
+]
+
+# Logistic weights per feature for (severity score, hospitalization risk, mortality risk).
+# Hand-calibrated so the classes line up with the LLM prompt's scoring rules.
+WEIGHTS = np.array([
+    [-1.8, -2.5, -5.0],   # bias
+    [1.6, 1.2, 1.2],      # serious
+    [0.3, 0.2, 0.2],      # seriousness_unknown
+    [0.9, 4.0, 1.0],      # hospitalized
+    [0.2, 0.3, 0.1],      # hospitalization_unknown
+    [4.0, 1.0, 8.0],      # outcome_fatal
+    [0.9, 0.6, 0.7],      # outcome_not_recovered
+    [0.3, 0.3, 0.2],      # outcome_recovering
+    [0.4, 0.2, 0.3],      # outcome_unknown
+    [0.25, 0.3, 0.35],    # comorbidity_count (capped)
+    [1.0, 0.6, 0.6],      # drug_prior (log-odds)
+    [1.2, 1.0, 1.2]       # severe_reaction_term
+])
+
+FEATURE_PHRASES = {
+    "serious": "reported as serious",
+    "seriousness_unknown": "seriousness not reported",
+    "hospitalized": "hospitalization",
+    "hospitalization_unknown": "hospitalization status unknown",
+    "outcome_fatal": "fatal outcome",
+    "outcome_not_recovered": "patient not recovered",
+    "outcome_recovering": "patient still recovering",
+    "outcome_unknown": "outcome unknown",
+    "comorbidity_count": "comorbidities",
+    "drug_prior": "suspect drug with a known serious ADR profile",
+    "severe_reaction_term": "medically important reaction term"
+}
+
+# Class boundaries on the 0-100 score (same bands as the LLM prompt)
+CLASS_BOUNDS = np.array([25, 50, 75])
+CLASSES = np.array(["low", "medium", "high", "critical"])
+
+# Outside this band the local score is trusted without asking the LLM
+CONFIDENT_BELOW = 20
+CONFIDENT_ABOVE = 80
+
+MAX_COMORBIDITIES = 5
+
+SEVERE_TERMS = re.compile(
+    r"anaphyla|stevens|johnson|epidermal necrolysis|seizure|convuls|cardiac arrest|arrhythm|"
+    r"myocardial infarction|heart attack|stroke|ha?emorrhag|bleed|liver failure|hepatic failure|"
+    r"renal failure|kidney failure|agranulocytosis|pancytopenia|respiratory failure|death|died|"
+    r"suicid|angioedema|coma|sepsis|pancreatitis|qt prolong",
+    re.IGNORECASE
+)
+
+_LIST_SEPARATORS = re.compile(r"[,;/\n+]|\band\b", re.IGNORECASE)
+_NO_VALUES = {"", "none", "no", "nil", "n/a", "na", "unknown", "none known", "not known"}
+_DRUG_TOKENS = re.compile(r"[a-z]+")
+
+
+def _value(value: Any) -> Any:
+    """Unwrap enum members from pydantic schemas."""
+    return getattr(value, "value", value)
+
+
+def count_comorbidities(text: Any) -> int:
+    """Count listed conditions in a free-text comorbidity field."""
+    if not text:
+        return 0
+    items = [item.strip().casefold() for item in _LIST_SEPARATORS.split(str(text))]
+    return min(sum(1 for item in items if item not in _NO_VALUES), MAX_COMORBIDITIES)
+
+
+class LocalRiskModel:
+    """
+    Logistic risk model over seriousness, hospitalization, outcome,
+    comorbidity count, suspect-drug priors and reaction terms.
+
+    Feature extraction is a light per-record pass; scoring a batch is a
+    single (n x k) @ (k x 3) product, so thousands of events score in
+    milliseconds.
+    """
+
+    def __init__(self, weights: np.ndarray = WEIGHTS, priors_path: str = DRUG_PRIORS_PATH):
+        """Initialize the model and load the suspect-drug priors."""
+        self.weights = weights
+        self.drug_priors: Dict[str, float] = {}
+        if os.path.exists(priors_path):
+            with open(priors_path, encoding="utf-8") as f:
+                self.drug_priors = json.load(f).get("priors", {})
+
+    def drug_prior(self, drug: Any) -> float:
+        """Return the strongest prior among the drug name's tokens."""
+        if not drug:
+            return 0.0
+        name = str(drug).casefold()
+        if name in self.drug_priors:
+            return self.drug_priors[name]
+        priors = [self.drug_priors[t] for t in _DRUG_TOKENS.findall(name) if t in self.drug_priors]
+        return max(priors, key=abs) if priors else 0.0
+
+    def featurize(self, records: Iterable[Dict[str, Any]]) -> np.ndarray:
+        """
+        Build the (n x k) feature matrix for a batch of events.
+
+        Args:
+            records: Dictionaries with seriousness, hospitalization, outcome,
+                comorbidities, suspected_drug and adverse_effect
+
+        Returns:
+            Feature matrix with columns in FEATURES order
+        """
+        rows = []
+        for record in records:
+            seriousness = _value(record.get("seriousness"))
+            hospitalization = record.get("hospitalization")
+            outcome = _value(record.get("outcome"))
+            rows.append((
+                1.0,
+                seriousness == "serious",
+                seriousness in (None, "", "unknown"),
+                hospitalization is True,
+                hospitalization is None,
+                outcome == "fatal",
+                outcome == "not_recovered",
+                outcome == "recovering",
+                outcome in (None, "", "unknown"),
+                count_comorbidities(record.get("comorbidities")),
+                self.drug_prior(record.get("suspected_drug")),
+                bool(record.get("adverse_effect") and SEVERE_TERMS.search(str(record["adverse_effect"])))
+            ))
+        return np.array(rows, dtype=np.float64).reshape(-1, len(FEATURES))
+
+    def score_matrix(self, features: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Score a feature matrix in one vectorized pass.
+
+        Returns:
+            Arrays of score (0-100), hospitalization_risk, mortality_risk and class
+        """
+        probabilities = 1.0 / (1.0 + np.exp(-(features @ self.weights)))
+        scores = np.round(probabilities[:, 0] * 100, 1)
+        return {
+            "score": scores,
+            "hospitalization_risk": np.round(probabilities[:, 1], 3),
+            "mortality_risk": np.round(probabilities[:, 2], 3),
+            "class": CLASSES[np.searchsorted(CLASS_BOUNDS, scores, side="left")]
+        }
+
+    def score_batch(self, records: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+        """Featurize and score a batch of events."""
+        return self.score_matrix(self.featurize(records))
+
+    def score(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Score one event in the same shape as AIService.calculate_risk_score.
+
+        Args:
+            record: Dictionary of event fields
+
+        Returns:
+            Dictionary with score, hospitalization_risk, mortality_risk, class, reasoning
+        """
+        features = self.featurize([record])
+        result = self.score_matrix(features)
+        return {
+            "score": float(result["score"][0]),
+            "hospitalization_risk": float(result["hospitalization_risk"][0]),
+            "mortality_risk": float(result["mortality_risk"][0]),
+            "class": str(result["class"][0]),
+            "reasoning": self.reasoning(features[0])
+        }
+
+    def reasoning(self, features: np.ndarray) -> str:
+        """Name the features that pushed the severity score up the most."""
+        contributions = features * self.weights[:, 0]
+        drivers = [
+            FEATURE_PHRASES[FEATURES[i]]
+            for i in np.argsort(contributions)[::-1]
+            if i > 0 and contributions[i] > 0
+        ][:3]
+        if not drivers:
+            return "Local model: no high-risk factors reported."
+        return "Local model: driven by " + ", ".join(drivers) + "."
+
+    @staticmethod
+    def is_confident(result: Dict[str, Any]) -> bool:
+        """Whether a local score is far enough from the class boundaries to skip the LLM."""
+        return result["score"] < CONFIDENT_BELOW or result["score"] > CONFIDENT_ABOVE
+
+
+# Export singleton instance
+local_risk_model = LocalRiskModel()
@@ -1,7 +1,7 @@
 """Messaging service for WhatsApp, SMS, and email communication."""
 from app.core.config import settings
 import logging
-from typing import Optional
+from typing import Optional, List, Tuple
 
 logger = logging.getLogger(__name__)
 
@@ -13,10 +13,16 @@ class MessagingService:
         """Initialize messaging clients."""
         self.mock_mode = settings.WHATSAPP_API_KEY == "mock" or settings.TWILIO_ACCOUNT_SID == "mock"
         
+        # A stand-in server exercises the real client path even with mock credentials
+        if settings.TWILIO_API_BASE_URL:
+            self.mock_mode = False
+        
         if not self.mock_mode:
             try:
                 from twilio.rest import Client
                 self.twilio_client = Client(settings.TWILIO_ACCOUNT_SID, settings.TWILIO_AUTH_TOKEN)
+                if settings.TWILIO_API_BASE_URL:
+                    self.twilio_client.api.base_url = settings.TWILIO_API_BASE_URL.rstrip("/")
             except Exception as e:
                 logger.warning(f"Failed to initialize Twilio client: {e}. Using mock mode.")
                 self.mock_mode = True
@@ -144,6 +150,44 @@ class MessagingService:
 ❌ Do not share this link"""
         
         return self.send_message(to, message, channel)
+    
+    def send_followup_questions(
+        self,
+        to: str,
+        questions: List[Tuple[str, Optional[str]]],
+        channel: str
+    ) -> bool:
+        """
+        Send several follow-up questions in a single message.
+        
+        Args:
+            to: Phone number or email
+            questions: (question text, secure link) pairs
+            channel: Communication channel
+            
+        Returns:
+            True if sent successfully
+        """
+        if len(questions) == 1:
+            question, secure_link = questions[0]
+            return self.send_followup_question(to, question, channel, secure_link)
+        
+        message = """🏥 [Verified Medical Sender]
+
+"""
+        
+        for number, (question, secure_link) in enumerate(questions, start=1):
+            message += f"{number}. {question}\n"
+            if secure_link:
+                message += f"Answer here: {secure_link}\n"
+            message += "\n"
+        
+        message += """🛡️ Security reminder:
+✅ We never ask for payment
+✅ We never ask for passwords
+❌ Do not share these links"""
+        
+        return self.send_message(to, message, channel)
 
 
 # Export singleton instance
@@ -0,0 +1,123 @@
+"""Regulatory narrative generation and storage."""
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.cache import normalize_inputs
+from app.models.database import Event, Narrative, AuditLog
+from app.services.ai_service import NARRATIVE_FALLBACK
+from datetime import datetime
+from typing import Dict, Any, Optional
+import hashlib
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def narrative_inputs(event: Event) -> Dict[str, Any]:
+    """Extract the event fields used for the ICSR narrative."""
+    return {
+        "reporter_type": event.reporter.reporter_type if event.reporter else "unknown",
+        "suspected_drug": event.suspected_drug,
+        "dose": event.dose,
+        "frequency": event.frequency,
+        "start_date": str(event.start_date) if event.start_date else None,
+        "stop_date": str(event.stop_date) if event.stop_date else None,
+        "adverse_effect": event.adverse_effect,
+        "seriousness": event.seriousness,
+        "hospitalization": event.hospitalization,
+        "outcome": event.outcome,
+        "comorbidities": event.comorbidities,
+        "medications": event.medications
+    }
+
+
+def narrative_input_hash(event_data: Dict[str, Any]) -> str:
+    """Hash the normalized narrative inputs together with the model."""
+    payload = json.dumps({"inputs": normalize_inputs(event_data), "model": settings.OPENAI_MODEL}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class NarrativeService:
+    """
+    Persistence, audit and revision-based reuse of regulatory narratives.
+
+    A stored narrative is served while the event's updated_at and the hash of
+    the narrative inputs both match the revision it was generated from.
+    Writes through RiskService and follow-up answers invalidate it explicitly.
+    """
+
+    @staticmethod
+    def get_current(db: Session, event: Event, event_data: Dict[str, Any]) -> Optional[Narrative]:
+        """
+        Return the stored narrative if it was generated from the event's current revision.
+
+        Args:
+            db: Database session
+            event: Event model instance
+            event_data: Narrative inputs for the event
+
+        Returns:
+            The stored Narrative row, or None when missing or stale
+        """
+        record = db.query(Narrative).filter(Narrative.event_id == event.id).first()
+        if record is None:
+            return None
+        if record.event_updated_at != event.updated_at or record.input_hash != narrative_input_hash(event_data):
+            return None
+        return record
+
+    @staticmethod
+    def invalidate(db: Session, event_id: int) -> None:
+        """Drop the stored narrative for an event; the caller commits."""
+        db.query(Narrative).filter(Narrative.event_id == event_id).delete(synchronize_session=False)
+
+    @staticmethod
+    def store(
+        db: Session,
+        event_id: int,
+        narrative: str,
+        event_data: Dict[str, Any],
+        event_updated_at: Optional[datetime],
+        streamed: bool = False
+    ) -> Optional[Narrative]:
+        """
+        Persist a generated narrative for an event and log the audit trail.
+
+        Fallback text is audited but never stored, so it is not served later.
+
+        Args:
+            db: Database session
+            event_id: Event ID
+            narrative: Generated narrative text
+            event_data: Narrative inputs the text was generated from
+            event_updated_at: Event updated_at read together with event_data
+            streamed: Whether the narrative was delivered as a stream
+
+        Returns:
+            The stored Narrative row, or None for fallback text
+        """
+        record = None
+        if narrative and narrative != NARRATIVE_FALLBACK:
+            record = db.query(Narrative).filter(Narrative.event_id == event_id).first()
+            if record is None:
+                record = Narrative(event_id=event_id)
+                db.add(record)
+            record.narrative = narrative
+            record.model = settings.OPENAI_MODEL
+            record.input_hash = narrative_input_hash(event_data)
+            record.event_updated_at = event_updated_at
+            record.generated_at = datetime.utcnow()
+
+        audit = AuditLog(
+            event_id=event_id,
+            action="NARRATIVE_GENERATED",
+            meta={"narrative_length": len(narrative), "streamed": streamed, "stored": record is not None}
+        )
+        db.add(audit)
+        db.commit()
+
+        return record
+
+
+# Export singleton instance
+narrative_service = NarrativeService()
@@ -1,9 +1,9 @@
 """OTP service for generating and verifying one-time passwords."""
-from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
-from app.models.database import OTPToken, Reporter
-from app.core.security import generate_otp, hash_otp, verify_otp
+from app.models.database import Reporter
+from app.core.security import generate_otp, hash_otp
 from app.core.config import settings
+from app.services.otp_store import otp_store, database_otp_store
 from typing import Dict, Any, Optional
 import logging
 
@@ -11,7 +11,14 @@ logger = logging.getLogger(__name__)
 
 
 class OTPService:
-    """OTP management service."""
+    """
+    OTP management service.
+    
+    Pending codes live in the store selected by OTP_STORE_BACKEND (see
+    app/services/otp_store.py). With Redis, a failed Redis call falls back
+    to the database store, and a code Redis does not know is also looked up
+    there, so codes issued during an outage still verify.
+    """
     
     @staticmethod
     def send_otp(
@@ -38,19 +45,16 @@ class OTPService:
         otp = generate_otp(settings.OTP_LENGTH)
         otp_hash = hash_otp(otp)
         
-        # Set expiry
-        expires_at = datetime.utcnow() + timedelta(minutes=settings.OTP_EXPIRE_MINUTES)
-        
-        # Store in database
-        otp_token = OTPToken(
-            reporter_id=reporter_id,
-            token_hash=otp_hash,
-            channel=channel,
-            phone_or_email=phone_or_email,
-            expires_at=expires_at
-        )
-        db.add(otp_token)
-        db.commit()
+        # Store it until it expires
+        ttl = settings.OTP_EXPIRE_MINUTES * 60
+        try:
+            otp_store.issue(db, phone_or_email, otp_hash, channel, reporter_id, ttl)
+        except Exception as e:
+            if otp_store is database_otp_store:
+                raise
+            logger.warning(f"OTP store {otp_store.name} failed, using the database: {str(e)}")
+            db.rollback()
+            database_otp_store.issue(db, phone_or_email, otp_hash, channel, reporter_id, ttl)
         
         # Send OTP via appropriate channel
         message = f"""🏥 Your verification code is: {otp}
@@ -88,37 +92,37 @@ This code expires in {settings.OTP_EXPIRE_MINUTES} minutes.
         """
         from app.core.security import create_access_token
         
-        # Find most recent non-expired, non-verified OTP
-        otp_token = db.query(OTPToken).filter(
-            OTPToken.phone_or_email == phone_or_email,
-            OTPToken.verified == False,
-            OTPToken.expires_at > datetime.utcnow()
-        ).order_by(OTPToken.created_at.desc()).first()
+        # Check against the pending code, counting the attempt atomically
+        otp_hash = hash_otp(otp)
+        max_attempts = settings.OTP_MAX_ATTEMPTS
+        try:
+            result = otp_store.check(db, phone_or_email, otp_hash, max_attempts)
+        except Exception as e:
+            if otp_store is database_otp_store:
+                raise
+            logger.warning(f"OTP store {otp_store.name} failed, using the database: {str(e)}")
+            db.rollback()
+            result = {"outcome": "missing"}
+        if result["outcome"] == "missing" and otp_store is not database_otp_store:
+            result = database_otp_store.check(db, phone_or_email, otp_hash, max_attempts)
         
-        if not otp_token:
+        if result["outcome"] == "missing":
             return {"success": False, "message": "No valid OTP found or OTP expired", "token": None}
         
-        # Check attempts
-        if otp_token.attempts >= 3:
+        if result["outcome"] == "locked":
             return {"success": False, "message": "Too many failed attempts. Request a new OTP.", "token": None}
         
-        # Verify OTP
-        if verify_otp(otp, otp_token.token_hash):
-            # Mark as verified
-            otp_token.verified = True
-            otp_token.verified_at = datetime.utcnow()
-            
+        if result["outcome"] == "verified":
             # Mark reporter as verified if linked
-            if otp_token.reporter_id:
-                reporter = db.query(Reporter).filter(Reporter.id == otp_token.reporter_id).first()
+            if result["reporter_id"]:
+                reporter = db.query(Reporter).filter(Reporter.id == result["reporter_id"]).first()
                 if reporter:
                     reporter.verified = True
-            
-            db.commit()
+                    db.commit()
             
             # Generate access token
             token_data = {
-                "reporter_id": otp_token.reporter_id,
+                "reporter_id": result["reporter_id"],
                 "phone_or_email": phone_or_email,
                 "verified": True
             }
@@ -127,11 +131,7 @@ This code expires in {settings.OTP_EXPIRE_MINUTES} minutes.
             logger.info(f"OTP verified successfully for {phone_or_email}")
             return {"success": True, "message": "OTP verified successfully", "token": access_token}
         else:
-            # Increment attempts
-            otp_token.attempts += 1
-            db.commit()
-            
-            remaining = 3 - otp_token.attempts
+            remaining = max_attempts - result["attempts"]
             return {
                 "success": False,
                 "message": f"Invalid OTP. {remaining} attempts remaining.",
@@ -0,0 +1,143 @@
+"""Storage backends for pending one-time passwords."""
+from datetime import datetime, timedelta
+from sqlalchemy import delete
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.database import OTPToken
+from typing import Any, Dict, Optional
+import hashlib
+
+# Check a code and count the attempt in one step, so concurrent guesses
+# cannot exceed the limit and a code verifies at most once. Returns
+# {outcome, attempts, reporter_id}.
+_CHECK_CODE = """
+local code = redis.call('hmget', KEYS[1], 'hash', 'attempts', 'reporter_id')
+if not code[1] then
+    return {'missing', 0, ''}
+end
+local attempts = tonumber(code[2])
+if attempts >= tonumber(ARGV[2]) then
+    return {'locked', attempts, code[3]}
+end
+if code[1] == ARGV[1] then
+    redis.call('del', KEYS[1])
+    return {'verified', attempts, code[3]}
+end
+return {'invalid', redis.call('hincrby', KEYS[1], 'attempts', 1), code[3]}
+"""
+
+
+class DatabaseOTPStore:
+    """
+    Codes as rows of otp_tokens.
+
+    Issuing a code deletes the contact's earlier unverified ones, which could
+    no longer be used, so the table holds at most one pending code per
+    contact plus the verified ones. Attempts are counted under a row lock.
+    """
+
+    name = "database"
+
+    def issue(
+        self,
+        db: Session,
+        phone_or_email: str,
+        token_hash: str,
+        channel: str,
+        reporter_id: Optional[int],
+        ttl: int
+    ) -> None:
+        """Store a new code for a contact, replacing any pending one."""
+        db.execute(delete(OTPToken).where(OTPToken.phone_or_email == phone_or_email, OTPToken.verified == False))
+        db.add(OTPToken(
+            reporter_id=reporter_id,
+            token_hash=token_hash,
+            channel=channel,
+            phone_or_email=phone_or_email,
+            expires_at=datetime.utcnow() + timedelta(seconds=ttl)
+        ))
+        db.commit()
+
+    def check(self, db: Session, phone_or_email: str, token_hash: str, max_attempts: int) -> Dict[str, Any]:
+        """Check a code against the contact's pending one (see OTPService.verify_otp)."""
+        otp_token = db.query(OTPToken).filter(
+            OTPToken.phone_or_email == phone_or_email,
+            OTPToken.verified == False,
+            OTPToken.expires_at > datetime.utcnow()
+        ).order_by(OTPToken.created_at.desc()).with_for_update().first()
+
+        if not otp_token:
+            db.rollback()
+            return {"outcome": "missing", "attempts": 0, "reporter_id": None}
+        result = {"attempts": otp_token.attempts, "reporter_id": otp_token.reporter_id}
+        if otp_token.attempts >= max_attempts:
+            db.rollback()
+            return {"outcome": "locked", **result}
+
+        if otp_token.token_hash == token_hash:
+            otp_token.verified = True
+            otp_token.verified_at = datetime.utcnow()
+            db.commit()
+            return {"outcome": "verified", **result}
+
+        otp_token.attempts += 1
+        db.commit()
+        return {"outcome": "invalid", **result, "attempts": result["attempts"] + 1}
+
+
+class RedisOTPStore:
+    """
+    Codes as Redis hashes on the shared instance, one per contact.
+
+    Keys hold a digest of the contact rather than the contact itself and
+    expire natively. A new code overwrites the pending one. Checking, attempt
+    counting and consuming a verified code happen in one Lua script.
+    """
+
+    name = "redis"
+
+    @staticmethod
+    def key(phone_or_email: str) -> str:
+        """Redis key of a contact's pending code."""
+        return f"otp:{hashlib.sha256(phone_or_email.encode()).hexdigest()}"
+
+    def issue(
+        self,
+        db: Session,
+        phone_or_email: str,
+        token_hash: str,
+        channel: str,
+        reporter_id: Optional[int],
+        ttl: int
+    ) -> None:
+        """Store a new code for a contact, replacing any pending one."""
+        from app.core.redis import get_redis
+        key = self.key(phone_or_email)
+        pipe = get_redis().pipeline()
+        pipe.delete(key)
+        pipe.hset(key, mapping={
+            "hash": token_hash,
+            "channel": channel,
+            "reporter_id": reporter_id if reporter_id is not None else "",
+            "attempts": 0
+        })
+        pipe.expire(key, ttl)
+        pipe.execute()
+
+    def check(self, db: Session, phone_or_email: str, token_hash: str, max_attempts: int) -> Dict[str, Any]:
+        """Check a code against the contact's pending one (see OTPService.verify_otp)."""
+        from app.core.redis import get_redis
+        outcome, attempts, reporter_id = get_redis().eval(_CHECK_CODE, 1, self.key(phone_or_email), token_hash, max_attempts)
+        return {"outcome": outcome, "attempts": int(attempts), "reporter_id": int(reporter_id) if reporter_id else None}
+
+
+def _build_store() -> Any:
+    """Create the store selected by settings.OTP_STORE_BACKEND."""
+    if settings.OTP_STORE_BACKEND == "redis":
+        return RedisOTPStore()
+    return DatabaseOTPStore()
+
+
+# Global store instances; the database store also takes over when Redis fails
+otp_store = _build_store()
+database_otp_store = DatabaseOTPStore()
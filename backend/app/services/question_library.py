@@ -0,0 +1,132 @@
+"""Pre-translated follow-up question library with an in-memory index."""
+from app.core.config import settings
+from typing import Dict, Any, Optional, Tuple
+import json
+import logging
+import os
+import re
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LIBRARY_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "followup_questions")
+
+_VERSION_FILE = re.compile(r"^v(\d+)\.json$")
+
+
+def latest_library_path(directory: str = DEFAULT_LIBRARY_DIR) -> Optional[str]:
+    """Return the highest-versioned library file (vN.json) in a directory."""
+    if not os.path.isdir(directory):
+        return None
+    versions = [
+        (int(match.group(1)), name)
+        for name in os.listdir(directory)
+        if (match := _VERSION_FILE.match(name))
+    ]
+    if not versions:
+        return None
+    return os.path.join(directory, max(versions)[1])
+
+
+class QuestionLibrary:
+    """
+    Follow-up question templates indexed by (field, language, reporter type).
+
+    Templates carry {drug} and {effect} placeholders and are generated
+    offline by scripts/build_question_library.py. Rendering is a dictionary
+    lookup plus two substitutions, so the library is the default path and
+    live generation only runs on a miss.
+    """
+
+    def __init__(self):
+        """Initialize an empty library."""
+        self.version: Optional[int] = None
+        self.path: Optional[str] = None
+        self._templates: Dict[Tuple[str, str, str], str] = {}
+        self._defaults: Dict[str, Dict[str, str]] = {}
+        self._safety_notes: Dict[Tuple[str, str], str] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def load(self, path: Optional[str] = None) -> int:
+        """
+        Load a library file into memory, replacing the current index.
+
+        Args:
+            path: Library file; defaults to settings.QUESTION_LIBRARY_PATH or
+                the latest bundled version
+
+        Returns:
+            Number of templates indexed
+        """
+        path = path or settings.QUESTION_LIBRARY_PATH or latest_library_path()
+        if not path or not os.path.exists(path):
+            logger.warning("No follow-up question library found; using live generation only")
+            return 0
+
+        with open(path, encoding="utf-8") as f:
+            library = json.load(f)
+
+        templates, defaults, safety_notes = {}, {}, {}
+        for language, content in library.get("languages", {}).items():
+            defaults[language] = content.get("defaults", {})
+            for reporter_type in ("patient", "hcp"):
+                if reporter_type in content.get("safety_note", {}):
+                    safety_notes[(language, reporter_type)] = content["safety_note"][reporter_type]
+                for field_name, template in content.get(reporter_type, {}).items():
+                    templates[(field_name, language, reporter_type)] = template
+
+        # Swap in one assignment so concurrent readers never see a partial index
+        self._templates, self._defaults, self._safety_notes = templates, defaults, safety_notes
+        self.version = library.get("version")
+        self.path = path
+
+        logger.info(f"Loaded follow-up question library v{self.version}: {len(templates)} templates")
+        return len(templates)
+
+    def render(
+        self,
+        field_name: str,
+        event_context: Dict[str, Any],
+        language: str = "en",
+        reporter_type: str = "patient"
+    ) -> Optional[str]:
+        """
+        Render a question from the library.
+
+        Args:
+            field_name: The missing field to ask about
+            event_context: Context from the event (suspected_drug, adverse_effect)
+            language: Target language code
+            reporter_type: 'patient' or 'hcp'
+
+        Returns:
+            Question text, or None when the library has no template
+        """
+        template = self._templates.get((field_name, language, reporter_type))
+        if template is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+
+        defaults = self._defaults.get(language, {})
+        drug = event_context.get("suspected_drug") or defaults.get("drug", "medication")
+        effect = event_context.get("adverse_effect") or defaults.get("effect", "reaction")
+        question = template.replace("{drug}", drug).replace("{effect}", effect)
+
+        safety_note = self._safety_notes.get((language, reporter_type))
+        return f"{question}\n\n{safety_note}" if safety_note else question
+
+    def stats(self) -> Dict[str, Any]:
+        """Return library version, size and hit/miss counters."""
+        lookups = self.hits + self.misses
+        return {
+            "version": self.version,
+            "templates": len(self._templates),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+
+# Export singleton instance
+question_library = QuestionLibrary()
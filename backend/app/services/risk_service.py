@@ -1,114 +1,426 @@
 """Risk scoring service for adverse events."""
+from sqlalchemy import select, update
 from sqlalchemy.orm import Session
-from app.models.database import Event
-from app.services.ai_service import ai_service
-from typing import Dict, Any
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.core.cache import normalize_inputs
+from app.core.singleflight import risk_singleflight
+from app.models.database import Event, Narrative
+from app.services.ai_service import ai_service, async_ai_service, MISSING_FIELDS_FALLBACK
+from app.services.completeness_service import completeness_service
+from app.services.local_risk_model import local_risk_model
+from app.services.narrative_service import narrative_service
+from datetime import datetime
+from typing import Dict, Any, Optional
+import hashlib
+import json
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 
 
+RISK_INPUT_FIELDS = ("suspected_drug", "adverse_effect", "seriousness", "hospitalization", "outcome", "comorbidities")
+
+
+def risk_inputs(event: Event) -> Dict[str, Any]:
+    """Extract the event fields used for risk scoring."""
+    return {field: getattr(event, field) for field in RISK_INPUT_FIELDS}
+
+
+def risk_input_hash(event_data: Dict[str, Any]) -> str:
+    """Hash the normalized risk inputs together with the scoring mode and model."""
+    payload = json.dumps(
+        {"inputs": normalize_inputs(event_data), "mode": settings.RISK_SCORING_MODE, "model": settings.OPENAI_MODEL},
+        sort_keys=True,
+        default=str
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def missing_field_inputs(event: Event) -> Dict[str, Any]:
+    """Extract the event fields used for missing-field detection."""
+    return {
+        "suspected_drug": event.suspected_drug,
+        "dose": event.dose,
+        "frequency": event.frequency,
+        "start_date": str(event.start_date) if event.start_date else None,
+        "stop_date": str(event.stop_date) if event.stop_date else None,
+        "adverse_effect": event.adverse_effect,
+        "seriousness": event.seriousness,
+        "hospitalization": event.hospitalization,
+        "outcome": event.outcome,
+        "comorbidities": event.comorbidities,
+        "medications": event.medications
+    }
+
+
+ESCALATED_CLASSES = ("high", "critical")
+
+
 class RiskService:
-    """Risk assessment and scoring service."""
-    
+    """
+    Risk assessment and scoring service.
+
+    settings.RISK_SCORING_MODE picks the engine: 'llm' always asks the model,
+    'local' only uses the vectorized local model, and 'hybrid' trusts the
+    local score when it is far from the class boundaries and asks the model
+    otherwise. The local model is also the fallback when the LLM fails.
+    """
+
     @staticmethod
-    def calculate_and_update_risk(db: Session, event_id: int) -> Dict[str, Any]:
-        """
-        Calculate risk score for an event and update the database.
-        
-        Args:
-            db: Database session
-            event_id: Event ID
-            
-        Returns:
-            Dictionary with risk assessment results
-        """
-        event = db.query(Event).filter(Event.id == event_id).first()
-        
-        if not event:
-            return {"error": "Event not found"}
-        
-        # Prepare event data for AI analysis
-        event_data = {
-            "suspected_drug": event.suspected_drug,
-            "adverse_effect": event.adverse_effect,
-            "seriousness": event.seriousness,
-            "hospitalization": event.hospitalization,
-            "outcome": event.outcome,
-            "comorbidities": event.comorbidities
-        }
-        
-        # Get AI risk assessment
-        risk_result = ai_service.calculate_risk_score(event_data)
-        
-        # Update event with risk scores
+    def _local_risk(event: Event) -> Optional[Dict[str, Any]]:
+        """Return the local risk result when the scoring mode lets it stand in for the LLM."""
+        if settings.RISK_SCORING_MODE == "llm":
+            return None
+        result = local_risk_model.score(risk_inputs(event))
+        if settings.RISK_SCORING_MODE == "local" or local_risk_model.is_confident(result):
+            return result
+        return None
+
+    @staticmethod
+    def is_stale(event: Event) -> bool:
+        """Whether the stored risk is missing or was computed from different inputs."""
+        return event.risk_scored_at is None or event.risk_input_hash != risk_input_hash(risk_inputs(event))
+
+    @staticmethod
+    def _apply_risk(event: Event, risk_result: Dict[str, Any]) -> None:
+        """Set risk scores, reasoning and escalation status on the event without committing."""
         event.risk_score = risk_result.get("score", 50)
         event.risk_class = risk_result.get("class", "medium")
         event.hospitalization_risk = risk_result.get("hospitalization_risk", 0.3)
         event.mortality_risk = risk_result.get("mortality_risk", 0.1)
-        
-        # Update followup status based on risk
-        if event.risk_class in ["high", "critical"]:
+        event.risk_reasoning = risk_result.get("reasoning", "")
+        event.risk_input_hash = risk_input_hash(risk_inputs(event))
+        event.risk_scored_at = datetime.utcnow()
+
+        # Update followup status based on risk; completed follow-ups stay completed
+        if event.risk_class in ESCALATED_CLASSES and event.followup_status != "completed":
             event.followup_status = "escalated"
-        
-        db.commit()
-        db.refresh(event)
-        
-        logger.info(f"Risk calculated for event {event_id}: {event.risk_class} ({event.risk_score})")
-        
+
+    @staticmethod
+    def _risk_response(event: Event) -> Dict[str, Any]:
+        """Build the risk assessment response from the event's stored risk."""
         return {
             "event_id": event.id,
             "risk_score": event.risk_score,
             "risk_class": event.risk_class,
             "hospitalization_risk": event.hospitalization_risk,
             "mortality_risk": event.mortality_risk,
-            "reasoning": risk_result.get("reasoning", "")
+            "reasoning": event.risk_reasoning or "",
+            "scored_at": event.risk_scored_at
+        }
+
+    @staticmethod
+    def _apply_missing_fields(event: Event, missing_fields_result: Dict[str, Any]) -> Dict[str, Any]:
+        """Set detected missing fields on the event without committing."""
+        missing_fields_result.pop("undecided_fields", None)
+        all_missing = missing_fields_result.get("required_fields", []) + missing_fields_result.get("optional_fields", [])
+        event.missing_fields = all_missing
+        return missing_fields_result
+
+    @staticmethod
+    def _store_risk(db: Session, event: Event, risk_result: Dict[str, Any]) -> Dict[str, Any]:
+        """Persist a risk assessment on the event and build the response."""
+        RiskService._apply_risk(event, risk_result)
+        narrative_service.invalidate(db, event.id)
+
+        db.commit()
+        db.refresh(event)
+
+        logger.info(f"Risk calculated for event {event.id}: {event.risk_class} ({event.risk_score})")
+
+        return RiskService._risk_response(event)
+
+    @staticmethod
+    def _store_missing_fields(db: Session, event: Event, missing_fields_result: Dict[str, Any]) -> Dict[str, Any]:
+        """Persist detected missing fields on the event."""
+        missing_fields_result = RiskService._apply_missing_fields(event, missing_fields_result)
+        narrative_service.invalidate(db, event.id)
+
+        db.commit()
+
+        logger.info(f"Missing fields detected for event {event.id}: {len(event.missing_fields)} fields")
+
+        return missing_fields_result
+
+    @staticmethod
+    def _store_triage(db: Session, event: Event, triage_result: Dict[str, Any]) -> Dict[str, Any]:
+        """Persist missing fields and risk from one triage result in a single transaction."""
+        missing_fields_result = completeness_service.evaluate(event)
+        if missing_fields_result["undecided_fields"]:
+            missing_fields_result = completeness_service.resolve(missing_fields_result, triage_result)
+
+        missing_fields_result = RiskService._apply_missing_fields(event, missing_fields_result)
+        RiskService._apply_risk(event, triage_result)
+        narrative_service.invalidate(db, event.id)
+
+        db.commit()
+        db.refresh(event)
+
+        logger.info(
+            f"Event {event.id} triaged: {len(event.missing_fields)} missing fields, "
+            f"risk {event.risk_class} ({event.risk_score})"
+        )
+
+        return {
+            "missing_fields": missing_fields_result,
+            "risk": RiskService._risk_response(event)
         }
-    
+
+    @staticmethod
+    def get_stored_risk(db: Session, event_id: int) -> Dict[str, Any]:
+        """
+        Read the stored risk assessment without recomputing it.
+
+        Args:
+            db: Database session
+            event_id: Event ID
+
+        Returns:
+            Dictionary with the stored risk, when it was scored, and whether it is stale
+        """
+        event = db.get(Event, event_id)
+
+        if not event:
+            return {"error": "Event not found"}
+
+        return {**RiskService._risk_response(event), "stale": RiskService.is_stale(event)}
+
+    @staticmethod
+    async def refresh_stale_risk_async(db: Session, event_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Recompute an event's risk only if its scoring inputs changed.
+
+        Args:
+            db: Database session
+            event_id: Event ID
+
+        Returns:
+            The new risk assessment, or None when the stored one is current
+        """
+        event = await run_in_threadpool(db.get, Event, event_id)
+
+        if not event or not RiskService.is_stale(event):
+            return None
+
+        return await RiskService.calculate_and_update_risk_async(db, event_id)
+
+    @staticmethod
+    def calculate_and_update_risk(db: Session, event_id: int) -> Dict[str, Any]:
+        """
+        Calculate risk score for an event and update the database.
+
+        Args:
+            db: Database session
+            event_id: Event ID
+
+        Returns:
+            Dictionary with risk assessment results
+        """
+        event = db.query(Event).filter(Event.id == event_id).first()
+
+        if not event:
+            return {"error": "Event not found"}
+
+        # Local fast path, then AI risk assessment
+        risk_result = RiskService._local_risk(event) or ai_service.calculate_risk_score(risk_inputs(event))
+
+        return RiskService._store_risk(db, event, risk_result)
+
+    @staticmethod
+    async def calculate_and_update_risk_async(db: Session, event_id: int) -> Dict[str, Any]:
+        """
+        Async variant of calculate_and_update_risk using the non-blocking AI client.
+
+        Concurrent calls for the same event and inputs are coalesced: one
+        caller (across workers, with the Redis backend) scores and commits,
+        the others wait and share its response. Session work runs in the
+        threadpool; only the AI call is awaited on the event loop.
+        """
+        event = await run_in_threadpool(db.get, Event, event_id)
+
+        if not event:
+            return {"error": "Event not found"}
+
+        event_data = risk_inputs(event)
+
+        async def compute() -> Dict[str, Any]:
+            risk_result = RiskService._local_risk(event) or await async_ai_service.calculate_risk_score(event_data)
+            return await run_in_threadpool(RiskService._store_risk, db, event, risk_result)
+
+        return await risk_singleflight.do(f"{event_id}:{risk_input_hash(event_data)}", compute)
+
     @staticmethod
     def detect_and_store_missing_fields(db: Session, event_id: int) -> Dict[str, Any]:
         """
-        Detect missing fields for an event using AI.
-        
+        Detect missing fields for an event.
+
+        The rule engine decides structural gaps in-process; the LLM is only
+        consulted for free-text values the rules cannot judge.
+
         Args:
             db: Database session
             event_id: Event ID
-            
+
         Returns:
             Dictionary with missing fields analysis
         """
         event = db.query(Event).filter(Event.id == event_id).first()
-        
+
         if not event:
             return {"error": "Event not found"}
-        
-        # Prepare event data
-        event_data = {
-            "suspected_drug": event.suspected_drug,
-            "dose": event.dose,
-            "frequency": event.frequency,
-            "start_date": str(event.start_date) if event.start_date else None,
-            "stop_date": str(event.stop_date) if event.stop_date else None,
-            "adverse_effect": event.adverse_effect,
-            "seriousness": event.seriousness,
-            "hospitalization": event.hospitalization,
-            "outcome": event.outcome,
-            "comorbidities": event.comorbidities,
-            "medications": event.medications
-        }
-        
-        # Get AI analysis
-        missing_fields_result = ai_service.detect_missing_fields(event_data)
-        
-        # Store missing fields in event
-        all_missing = missing_fields_result.get("required_fields", []) + missing_fields_result.get("optional_fields", [])
-        event.missing_fields = all_missing
-        
-        db.commit()
-        
-        logger.info(f"Missing fields detected for event {event_id}: {len(all_missing)} fields")
-        
-        return missing_fields_result
+
+        missing_fields_result = completeness_service.evaluate(event)
+
+        # Escalate ambiguous free text to AI analysis
+        if missing_fields_result["undecided_fields"]:
+            llm_result = ai_service.detect_missing_fields(missing_field_inputs(event))
+            missing_fields_result = completeness_service.resolve(missing_fields_result, llm_result)
+
+        return RiskService._store_missing_fields(db, event, missing_fields_result)
+
+    @staticmethod
+    async def detect_and_store_missing_fields_async(db: Session, event_id: int) -> Dict[str, Any]:
+        """Async variant of detect_and_store_missing_fields using the non-blocking AI client."""
+        event = await run_in_threadpool(db.get, Event, event_id)
+
+        if not event:
+            return {"error": "Event not found"}
+
+        missing_fields_result = completeness_service.evaluate(event)
+
+        if missing_fields_result["undecided_fields"]:
+            llm_result = await async_ai_service.detect_missing_fields(missing_field_inputs(event))
+            missing_fields_result = completeness_service.resolve(missing_fields_result, llm_result)
+
+        return await run_in_threadpool(RiskService._store_missing_fields, db, event, missing_fields_result)
+
+    @staticmethod
+    def triage_and_store(db: Session, event_id: int) -> Dict[str, Any]:
+        """
+        Detect missing fields and score risk with one AI call and one commit.
+
+        Structural gaps still come from the rule engine; the model's field
+        verdicts are only used for free text the rules leave undecided. When
+        the local model settles the risk, the AI call shrinks to missing-field
+        detection, or is skipped when the rules left nothing undecided.
+
+        Args:
+            db: Database session
+            event_id: Event ID
+
+        Returns:
+            Dictionary with missing_fields and risk results
+        """
+        event = db.get(Event, event_id)
+
+        if not event:
+            return {"error": "Event not found"}
+
+        local_result = RiskService._local_risk(event)
+        if local_result is None:
+            triage_result = ai_service.triage_event(missing_field_inputs(event))
+        elif completeness_service.evaluate(event)["undecided_fields"]:
+            triage_result = {**ai_service.detect_missing_fields(missing_field_inputs(event)), **local_result}
+        else:
+            triage_result = {**MISSING_FIELDS_FALLBACK, **local_result}
+
+        return RiskService._store_triage(db, event, triage_result)
+
+    @staticmethod
+    async def triage_and_store_async(db: Session, event_id: int) -> Dict[str, Any]:
+        """Async variant of triage_and_store using the non-blocking AI client."""
+        event = await run_in_threadpool(db.get, Event, event_id)
+
+        if not event:
+            return {"error": "Event not found"}
+
+        local_result = RiskService._local_risk(event)
+        if local_result is None:
+            triage_result = await async_ai_service.triage_event(missing_field_inputs(event))
+        elif completeness_service.evaluate(event)["undecided_fields"]:
+            triage_result = {**await async_ai_service.detect_missing_fields(missing_field_inputs(event)), **local_result}
+        else:
+            triage_result = {**MISSING_FIELDS_FALLBACK, **local_result}
+
+        return await run_in_threadpool(RiskService._store_triage, db, event, triage_result)
+
+    @staticmethod
+    def rescore_open_events(db: Session, batch_size: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Rescore every open event with the local model and write changes back in bulk.
+
+        Events are read in id order with keyset pagination, scored one chunk
+        at a time in a single vectorized pass, and only rows whose scores
+        changed are written, with one executemany UPDATE and one commit per
+        chunk. Escalation follows the same rule as single-event scoring.
+
+        Args:
+            db: Database session
+            batch_size: Events per chunk; defaults to settings.RISK_RESCORE_BATCH_SIZE
+
+        Returns:
+            Dictionary with scanned, updated and escalated counts and duration
+        """
+        batch_size = batch_size or settings.RISK_RESCORE_BATCH_SIZE
+        started = time.perf_counter()
+        scanned = updated = escalated = 0
+        last_id = 0
+
+        while True:
+            rows = db.execute(
+                select(
+                    Event.id, Event.suspected_drug, Event.adverse_effect, Event.seriousness,
+                    Event.hospitalization, Event.outcome, Event.comorbidities,
+                    Event.risk_score, Event.risk_class, Event.hospitalization_risk,
+                    Event.mortality_risk, Event.risk_input_hash, Event.followup_status
+                )
+                .where(Event.id > last_id, Event.followup_status != "completed")
+                .order_by(Event.id)
+                .limit(batch_size)
+            ).all()
+            if not rows:
+                break
+
+            scanned += len(rows)
+            last_id = rows[-1].id
+            records = [{key: getattr(row, key) for key in RISK_INPUT_FIELDS} for row in rows]
+            features = local_risk_model.featurize(records)
+            scores = local_risk_model.score_matrix(features)
+            scored_at = datetime.utcnow()
+
+            changes = []
+            for i, row in enumerate(rows):
+                change = {
+                    "id": row.id,
+                    "risk_score": float(scores["score"][i]),
+                    "risk_class": str(scores["class"][i]),
+                    "hospitalization_risk": float(scores["hospitalization_risk"][i]),
+                    "mortality_risk": float(scores["mortality_risk"][i]),
+                    "risk_input_hash": risk_input_hash(records[i]),
+                    "followup_status": row.followup_status
+                }
+                if change["risk_class"] in ESCALATED_CLASSES and row.followup_status != "escalated":
+                    change["followup_status"] = "escalated"
+                    escalated += 1
+                if any(change[key] != getattr(row, key) for key in change):
+                    change["risk_reasoning"] = local_risk_model.reasoning(features[i])
+                    change["risk_scored_at"] = scored_at
+                    changes.append(change)
+
+            if changes:
+                db.execute(update(Event), changes)
+                db.execute(
+                    Narrative.__table__.delete().where(Narrative.event_id.in_([c["id"] for c in changes]))
+                )
+                db.commit()
+                updated += len(changes)
+
+        duration = round(time.perf_counter() - started, 3)
+        logger.info(f"Rescored {scanned} open events locally: {updated} updated, {escalated} escalated in {duration}s")
+
+        return {"scanned": scanned, "updated": updated, "escalated": escalated, "duration_seconds": duration}
 
 
 # Export singleton instance
@@ -0,0 +1,207 @@
+"""Hourly and daily dashboard rollups and the job that keeps them current."""
+from sqlalchemy import func, select, text
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.database import Event, MetricRollup
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+GRANULARITIES = {"hour": timedelta(hours=1), "day": timedelta(days=1)}
+
+# Arbitrary key for pg_advisory_xact_lock so only one process refreshes at a time
+ROLLUP_LOCK_KEY = 7413001
+
+# Recompute every bucket in [:start, :end) from the source tables and upsert it.
+# Each measure is one range scan over an indexed timestamp.
+REFRESH_SQL = text("""
+WITH buckets AS (
+    SELECT generate_series(CAST(:start AS timestamptz), CAST(:end AS timestamptz) - CAST(:step AS interval), CAST(:step AS interval)) AS bucket_start
+),
+ingested AS (
+    SELECT date_trunc(:granularity, CAST(created_at AS timestamptz), 'UTC') AS bucket_start,
+           count(*) AS events_ingested,
+           count(*) FILTER (WHERE risk_class = 'low') AS risk_low,
+           count(*) FILTER (WHERE risk_class = 'medium') AS risk_medium,
+           count(*) FILTER (WHERE risk_class = 'high') AS risk_high,
+           count(*) FILTER (WHERE risk_class = 'critical') AS risk_critical,
+           count(*) FILTER (WHERE risk_class IS NULL) AS risk_unscored
+    FROM events
+    WHERE created_at >= :start AND created_at < :end
+    GROUP BY 1
+),
+sent AS (
+    SELECT date_trunc(:granularity, CAST(sent_at AS timestamptz), 'UTC') AS bucket_start, count(*) AS questions_sent
+    FROM followup_questions
+    WHERE sent_at >= :start AND sent_at < :end
+    GROUP BY 1
+),
+answered AS (
+    SELECT date_trunc(:granularity, CAST(answered_at AS timestamptz), 'UTC') AS bucket_start,
+           count(*) AS questions_answered,
+           percentile_cont(0.5) WITHIN GROUP (ORDER BY extract(epoch FROM answered_at - sent_at)) AS answer_latency_p50,
+           percentile_cont(0.9) WITHIN GROUP (ORDER BY extract(epoch FROM answered_at - sent_at)) AS answer_latency_p90
+    FROM followup_questions
+    WHERE answered_at >= :start AND answered_at < :end
+    GROUP BY 1
+),
+completed AS (
+    SELECT date_trunc(:granularity, CAST(completed_at AS timestamptz), 'UTC') AS bucket_start,
+           count(*) AS events_completed,
+           percentile_cont(0.5) WITHIN GROUP (ORDER BY extract(epoch FROM completed_at - created_at)) AS completion_time_p50,
+           percentile_cont(0.9) WITHIN GROUP (ORDER BY extract(epoch FROM completed_at - created_at)) AS completion_time_p90
+    FROM events
+    WHERE completed_at >= :start AND completed_at < :end
+    GROUP BY 1
+)
+INSERT INTO metric_rollups (
+    granularity, bucket_start, events_ingested,
+    risk_low, risk_medium, risk_high, risk_critical, risk_unscored,
+    questions_sent, questions_answered, answer_latency_p50, answer_latency_p90,
+    events_completed, completion_time_p50, completion_time_p90, computed_at
+)
+SELECT :granularity, b.bucket_start, COALESCE(i.events_ingested, 0),
+       COALESCE(i.risk_low, 0), COALESCE(i.risk_medium, 0), COALESCE(i.risk_high, 0),
+       COALESCE(i.risk_critical, 0), COALESCE(i.risk_unscored, 0),
+       COALESCE(s.questions_sent, 0), COALESCE(a.questions_answered, 0), a.answer_latency_p50, a.answer_latency_p90,
+       COALESCE(c.events_completed, 0), c.completion_time_p50, c.completion_time_p90, now()
+FROM buckets b
+LEFT JOIN ingested i USING (bucket_start)
+LEFT JOIN sent s USING (bucket_start)
+LEFT JOIN answered a USING (bucket_start)
+LEFT JOIN completed c USING (bucket_start)
+ON CONFLICT (granularity, bucket_start) DO UPDATE SET
+    events_ingested = EXCLUDED.events_ingested,
+    risk_low = EXCLUDED.risk_low,
+    risk_medium = EXCLUDED.risk_medium,
+    risk_high = EXCLUDED.risk_high,
+    risk_critical = EXCLUDED.risk_critical,
+    risk_unscored = EXCLUDED.risk_unscored,
+    questions_sent = EXCLUDED.questions_sent,
+    questions_answered = EXCLUDED.questions_answered,
+    answer_latency_p50 = EXCLUDED.answer_latency_p50,
+    answer_latency_p90 = EXCLUDED.answer_latency_p90,
+    events_completed = EXCLUDED.events_completed,
+    completion_time_p50 = EXCLUDED.completion_time_p50,
+    completion_time_p90 = EXCLUDED.completion_time_p90,
+    computed_at = EXCLUDED.computed_at
+""")
+
+
+def truncate(moment: datetime, granularity: str) -> datetime:
+    """Start of the UTC hour or day containing a moment."""
+    moment = moment.astimezone(timezone.utc) if moment.tzinfo else moment.replace(tzinfo=timezone.utc)
+    if granularity == "day":
+        return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+
+class RollupService:
+    """
+    Maintain metric_rollups and serve trends from it.
+
+    Each refresh recomputes only the buckets that can still change: the
+    last settings.ROLLUP_LOOKBACK_HOURS of hours and the days they touch,
+    which covers risk scores and answers that land after the event was
+    ingested. The first refresh backfills from the oldest event.
+    """
+
+    def __init__(self):
+        """Initialize without a running job."""
+        self._task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def refresh(db: Session, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """
+        Recompute the recent hourly and daily buckets.
+
+        Args:
+            db: Database session
+            now: Current time (for tests and backfills); defaults to now
+
+        Returns:
+            Dictionary with the refreshed range per granularity, or skipped
+            when another process holds the refresh lock
+        """
+        now = now or datetime.now(timezone.utc)
+        if not db.execute(text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": ROLLUP_LOCK_KEY}).scalar():
+            db.rollback()
+            return {"skipped": True}
+
+        since = now - timedelta(hours=settings.ROLLUP_LOOKBACK_HOURS)
+        if db.execute(select(MetricRollup.granularity).limit(1)).first() is None:
+            oldest = db.execute(select(func.min(Event.created_at))).scalar()
+            since = min(since, oldest) if oldest else since
+
+        refreshed = {}
+        for granularity, step in GRANULARITIES.items():
+            start = truncate(since, granularity)
+            end = truncate(now, granularity) + step
+            db.execute(REFRESH_SQL, {
+                "granularity": granularity,
+                "step": f"1 {granularity}",
+                "start": start,
+                "end": end
+            })
+            refreshed[granularity] = {"start": start, "end": end}
+        db.commit()
+        return refreshed
+
+    @staticmethod
+    def trends(db: Session, granularity: str, start: datetime, end: datetime) -> List[MetricRollup]:
+        """
+        Read rollup buckets in [start, end).
+
+        Args:
+            db: Database session
+            granularity: 'hour' or 'day'
+            start: Range start
+            end: Range end
+
+        Returns:
+            Rollup rows in time order
+        """
+        return db.query(MetricRollup).filter(
+            MetricRollup.granularity == granularity,
+            MetricRollup.bucket_start >= truncate(start, granularity),
+            MetricRollup.bucket_start < end
+        ).order_by(MetricRollup.bucket_start).all()
+
+    @staticmethod
+    def _refresh_once() -> None:
+        db = SessionLocal()
+        try:
+            RollupService.refresh(db)
+        finally:
+            db.close()
+
+    async def _run(self) -> None:
+        """Refresh on a fixed interval until cancelled."""
+        while True:
+            try:
+                await run_in_threadpool(self._refresh_once)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error refreshing metric rollups: {str(e)}")
+            await asyncio.sleep(settings.ROLLUP_INTERVAL_SECONDS)
+
+    def start(self) -> None:
+        """Start the periodic refresh on the running event loop."""
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Cancel the periodic refresh."""
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+
+# Export singleton instance
+rollup_service = RollupService()
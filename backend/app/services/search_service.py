@@ -0,0 +1,130 @@
+"""Full-text and fuzzy search over events."""
+from sqlalchemy import REAL, and_, cast, func, literal, or_, select, tuple_
+from sqlalchemy.orm import Session
+from app.core.pagination import decode_cursor, encode_cursor
+from app.models.database import Event
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+import re
+
+SORTS = ("relevance", "recent")
+
+# Columns returned per hit
+HIT_COLUMNS = (
+    Event.id, Event.suspected_drug, Event.drug_term, Event.adverse_effect, Event.reaction_term,
+    Event.risk_class, Event.followup_status, Event.duplicate_of, Event.created_at
+)
+
+_WORDS = re.compile(r"\w+")
+
+
+def prefix_tsquery(text: str) -> str:
+    """
+    tsquery text matching every word of a search string as a prefix.
+
+    Words are reduced to letters and digits, so the result is always valid
+    to_tsquery input.
+    """
+    return " & ".join(f"{word}:*" for word in _WORDS.findall(text.lower()))
+
+
+def like_escape(text: str) -> str:
+    """Escape LIKE wildcards with the default backslash escape."""
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+class SearchService:
+    """
+    Ranked search across drug, adverse effect, comorbidities, medications and follow-up answers.
+
+    Triggers keep two derived columns on events current (see
+    app/models/triggers.py): search_vector, a weighted tsvector (drug and
+    reaction A, history B, answers C) with a GIN index, and search_text, the
+    same text lowercased with a pg_trgm GIN index. A row matches when every
+    word prefix-matches the tsvector, the query is a substring of
+    search_text, or it is word-similar to it (pg_trgm '<%', which catches
+    misspellings); all three are index scans combined with a BitmapOr.
+
+    Pages use keyset pagination on (score, id) or (created_at, id), so
+    deep pages cost the same as the first.
+    """
+
+    @staticmethod
+    def search(
+        db: Session,
+        q: str,
+        risk_class: Optional[str] = None,
+        status: Optional[str] = None,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        sort: str = "relevance",
+        limit: int = 20,
+        cursor: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Search events.
+
+        Args:
+            db: Database session
+            q: Search text; needs at least one letter or digit
+            risk_class: Only events of this risk class
+            status: Only events with this follow-up status
+            date_from: Only events created at or after this time
+            date_to: Only events created before this time
+            sort: 'relevance' (best match first) or 'recent' (newest first)
+            limit: Page size
+            cursor: next_cursor of the previous page
+
+        Returns:
+            Hits with their score, and the cursor of the next page (None on the last)
+
+        Raises:
+            ValueError: If the query has no searchable words or the cursor is invalid
+        """
+        terms = prefix_tsquery(q)
+        if not terms:
+            raise ValueError("Query must contain a letter or digit")
+        text = q.strip().lower()
+
+        tsquery = func.to_tsquery("english", terms)
+        score = cast(
+            func.ts_rank_cd(Event.search_vector, tsquery, 32) + func.word_similarity(text, Event.search_text),
+            REAL
+        ).label("score")
+        conditions = [or_(
+            Event.search_vector.op("@@")(tsquery),
+            Event.search_text.like(f"%{like_escape(text)}%"),
+            literal(text).op("<%")(Event.search_text)
+        )]
+        if risk_class:
+            conditions.append(Event.risk_class == risk_class)
+        if status:
+            conditions.append(Event.followup_status == status)
+        if date_from:
+            conditions.append(Event.created_at >= date_from)
+        if date_to:
+            conditions.append(Event.created_at < date_to)
+
+        if sort == "relevance":
+            key = (score, Event.id)
+            if cursor:
+                conditions.append(tuple_(*key) < tuple_(*decode_cursor(cursor, float, int)))
+        else:
+            key = (Event.created_at, Event.id)
+            if cursor:
+                conditions.append(tuple_(*key) < tuple_(*decode_cursor(cursor, datetime, int)))
+
+        rows = db.execute(
+            select(*HIT_COLUMNS, score).where(and_(*conditions)).order_by(*(column.desc() for column in key)).limit(limit + 1)
+        ).all()
+
+        hits: List[Dict[str, Any]] = [dict(row._mapping) for row in rows[:limit]]
+        next_cursor = None
+        if len(rows) > limit:
+            last = rows[limit - 1]
+            next_cursor = encode_cursor(last.score, last.id) if sort == "relevance" else encode_cursor(last.created_at, last.id)
+        return {"hits": hits, "next_cursor": next_cursor}
+
+
+# Export singleton instance
+search_service = SearchService()
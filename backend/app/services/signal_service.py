@@ -0,0 +1,265 @@
+"""Disproportionality analysis (PRR, ROR, IC) over drug-event pair counts."""
+from sqlalchemy import select, text
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.database import DrugEventCount
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+import threading
+import time
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Two-sided 95% normal quantile for the PRR / ROR confidence intervals
+Z_95 = 1.959964
+
+METHODS = ("prr", "ror", "ic")
+
+# Column each method ranks by: the lower bound, so small counts don't dominate
+RANK_BY = {"prr": "prr_lower", "ror": "ror_lower", "ic": "ic025"}
+
+MEASURES = (
+    "expected", "prr", "prr_lower", "prr_upper", "ror", "ror_lower", "ror_upper",
+    "ic", "ic025", "ic975", "chi_square"
+)
+
+
+def disproportionality(a: np.ndarray, drug_count: np.ndarray, event_count: np.ndarray, total: int) -> Dict[str, np.ndarray]:
+    """
+    Compute the 2x2 disproportionality measures for many pairs at once.
+
+    For each pair, a = reports with the drug and the event, b = the drug
+    without the event, c = the event without the drug, d = neither.
+    PRR and ROR add 0.5 to every cell of tables with an empty cell
+    (Haldane-Anscombe) so they stay finite.
+
+    Args:
+        a: Pair counts
+        drug_count: a + b per pair
+        event_count: a + c per pair
+        total: N, all reports
+
+    Returns:
+        Array per measure in MEASURES
+    """
+    a = a.astype(np.float64)
+    b = drug_count - a
+    c = event_count - a
+    d = total - drug_count - event_count + a
+    expected = drug_count * event_count / total
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # Yates-corrected chi-square (Evans et al. 2001); nan when a margin is empty
+        chi_square = total * np.square(np.maximum(np.abs(a * d - b * c) - total / 2, 0)) / (
+            drug_count * (c + d) * event_count * (b + d)
+        )
+
+    correction = np.where((a == 0) | (b == 0) | (c == 0) | (d == 0), 0.5, 0.0)
+    ha, hb, hc, hd = a + correction, b + correction, c + correction, d + correction
+    prr = (ha / (ha + hb)) / (hc / (hc + hd))
+    se_prr = np.sqrt(1 / ha - 1 / (ha + hb) + 1 / hc - 1 / (hc + hd))
+    ror = (ha * hd) / (hb * hc)
+    se_ror = np.sqrt(1 / ha + 1 / hb + 1 / hc + 1 / hd)
+
+    # Information component with the shrinkage and closed-form credibility
+    # interval of Norén et al. (2013)
+    shrunk = a + 0.5
+    ic = np.log2(shrunk / (expected + 0.5))
+    ic025 = ic - 3.3 * shrunk ** -0.5 - 2 * shrunk ** -1.5
+    ic975 = ic + 2.4 * shrunk ** -0.5 - 0.5 * shrunk ** -1.5
+
+    return {
+        "expected": expected,
+        "prr": prr,
+        "prr_lower": prr * np.exp(-Z_95 * se_prr),
+        "prr_upper": prr * np.exp(Z_95 * se_prr),
+        "ror": ror,
+        "ror_lower": ror * np.exp(-Z_95 * se_ror),
+        "ror_upper": ror * np.exp(Z_95 * se_ror),
+        "ic": ic,
+        "ic025": ic025,
+        "ic975": ic975,
+        "chi_square": chi_square
+    }
+
+
+def signal_mask(method: str, a: np.ndarray, stats: Dict[str, np.ndarray]) -> np.ndarray:
+    """
+    Pairs meeting the usual threshold for a method.
+
+    prr: a >= 3, PRR >= 2 and chi-square >= 4 (Evans); ror: a >= 3 and the
+    lower 95% bound above 1; ic: IC025 above 0.
+    """
+    with np.errstate(invalid="ignore"):
+        if method == "prr":
+            return (a >= 3) & (stats["prr"] >= 2) & (stats["chi_square"] >= 4)
+        if method == "ror":
+            return (a >= 3) & (stats["ror_lower"] > 1)
+        return stats["ic025"] > 0
+
+
+class SignalTable:
+    """The contingency counts and their measures, as parallel arrays over pairs."""
+
+    def __init__(self, drugs: np.ndarray, reactions: np.ndarray, drug_idx: np.ndarray, reaction_idx: np.ndarray, counts: np.ndarray):
+        self.drugs = drugs
+        self.reactions = reactions
+        self.drug_idx = drug_idx
+        self.reaction_idx = reaction_idx
+        self.counts = counts
+        self.total = int(counts.sum())
+        self.drug_counts = np.bincount(drug_idx, weights=counts, minlength=len(drugs))[drug_idx]
+        self.event_counts = np.bincount(reaction_idx, weights=counts, minlength=len(reactions))[reaction_idx]
+        self.stats = disproportionality(counts, self.drug_counts, self.event_counts, max(self.total, 1))
+        self.signals = {method: signal_mask(method, counts, self.stats) for method in METHODS}
+        self.computed_at = datetime.now(timezone.utc)
+
+    @classmethod
+    def from_rows(cls, rows: List[Tuple[str, str, int]]) -> "SignalTable":
+        """Build the table from (drug, reaction, count) rows."""
+        # Dictionary-encode the terms in first-seen order (cheaper than sorting strings)
+        drug_ids: Dict[str, int] = {}
+        reaction_ids: Dict[str, int] = {}
+        drug_idx = np.fromiter((drug_ids.setdefault(row[0], len(drug_ids)) for row in rows), dtype=np.int64, count=len(rows))
+        reaction_idx = np.fromiter((reaction_ids.setdefault(row[1], len(reaction_ids)) for row in rows), dtype=np.int64, count=len(rows))
+        counts = np.fromiter((row[2] for row in rows), dtype=np.int64, count=len(rows))
+        return cls(np.array(list(drug_ids), dtype=str), np.array(list(reaction_ids), dtype=str), drug_idx, reaction_idx, counts)
+
+    @staticmethod
+    def _term_mask(terms: np.ndarray, idx: np.ndarray, query: Optional[str]) -> Optional[np.ndarray]:
+        if not query:
+            return None
+        return (np.char.find(terms, query.strip().lower()) >= 0)[idx]
+
+    def query(
+        self,
+        method: str,
+        drug: Optional[str] = None,
+        adverse_effect: Optional[str] = None,
+        min_count: int = 3,
+        signals_only: bool = True,
+        limit: int = 50,
+        offset: int = 0
+    ) -> Tuple[int, List[Dict[str, Any]]]:
+        """
+        Filter and rank pairs.
+
+        Args:
+            method: 'prr', 'ror' or 'ic'; sets the signal criteria and the ranking
+            drug: Substring of the drug name
+            adverse_effect: Substring of the adverse effect
+            min_count: Smallest pair count to include
+            signals_only: Only pairs meeting the method's criteria
+            limit: Page size
+            offset: Rows to skip
+
+        Returns:
+            Number of matching pairs and the requested page, strongest first
+        """
+        mask = self.counts >= min_count
+        if signals_only:
+            mask &= self.signals[method]
+        for term_mask in (
+            self._term_mask(self.drugs, self.drug_idx, drug),
+            self._term_mask(self.reactions, self.reaction_idx, adverse_effect)
+        ):
+            if term_mask is not None:
+                mask &= term_mask
+
+        matches = np.flatnonzero(mask)
+        rank = np.nan_to_num(self.stats[RANK_BY[method]][matches], nan=-np.inf)
+        # Strongest lower bound first, ties broken by pair count
+        order = matches[np.lexsort((-self.counts[matches], -rank))][offset:offset + limit]
+
+        page = []
+        for i in order:
+            row = {
+                "drug": str(self.drugs[self.drug_idx[i]]),
+                "adverse_effect": str(self.reactions[self.reaction_idx[i]]),
+                "count": int(self.counts[i]),
+                "drug_count": int(self.drug_counts[i]),
+                "event_count": int(self.event_counts[i]),
+                "signal": bool(self.signals[method][i])
+            }
+            for measure in MEASURES:
+                value = float(self.stats[measure][i])
+                row[measure] = round(value, 4) if np.isfinite(value) else None
+            page.append(row)
+        return len(matches), page
+
+
+class SignalService:
+    """
+    Disproportionality signal detection over drug-event pairs.
+
+    Triggers on events keep drug_event_counts current (see
+    app/models/triggers.py), leaving out reports flagged as duplicates, so
+    building the table reads one row per distinct pair rather than every
+    report. The measures for all pairs are computed at once with NumPy and
+    reused for settings.SIGNAL_CACHE_SECONDS; each request is then only
+    array filtering and sorting.
+    """
+
+    def __init__(self):
+        """Initialize with no table loaded."""
+        self._table: Optional[SignalTable] = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def load(db: Session) -> SignalTable:
+        """Read the pair counts and compute the measures."""
+        rows = db.execute(
+            select(DrugEventCount.drug, DrugEventCount.reaction, DrugEventCount.count).where(DrugEventCount.count > 0)
+        ).all()
+        return SignalTable.from_rows(rows)
+
+    def table(self, db: Session, refresh: bool = False) -> SignalTable:
+        """
+        Current signal table, rebuilt when older than settings.SIGNAL_CACHE_SECONDS.
+
+        While one request rebuilds a stale table, the others keep getting
+        the previous one instead of waiting.
+
+        Args:
+            db: Database session
+            refresh: Rebuild regardless of age
+        """
+        stale = self._table is None or time.monotonic() - self._loaded_at > settings.SIGNAL_CACHE_SECONDS
+        if not (refresh or stale):
+            return self._table
+        if not self._lock.acquire(blocking=refresh or self._table is None):
+            return self._table
+        try:
+            if refresh or self._table is None or time.monotonic() - self._loaded_at > settings.SIGNAL_CACHE_SECONDS:
+                started = time.perf_counter()
+                self._table = self.load(db)
+                self._loaded_at = time.monotonic()
+                logger.info(
+                    f"Signal table: {len(self._table.counts)} pairs over {self._table.total} reports "
+                    f"in {round((time.perf_counter() - started) * 1000)} ms"
+                )
+            return self._table
+        finally:
+            self._lock.release()
+
+    def reconcile(self, db: Session) -> int:
+        """
+        Rebuild drug_event_counts from events and drop the cached table.
+
+        Briefly blocks writes to events.
+
+        Returns:
+            Number of distinct pairs
+        """
+        db.execute(text("SELECT reconcile_drug_event_counts()"))
+        db.commit()
+        with self._lock:
+            self._table = None
+        return len(self.table(db).counts)
+
+
+# Export singleton instance
+signal_service = SignalService()
@@ -0,0 +1,350 @@
+"""Drug and adverse-effect normalization against a local synonym dictionary."""
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.database import Event
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+import json
+import logging
+import os
+import re
+import threading
+import time
+import unicodedata
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TERMINOLOGY_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "terminology.json")
+
+# Words that qualify a name without changing what it refers to
+DRUG_STOP_WORDS = frozenset({
+    "tablet", "tablets", "tab", "tabs", "capsule", "capsules", "cap", "caps", "oral", "solution",
+    "suspension", "syrup", "injection", "inj", "infusion", "cream", "ointment", "gel", "patch",
+    "spray", "drops", "film", "coated", "extended", "modified", "release", "er", "xr", "sr", "cr",
+    "mr", "xl", "ec", "hcl", "hydrochloride", "sodium", "mg", "mcg", "ug", "g", "ml", "iu", "unit", "units"
+})
+REACTION_STOP_WORDS = frozenset({"severe", "mild", "moderate", "very", "slight", "bad", "some", "episode", "episodes", "of"})
+
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+
+# Lookups remembered per index before the memo is cleared
+LOOKUP_CACHE_SIZE = 100_000
+
+
+class TermMatch(NamedTuple):
+    """A resolved name."""
+    code: str
+    term: str
+    method: str  # 'exact', 'partial' (a known term inside a longer name) or 'fuzzy'
+    distance: int  # Edits between the name and the synonym it matched
+
+
+def normalize_name(name: Any, stop_words: frozenset) -> str:
+    """Casefold, strip accents and punctuation, and drop strengths and qualifier words."""
+    text = unicodedata.normalize("NFKD", str(name)).encode("ascii", "ignore").decode().casefold()
+    return " ".join(
+        word for word in _NON_ALNUM.split(text)
+        if word and not word[0].isdigit() and word not in stop_words
+    )
+
+
+def max_edits(length: int) -> int:
+    """Edits tolerated for a name of this length (none for short names, where typos collide)."""
+    if length < 5:
+        return 0
+    return 1 if length < 9 else 2
+
+
+def deletes(word: str, distance: int) -> Set[str]:
+    """The word and every string reachable from it by deleting up to `distance` characters."""
+    variants = {word}
+    frontier = {word}
+    for _ in range(distance):
+        frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))}
+        variants |= frontier
+    return variants
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Optimal string alignment distance, or limit + 1 once it is known to exceed limit."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    before, previous = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (a[i - 1] != b[j - 1]))
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], before[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        before, previous = previous, current
+    return previous[-1]
+
+
+class TermIndex:
+    """
+    Hash index from normalized synonyms to (code, term), with typo tolerance.
+
+    Exact and partial matches are dictionary lookups. Fuzzy matching uses a
+    symmetric-delete index (as in SymSpell): every synonym is stored under
+    its deletion variants, so candidates for a misspelling come from a few
+    hundred lookups instead of comparing against the whole dictionary.
+    Results are memoized per raw name.
+    """
+
+    def __init__(self, entries: Iterable[Dict[str, Any]], stop_words: frozenset):
+        """Index dictionary entries ({"code", "term", "synonyms"})."""
+        self.stop_words = stop_words
+        self.terms = 0
+        self._exact: Dict[str, Tuple[str, str]] = {}
+        for entry in entries:
+            self.terms += 1
+            for name in (entry["term"], *entry.get("synonyms", [])):
+                key = normalize_name(name, stop_words)
+                if key and key not in self._exact:
+                    self._exact[key] = (entry["code"], entry["term"])
+
+        self._deletes: Dict[str, List[str]] = {}
+        self._max_words = 1
+        for key in self._exact:
+            self._max_words = max(self._max_words, key.count(" ") + 1)
+            for variant in deletes(key, max_edits(len(key))):
+                self._deletes.setdefault(variant, []).append(key)
+        self._cache: Dict[str, Optional[TermMatch]] = {}
+
+    def __len__(self) -> int:
+        return len(self._exact)
+
+    def lookup(self, name: Any) -> Optional[TermMatch]:
+        """
+        Resolve a free-text name.
+
+        Tries the whole name, then the longest run of its words that is a
+        known synonym ("Advil Liqui-Gels 200mg" -> ibuprofen), then typo
+        tolerance on the whole name and on each word.
+
+        Returns:
+            The match, or None when nothing is close enough
+        """
+        if not name:
+            return None
+        try:
+            return self._cache[name]
+        except KeyError:
+            pass
+
+        match = self._resolve(normalize_name(name, self.stop_words))
+        if len(self._cache) >= LOOKUP_CACHE_SIZE:
+            self._cache.clear()
+        self._cache[name] = match
+        return match
+
+    def _resolve(self, key: str) -> Optional[TermMatch]:
+        if not key:
+            return None
+        hit = self._exact.get(key)
+        if hit:
+            return TermMatch(*hit, "exact", 0)
+
+        words = key.split()
+        for size in range(min(len(words) - 1, self._max_words), 0, -1):
+            for start in range(len(words) - size + 1):
+                hit = self._exact.get(" ".join(words[start:start + size]))
+                if hit:
+                    return TermMatch(*hit, "partial", 0)
+
+        match = self._fuzzy(key)
+        if match or len(words) == 1:
+            return match
+        matches = [m for m in map(self._fuzzy, words) if m]
+        return min(matches, key=lambda m: m.distance) if matches else None
+
+    def _fuzzy(self, key: str) -> Optional[TermMatch]:
+        limit = max_edits(len(key))
+        if not limit:
+            return None
+        candidates = {candidate for variant in deletes(key, limit) for candidate in self._deletes.get(variant, ())}
+        best: Optional[Tuple[int, str]] = None
+        for candidate in candidates:
+            distance = edit_distance(key, candidate, limit)
+            if distance <= limit and (best is None or (distance, candidate) < best):
+                best = (distance, candidate)
+        if best is None:
+            return None
+        return TermMatch(*self._exact[best[1]], "fuzzy", best[0])
+
+
+class TerminologyService:
+    """
+    Canonical drug and adverse-effect terms for free-text report fields.
+
+    The dictionary is a JSON file of {"code", "term", "synonyms"} entries
+    (app/data/terminology.json by default, settings.TERMINOLOGY_PATH to
+    override). Edits to the file are picked up within
+    settings.TERMINOLOGY_CHECK_SECONDS, or at once via load(); the new
+    index is built aside and swapped in with one assignment.
+    """
+
+    def __init__(self):
+        """Initialize with empty indexes; the dictionary loads on first use."""
+        self.version: Optional[int] = None
+        self.path: Optional[str] = None
+        self._indexes = (TermIndex([], DRUG_STOP_WORDS), TermIndex([], REACTION_STOP_WORDS))
+        self._mtime: Optional[float] = None
+        self._checked_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def load(self, path: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Load a dictionary file, replacing the current indexes.
+
+        Args:
+            path: Dictionary file; defaults to settings.TERMINOLOGY_PATH or
+                the bundled dictionary
+
+        Returns:
+            Dictionary version and index sizes
+        """
+        path = path or settings.TERMINOLOGY_PATH or DEFAULT_TERMINOLOGY_PATH
+        with self._lock:
+            self._checked_at = time.monotonic()
+            if not os.path.exists(path):
+                logger.warning(f"Terminology dictionary {path} not found; names are left uncoded")
+                return self.stats()
+
+            mtime = os.path.getmtime(path)
+            with open(path, encoding="utf-8") as f:
+                dictionary = json.load(f)
+            indexes = (
+                TermIndex(dictionary.get("drugs", []), DRUG_STOP_WORDS),
+                TermIndex(dictionary.get("reactions", []), REACTION_STOP_WORDS)
+            )
+
+            # Swap in one assignment so concurrent lookups never see a partial index
+            self._indexes = indexes
+            self.version = dictionary.get("version")
+            self.path, self._mtime = path, mtime
+
+        stats = self.stats()
+        logger.info(
+            f"Loaded terminology v{self.version}: {stats['drug_terms']} drugs ({stats['drug_synonyms']} names), "
+            f"{stats['reaction_terms']} reactions ({stats['reaction_synonyms']} names)"
+        )
+        return stats
+
+    def maybe_reload(self) -> None:
+        """Load on first use, then reload when the file changed (checked at most every TERMINOLOGY_CHECK_SECONDS)."""
+        now = time.monotonic()
+        if self._checked_at is not None and (
+            settings.TERMINOLOGY_CHECK_SECONDS <= 0 or now - self._checked_at < settings.TERMINOLOGY_CHECK_SECONDS
+        ):
+            return
+        path = settings.TERMINOLOGY_PATH or DEFAULT_TERMINOLOGY_PATH
+        try:
+            changed = self._checked_at is None or path != self.path or os.path.getmtime(path) != self._mtime
+        except OSError:
+            changed = False
+        self._checked_at = now
+        if changed:
+            try:
+                self.load(path)
+            except Exception as e:
+                logger.error(f"Error reloading terminology from {path}: {str(e)}")
+
+    def normalize_drug(self, name: Any) -> Optional[TermMatch]:
+        """Resolve a suspected drug name."""
+        self.maybe_reload()
+        return self._indexes[0].lookup(name)
+
+    def normalize_reaction(self, name: Any) -> Optional[TermMatch]:
+        """Resolve an adverse effect description."""
+        self.maybe_reload()
+        return self._indexes[1].lookup(name)
+
+    def code_event(self, suspected_drug: Any, adverse_effect: Any) -> Dict[str, Optional[str]]:
+        """
+        Coded columns for an event.
+
+        Returns:
+            drug_code, drug_term, reaction_code and reaction_term (None when unresolved)
+        """
+        drug = self.normalize_drug(suspected_drug)
+        reaction = self.normalize_reaction(adverse_effect)
+        return {
+            "drug_code": drug.code if drug else None,
+            "drug_term": drug.term if drug else None,
+            "reaction_code": reaction.code if reaction else None,
+            "reaction_term": reaction.term if reaction else None
+        }
+
+    def code_events(self, records: Iterable[Dict[str, Any]]) -> List[Dict[str, Optional[str]]]:
+        """Coded columns for a batch of records with suspected_drug and adverse_effect."""
+        self.maybe_reload()
+        drugs, reactions = self._indexes
+        coded = []
+        for record in records:
+            drug = drugs.lookup(record.get("suspected_drug"))
+            reaction = reactions.lookup(record.get("adverse_effect"))
+            coded.append({
+                "drug_code": drug.code if drug else None,
+                "drug_term": drug.term if drug else None,
+                "reaction_code": reaction.code if reaction else None,
+                "reaction_term": reaction.term if reaction else None
+            })
+        return coded
+
+    def recode_events(self, db: Session, batch_size: int = 1000) -> int:
+        """
+        Re-normalize stored events, e.g. after the dictionary changed.
+
+        Walks events in id order and updates only those whose codes change,
+        one batched UPDATE and commit per batch.
+
+        Args:
+            db: Database session
+            batch_size: Events read per batch
+
+        Returns:
+            Number of events updated
+        """
+        changed, last_id = 0, 0
+        while True:
+            rows = db.execute(
+                select(
+                    Event.id, Event.suspected_drug, Event.adverse_effect,
+                    Event.drug_code, Event.drug_term, Event.reaction_code, Event.reaction_term
+                ).where(Event.id > last_id).order_by(Event.id).limit(batch_size)
+            ).all()
+            if not rows:
+                break
+
+            updates = [
+                {"id": row.id, **codes}
+                for row, codes in zip(rows, self.code_events(row._mapping for row in rows))
+                if any(getattr(row, column) != value for column, value in codes.items())
+            ]
+            if updates:
+                db.execute(update(Event), updates)
+                db.commit()
+            changed += len(updates)
+            last_id = rows[-1].id
+
+        logger.info(f"Re-normalized {changed} events against terminology v{self.version}")
+        return changed
+
+    def stats(self) -> Dict[str, Any]:
+        """Return dictionary version and index sizes."""
+        drugs, reactions = self._indexes
+        return {
+            "version": self.version,
+            "path": self.path,
+            "drug_terms": drugs.terms,
+            "drug_synonyms": len(drugs),
+            "reaction_terms": reactions.terms,
+            "reaction_synonyms": len(reactions)
+        }
+
+
+# Export singleton instance
+terminology_service = TerminologyService()
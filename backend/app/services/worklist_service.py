@@ -0,0 +1,129 @@
+"""Keyset-paginated event listings and the escalation worklist."""
+from sqlalchemy import and_, func, select, tuple_
+from sqlalchemy.orm import Session
+from app.core.pagination import decode_cursor, encode_cursor
+from app.models.database import Event
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+# Highest risk first, unscored events last; the same expression as the
+# queue indexes on events, so the planner can use them
+RISK_RANK = (-func.coalesce(Event.risk_score, -1)).label("risk_rank")
+
+# Sort -> (key columns, cursor value types, descending)
+SORTS = {
+    "risk": ((RISK_RANK, Event.created_at, Event.id), (float, datetime, int), False),
+    "due": ((Event.regulatory_due_at, RISK_RANK, Event.id), (datetime, float, int), False),
+    "recent": ((Event.created_at, Event.id), (datetime, int), True)
+}
+
+# Columns returned per item
+ITEM_COLUMNS = (
+    Event.id, Event.suspected_drug, Event.drug_term, Event.adverse_effect, Event.reaction_term,
+    Event.seriousness, Event.outcome, Event.risk_score, Event.risk_class, Event.followup_status,
+    Event.duplicate_of, Event.regulatory_due_at, Event.created_at
+)
+
+
+class WorklistService:
+    """
+    Event listings for case processing, ordered by risk, regulatory due date or age.
+
+    A trigger sets regulatory_due_at on every event (see
+    app/models/triggers.py): receipt plus 7 days for fatal or critical
+    cases, 15 for serious, hospitalized or high-risk ones and 90 otherwise,
+    and moves it when the case is reclassified. Each sort is an all-ascending
+    (or all-descending) key ending in the id, so pages are fetched with a
+    row comparison that seeks straight into a composite index, with or
+    without a follow-up status filter in front.
+    """
+
+    @staticmethod
+    def list_events(
+        db: Session,
+        status: Optional[str] = None,
+        risk_class: Optional[str] = None,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        sort: str = "risk",
+        limit: int = 50,
+        cursor: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        List events.
+
+        Args:
+            db: Database session
+            status: Only events with this follow-up status
+            risk_class: Only events of this risk class
+            date_from: Only events created at or after this time
+            date_to: Only events created before this time
+            sort: 'risk' (highest risk, then oldest first), 'due' (earliest
+                regulatory due date first) or 'recent' (newest first)
+            limit: Page size
+            cursor: next_cursor of the previous page
+
+        Returns:
+            Events, and the cursor of the next page (None on the last)
+
+        Raises:
+            ValueError: If the sort or the cursor is invalid
+        """
+        if sort not in SORTS:
+            raise ValueError(f"sort must be one of {', '.join(SORTS)}")
+        key, types, descending = SORTS[sort]
+
+        conditions = []
+        if status:
+            conditions.append(Event.followup_status == status)
+        if risk_class:
+            conditions.append(Event.risk_class == risk_class)
+        if date_from:
+            conditions.append(Event.created_at >= date_from)
+        if date_to:
+            conditions.append(Event.created_at < date_to)
+        if cursor:
+            position = tuple_(*decode_cursor(cursor, *types))
+            conditions.append(tuple_(*key) < position if descending else tuple_(*key) > position)
+
+        rows = db.execute(
+            select(*ITEM_COLUMNS, RISK_RANK, (Event.regulatory_due_at < func.now()).label("overdue"))
+            .where(and_(*conditions))
+            .order_by(*(column.desc() if descending else column for column in key))
+            .limit(limit + 1)
+        ).all()
+
+        items: List[Dict[str, Any]] = [dict(row._mapping) for row in rows[:limit]]
+        next_cursor = None
+        if len(rows) > limit:
+            last = rows[limit - 1]._mapping
+            next_cursor = encode_cursor(*(last[column.key] for column in key))
+        return {"items": items, "next_cursor": next_cursor}
+
+    def escalations(
+        self,
+        db: Session,
+        risk_class: Optional[str] = None,
+        limit: int = 50,
+        cursor: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Escalated events, earliest regulatory due date first.
+
+        Ties go to the higher risk score. Overdue cases come first and are
+        flagged.
+
+        Args:
+            db: Database session
+            risk_class: Only events of this risk class
+            limit: Page size
+            cursor: next_cursor of the previous page
+
+        Raises:
+            ValueError: If the cursor is invalid
+        """
+        return self.list_events(db, status="escalated", risk_class=risk_class, sort="due", limit=limit, cursor=cursor)
+
+
+# Export singleton instance
+worklist_service = WorklistService()
@@ -0,0 +1 @@
+"""Local HTTP stand-ins for OpenAI and Twilio, used for offline load testing."""
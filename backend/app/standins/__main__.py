@@ -0,0 +1,67 @@
+"""
+Run the OpenAI and Twilio stand-ins for offline load testing.
+
+Point the backend at them with:
+    OPENAI_BASE_URL=http://localhost:8100/v1
+    TWILIO_API_BASE_URL=http://localhost:8200
+
+Usage:
+    python -m app.standins [--openai-latency lognormal:1.5,0.4] [--error-rate 0.02] ...
+"""
+from app.standins import openai_server, twilio_server
+from app.standins.behavior import Behavior
+import argparse
+import asyncio
+import uvicorn
+
+
+def _statuses(value: str):
+    return tuple(int(s) for s in value.split(",") if s)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--openai-port", type=int, default=8100)
+    parser.add_argument("--twilio-port", type=int, default=8200)
+    parser.add_argument("--openai-latency", default="lognormal:1.2,0.5", help="time to first token")
+    parser.add_argument("--tokens-per-second", type=float, default=40.0, help="OpenAI generation speed")
+    parser.add_argument("--twilio-latency", default="lognormal:0.25,0.3")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-statuses", type=_statuses, default=(429, 500, 503))
+    parser.add_argument("--hang-rate", type=float, default=0.0, help="share of requests that stall")
+    parser.add_argument("--hang-seconds", type=float, default=120.0)
+    parser.add_argument("--openai-max-concurrency", type=int, default=0, help="429 beyond this many in flight")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    common = dict(
+        error_rate=args.error_rate,
+        error_statuses=args.error_statuses,
+        hang_rate=args.hang_rate,
+        hang_seconds=args.hang_seconds,
+        seed=args.seed
+    )
+    openai_app = openai_server.create_app(Behavior(
+        latency=args.openai_latency,
+        tokens_per_second=args.tokens_per_second,
+        max_concurrency=args.openai_max_concurrency,
+        **common
+    ))
+    twilio_app = twilio_server.create_app(Behavior(latency=args.twilio_latency, **common))
+
+    servers = [
+        uvicorn.Server(uvicorn.Config(openai_app, host=args.host, port=args.openai_port, log_level="warning")),
+        uvicorn.Server(uvicorn.Config(twilio_app, host=args.host, port=args.twilio_port, log_level="warning"))
+    ]
+    print(f"OpenAI stand-in: http://{args.host}:{args.openai_port}/v1")
+    print(f"Twilio stand-in: http://{args.host}:{args.twilio_port}")
+
+    async def serve():
+        await asyncio.gather(*(server.serve() for server in servers))
+
+    asyncio.run(serve())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""Latency, error and rate-limit behaviour shared by the stand-in servers."""
+from typing import Optional, Tuple
+import asyncio
+import math
+import random
+
+
+class LatencyModel:
+    """
+    Random latency drawn from a named distribution.
+
+    Specs:
+        fixed:SECONDS
+        uniform:LOW,HIGH
+        normal:MEAN,STDDEV          (clipped at 0)
+        lognormal:MEDIAN,SIGMA      (heavy right tail, like real APIs)
+    """
+
+    def __init__(self, spec: str = "fixed:0"):
+        """Parse a distribution spec such as 'lognormal:1.2,0.5'."""
+        name, _, args = spec.partition(":")
+        self.name = name
+        self.params = tuple(float(a) for a in args.split(",") if a) if args else ()
+        expected = {"fixed": 1, "uniform": 2, "normal": 2, "lognormal": 2}
+        if name not in expected or len(self.params) != expected[name]:
+            raise ValueError(f"Invalid latency spec '{spec}'")
+        self.spec = spec
+
+    def sample(self, rng: random.Random) -> float:
+        """Draw one latency in seconds."""
+        if self.name == "fixed":
+            return self.params[0]
+        if self.name == "uniform":
+            return rng.uniform(*self.params)
+        if self.name == "normal":
+            return max(0.0, rng.gauss(*self.params))
+        median, sigma = self.params
+        return rng.lognormvariate(math.log(median), sigma) if median > 0 else 0.0
+
+
+class Behavior:
+    """
+    How a stand-in misbehaves: latency, injected errors, hangs and a
+    concurrency limit that answers 429 like a real rate limiter.
+
+    Args:
+        latency: Time before the response (or first token) starts
+        tokens_per_second: Generation speed; 0 means instant
+        error_rate: Share of requests answered with an error status
+        error_statuses: Statuses picked at random for injected errors
+        hang_rate: Share of requests that stall for hang_seconds
+        hang_seconds: How long a stalled request waits before answering
+        max_concurrency: In-flight requests allowed before 429s; 0 disables
+        seed: Seed for reproducible runs
+    """
+
+    def __init__(
+        self,
+        latency: str = "fixed:0",
+        tokens_per_second: float = 0.0,
+        error_rate: float = 0.0,
+        error_statuses: Tuple[int, ...] = (429, 500, 503),
+        hang_rate: float = 0.0,
+        hang_seconds: float = 120.0,
+        max_concurrency: int = 0,
+        seed: Optional[int] = None
+    ):
+        """Initialize the behaviour."""
+        self.latency = LatencyModel(latency)
+        self.tokens_per_second = tokens_per_second
+        self.error_rate = error_rate
+        self.error_statuses = error_statuses
+        self.hang_rate = hang_rate
+        self.hang_seconds = hang_seconds
+        self.max_concurrency = max_concurrency
+        self.rng = random.Random(seed)
+        self.in_flight = 0
+        self.stats = {"requests": 0, "errors": 0, "hangs": 0, "rate_limited": 0}
+
+    def admit(self) -> bool:
+        """Count a request in; False when the concurrency limit is hit."""
+        self.stats["requests"] += 1
+        if self.max_concurrency and self.in_flight >= self.max_concurrency:
+            self.stats["rate_limited"] += 1
+            return False
+        self.in_flight += 1
+        return True
+
+    def release(self) -> None:
+        """Count an admitted request out."""
+        self.in_flight -= 1
+
+    def injected_error(self) -> Optional[int]:
+        """Return an error status to answer with, or None."""
+        if self.rng.random() < self.error_rate:
+            self.stats["errors"] += 1
+            return self.rng.choice(self.error_statuses)
+        return None
+
+    async def wait_first_byte(self) -> None:
+        """Sleep for the sampled latency, or stall if this request hangs."""
+        if self.rng.random() < self.hang_rate:
+            self.stats["hangs"] += 1
+            await asyncio.sleep(self.hang_seconds)
+        await asyncio.sleep(self.latency.sample(self.rng))
+
+    async def wait_tokens(self, tokens: int) -> None:
+        """Sleep for the time it takes to generate a number of tokens."""
+        if self.tokens_per_second > 0 and tokens > 0:
+            await asyncio.sleep(tokens / self.tokens_per_second)
+
+    def describe(self) -> dict:
+        """Return the configuration and counters."""
+        return {
+            "latency": self.latency.spec,
+            "tokens_per_second": self.tokens_per_second,
+            "error_rate": self.error_rate,
+            "error_statuses": list(self.error_statuses),
+            "hang_rate": self.hang_rate,
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self.in_flight,
+            **self.stats
+        }
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token)."""
+    return max(1, len(text) // 4)
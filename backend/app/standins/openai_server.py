@@ -0,0 +1,224 @@
+"""Local stand-in for the OpenAI chat-completions API."""
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from app.standins.behavior import Behavior, estimate_tokens
+from typing import Any, Dict, List, Optional
+import hashlib
+import json
+import re
+import time
+import uuid
+
+# Prompt labels (as written by ai_service prompt builders) -> event field names
+FIELD_LABELS = {
+    "Suspected drug": "suspected_drug",
+    "Dose": "dose",
+    "Frequency": "frequency",
+    "Start date": "start_date",
+    "Stop date": "stop_date",
+    "Adverse effect": "adverse_effect",
+    "Seriousness": "seriousness",
+    "Hospitalization": "hospitalization",
+    "Outcome": "outcome",
+    "Comorbidities": "comorbidities",
+    "Medications": "medications"
+}
+
+REQUIRED_FIELDS = {"suspected_drug", "dose", "start_date", "adverse_effect", "seriousness", "outcome"}
+_EMPTY = {"", "none", "not provided", "unknown", "null"}
+_BATCH_ITEM = re.compile(
+    r"^- key: (?P<key>[^|]+?) \| missing field: (?P<field>[^|]+?) \| "
+    r"suspected drug: (?P<drug>[^|]+?) \| adverse effect: (?P<effect>.+)$",
+    re.MULTILINE
+)
+
+SAFETY_NOTE = "🛡️ This is secure — we never ask for payment or personal financial information."
+
+
+def _event_fields(prompt: str) -> Dict[str, str]:
+    """Read '- Label: value' lines of an event-data prompt."""
+    fields = {}
+    for label, name in FIELD_LABELS.items():
+        match = re.search(rf"^- {re.escape(label)}: (.*)$", prompt, re.MULTILINE)
+        if match:
+            fields[name] = match.group(1).strip()
+    return fields
+
+
+def _missing_fields(fields: Dict[str, str]) -> Dict[str, Any]:
+    missing = [name for name, value in fields.items() if value.casefold() in _EMPTY]
+    return {
+        "required_fields": [f for f in missing if f in REQUIRED_FIELDS],
+        "optional_fields": [f for f in missing if f not in REQUIRED_FIELDS],
+        "risk_reasoning": "Stand-in audit: fields left empty in the report."
+    }
+
+
+def _risk(fields: Dict[str, str]) -> Dict[str, Any]:
+    score = 10
+    score += 30 if fields.get("seriousness") == "serious" else 0
+    score += 20 if fields.get("hospitalization") == "True" else 0
+    score += {"fatal": 45, "not_recovered": 15, "recovering": 5}.get(fields.get("outcome", ""), 0)
+    score = min(score, 100)
+    risk_class = "low" if score <= 25 else "medium" if score <= 50 else "high" if score <= 75 else "critical"
+    return {
+        "score": score,
+        "hospitalization_risk": round(min(0.95, score / 120), 2),
+        "mortality_risk": round(min(0.9, (score / 100) ** 3), 2),
+        "class": risk_class,
+        "reasoning": "Stand-in assessment from seriousness, hospitalization and outcome."
+    }
+
+
+def _question(field: str, drug: str, effect: str) -> str:
+    return f"Quick question about your {drug} report ({effect}): could you tell us the {field.replace('_', ' ')}?\n\n{SAFETY_NOTE}"
+
+
+def canned_reply(prompt: str) -> str:
+    """
+    Build a plausible reply for the prompts AIService sends.
+
+    Structured prompts get valid JSON derived from the prompt itself, so
+    downstream parsing, storage and escalation run exactly as in production.
+    """
+    if "In one pass, audit" in prompt:
+        fields = _event_fields(prompt)
+        return json.dumps({**_missing_fields(fields), **_risk(fields)})
+    if "list missing regulatory-relevant fields" in prompt:
+        return json.dumps(_missing_fields(_event_fields(prompt)))
+    if "assign a severity score" in prompt:
+        return json.dumps(_risk(_event_fields(prompt)))
+    if "per item below" in prompt:
+        return json.dumps({"questions": [
+            {"key": m["key"], "question": _question(m["field"], m["drug"], m["effect"])}
+            for m in _BATCH_ITEM.finditer(prompt)
+        ]})
+    if "Generate a single, 20-second" in prompt:
+        field = re.search(r"^- Missing field: (.*)$", prompt, re.MULTILINE)
+        drug = re.search(r"^- Suspected drug: (.*)$", prompt, re.MULTILINE)
+        effect = re.search(r"^- Adverse effect: (.*)$", prompt, re.MULTILINE)
+        return _question(
+            field.group(1) if field else "details",
+            drug.group(1) if drug else "medication",
+            effect.group(1) if effect else "reaction"
+        )
+    if "ICSR format" in prompt:
+        drug = re.search(r"^Drug: (.*)$", prompt, re.MULTILINE)
+        effect = re.search(r"^Adverse Effect: (.*)$", prompt, re.MULTILINE)
+        outcome = re.search(r"^Outcome: (.*)$", prompt, re.MULTILINE)
+        return (
+            f"A patient treated with {drug.group(1) if drug else 'the suspected drug'} experienced "
+            f"{effect.group(1) if effect else 'an adverse reaction'}. The event was reported to the "
+            f"marketing authorisation holder and assessed for seriousness. The outcome was reported as "
+            f"{outcome.group(1) if outcome else 'unknown'}. No further information was available at the time of reporting."
+        )
+    if "SOURCE (JSON):" in prompt:
+        # Question library translation: hand the source back unchanged
+        source = prompt.split("SOURCE (JSON):", 1)[1].split("\n\nReturn ONLY", 1)[0]
+        return source.strip()
+    return "OK"
+
+
+def _error(status: int) -> JSONResponse:
+    kinds = {429: ("rate_limit_exceeded", "requests"), 500: ("server_error", None), 503: ("server_error", None)}
+    error_type, code = kinds.get(status, ("invalid_request_error", None))
+    return JSONResponse(
+        status_code=status,
+        content={"error": {"message": f"Stand-in injected {status}", "type": error_type, "param": None, "code": code}}
+    )
+
+
+def create_app(behavior: Optional[Behavior] = None) -> FastAPI:
+    """
+    Create the stand-in app.
+
+    Args:
+        behavior: Latency and failure behaviour; defaults to instant and reliable
+
+    Returns:
+        FastAPI app serving /v1/chat/completions
+    """
+    behavior = behavior or Behavior()
+    app = FastAPI(title="OpenAI stand-in")
+
+    @app.get("/v1/models")
+    def list_models():
+        return {"object": "list", "data": [{"id": "gpt-4", "object": "model", "owned_by": "stand-in"}]}
+
+    @app.get("/_standin")
+    def describe():
+        return behavior.describe()
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        messages: List[Dict[str, Any]] = body.get("messages", [])
+        prompt = "\n".join(str(m.get("content", "")) for m in messages)
+        model = body.get("model", "gpt-4")
+
+        if not behavior.admit():
+            return _error(429)
+        try:
+            status = behavior.injected_error()
+            await behavior.wait_first_byte()
+            if status:
+                return _error(status)
+
+            content = canned_reply(prompt)
+            prompt_tokens, completion_tokens = estimate_tokens(prompt), estimate_tokens(content)
+            completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+            created = int(time.time())
+            fingerprint = "fp_" + hashlib.sha1(model.encode()).hexdigest()[:10]
+
+            if body.get("stream"):
+                return StreamingResponse(
+                    _stream(behavior, content, completion_id, created, model, fingerprint),
+                    media_type="text/event-stream"
+                )
+
+            await behavior.wait_tokens(completion_tokens)
+            return {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "system_fingerprint": fingerprint,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop"
+                }],
+                "usage": {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                    "total_tokens": prompt_tokens + completion_tokens
+                }
+            }
+        finally:
+            behavior.release()
+
+    return app
+
+
+async def _stream(behavior: Behavior, content: str, completion_id: str, created: int, model: str, fingerprint: str):
+    """Yield the reply as chat.completion.chunk SSE events, a few characters per token."""
+    def chunk(delta: Dict[str, Any], finish_reason: Optional[str] = None) -> str:
+        payload = {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": created,
+            "model": model,
+            "system_fingerprint": fingerprint,
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]
+        }
+        return f"data: {json.dumps(payload)}\n\n"
+
+    yield chunk({"role": "assistant", "content": ""})
+    for token in re.findall(r"\S+\s*", content):
+        await behavior.wait_tokens(1)
+        yield chunk({"content": token})
+    yield chunk({}, "stop")
+    yield "data: [DONE]\n\n"
+
+
+app = create_app()
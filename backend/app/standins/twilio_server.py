@@ -0,0 +1,111 @@
+"""Local stand-in for the Twilio Messages API (SMS and WhatsApp)."""
+from collections import deque
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from app.standins.behavior import Behavior
+from typing import Optional
+import uuid
+
+# Twilio error codes returned for injected failures
+ERROR_CODES = {429: 20429, 500: 20500, 503: 20503}
+
+MAX_KEPT_MESSAGES = 1000
+
+
+def _error(status: int) -> JSONResponse:
+    return JSONResponse(
+        status_code=status,
+        content={
+            "code": ERROR_CODES.get(status, 21211),
+            "message": f"Stand-in injected {status}",
+            "more_info": "https://www.twilio.com/docs/errors",
+            "status": status
+        }
+    )
+
+
+def create_app(behavior: Optional[Behavior] = None) -> FastAPI:
+    """
+    Create the stand-in app.
+
+    Sent messages are kept in memory (most recent MAX_KEPT_MESSAGES) and can
+    be listed with GET on the same Messages.json resource.
+
+    Args:
+        behavior: Latency and failure behaviour; defaults to instant and reliable
+
+    Returns:
+        FastAPI app serving /2010-04-01/Accounts/{sid}/Messages.json
+    """
+    behavior = behavior or Behavior()
+    messages = deque(maxlen=MAX_KEPT_MESSAGES)
+    app = FastAPI(title="Twilio stand-in")
+
+    @app.get("/_standin")
+    def describe():
+        return {**behavior.describe(), "messages_kept": len(messages)}
+
+    @app.post("/2010-04-01/Accounts/{account_sid}/Messages.json", status_code=201)
+    async def create_message(account_sid: str, request: Request):
+        form = await request.form()
+        if not form.get("To") or not (form.get("From") or form.get("MessagingServiceSid")):
+            return JSONResponse(
+                status_code=400,
+                content={"code": 21604, "message": "A 'To' and 'From' phone number is required.", "status": 400}
+            )
+
+        if not behavior.admit():
+            return _error(429)
+        try:
+            status = behavior.injected_error()
+            await behavior.wait_first_byte()
+            if status:
+                return _error(status)
+
+            sid = "SM" + uuid.uuid4().hex
+            now = format_datetime(datetime.now(timezone.utc), usegmt=True)
+            body = form.get("Body", "")
+            message = {
+                "sid": sid,
+                "account_sid": account_sid,
+                "messaging_service_sid": form.get("MessagingServiceSid"),
+                "to": form.get("To"),
+                "from": form.get("From"),
+                "body": body,
+                "status": "queued",
+                "direction": "outbound-api",
+                "num_segments": str(max(1, -(-len(body) // 153))),
+                "num_media": "0",
+                "price": None,
+                "price_unit": "USD",
+                "error_code": None,
+                "error_message": None,
+                "api_version": "2010-04-01",
+                "date_created": now,
+                "date_updated": now,
+                "date_sent": None,
+                "uri": f"/2010-04-01/Accounts/{account_sid}/Messages/{sid}.json",
+                "subresource_uris": {"media": f"/2010-04-01/Accounts/{account_sid}/Messages/{sid}/Media.json"}
+            }
+            messages.append(message)
+            return message
+        finally:
+            behavior.release()
+
+    @app.get("/2010-04-01/Accounts/{account_sid}/Messages.json")
+    def list_messages(account_sid: str, PageSize: int = 50):
+        page = [m for m in reversed(messages) if m["account_sid"] == account_sid][:PageSize]
+        return {
+            "messages": page,
+            "page": 0,
+            "page_size": PageSize,
+            "uri": f"/2010-04-01/Accounts/{account_sid}/Messages.json",
+            "next_page_uri": None
+        }
+
+    return app
+
+
+app = create_app()
@@ -0,0 +1,106 @@
+"""
+Build the next version of the follow-up question library offline.
+
+Takes the English templates of the latest library as the source, asks the
+model to translate every (language, reporter type) set that is missing (or
+all of them with --all), checks that placeholders survived, and writes
+app/data/followup_questions/v{N+1}.json. The service only ever reads these
+files; nothing is generated at request time.
+
+Usage:
+    python scripts/build_question_library.py [--all] [--languages es fr ...]
+"""
+import argparse
+import json
+import os
+import sys
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings  # noqa: E402
+from app.services.ai_service import AIService, LANGUAGE_NAMES  # noqa: E402
+from app.services.question_library import DEFAULT_LIBRARY_DIR, latest_library_path  # noqa: E402
+
+PLACEHOLDERS = ("{drug}", "{effect}")
+
+
+def build_translation_prompt(source: dict, language: str, reporter_type: str) -> str:
+    """Ask for a translation of one reporter type's templates into a language."""
+    lang_name = LANGUAGE_NAMES[language]
+    audience = "patients, in simple non-medical language" if reporter_type == "patient" else "healthcare professionals"
+    return f"""Translate these pharmacovigilance follow-up question templates for {audience} into {lang_name}.
+
+RULES:
+- Keep the placeholders {{drug}} and {{effect}} exactly as written; they are replaced with the drug and reaction names later
+- Keep each question answerable in 20 seconds, reassuring and non-threatening
+- Also translate the safety note and give {lang_name} words for the generic defaults "medication" and "reaction"
+
+SOURCE (JSON):
+{json.dumps({"templates": source[reporter_type], "safety_note": source["safety_note"][reporter_type], "defaults": source["defaults"]}, ensure_ascii=False, indent=2)}
+
+Return ONLY valid JSON with the same structure:
+{{"templates": {{"field_name": "question"}}, "safety_note": "...", "defaults": {{"drug": "...", "effect": "..."}}}}"""
+
+
+def placeholders_preserved(source: dict, translated: dict) -> bool:
+    """Check that every template kept the placeholders of its English source."""
+    for field_name, template in source.items():
+        target = translated.get(field_name, "")
+        if any((p in template) != (p in target) for p in PLACEHOLDERS):
+            return False
+    return set(source) == set(translated)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--all", action="store_true", help="regenerate languages already in the library")
+    parser.add_argument("--languages", nargs="*", default=[l for l in settings.SUPPORTED_LANGUAGES if l != "en"])
+    args = parser.parse_args()
+
+    current_path = latest_library_path()
+    if not current_path:
+        print(f"No library found in {DEFAULT_LIBRARY_DIR}", file=sys.stderr)
+        return 1
+
+    with open(current_path, encoding="utf-8") as f:
+        library = json.load(f)
+    source = library["languages"]["en"]
+
+    changed = False
+    for language in args.languages:
+        existing = library["languages"].get(language, {})
+        for reporter_type in ("patient", "hcp"):
+            if reporter_type in existing and not args.all:
+                continue
+            content = AIService._complete(
+                build_translation_prompt(source, language, reporter_type), 0.2, 3000,
+                json_output=True, method="build_question_library"
+            )
+            translated = json.loads(content)
+            if not placeholders_preserved(source[reporter_type], translated["templates"]):
+                print(f"Skipping {language}/{reporter_type}: placeholders or fields changed", file=sys.stderr)
+                continue
+            entry = library["languages"].setdefault(language, {"safety_note": {}})
+            entry[reporter_type] = translated["templates"]
+            entry.setdefault("safety_note", {})[reporter_type] = translated["safety_note"]
+            entry["defaults"] = translated["defaults"]
+            changed = True
+            print(f"Translated {language}/{reporter_type}")
+
+    if not changed:
+        print("Library already complete; nothing written")
+        return 0
+
+    library["version"] = library["version"] + 1
+    library["generated_at"] = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+    library["source"] = f"translated from v{library['version'] - 1} English templates with {settings.OPENAI_MODEL}"
+    output_path = os.path.join(DEFAULT_LIBRARY_DIR, f"v{library['version']}.json")
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(library, f, ensure_ascii=False, indent=2)
+    print(f"Wrote {output_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,45 @@
+"""
+Run AI enrichment workers outside the API process.
+
+Workers share the enrichment_jobs queue with any workers started by the API
+(settings.ENRICHMENT_WORKERS), so this scales enrichment independently of
+request handling. Set ENRICHMENT_WORKERS=0 on the API to leave all of it here.
+
+Usage:
+    python scripts/run_enrichment_workers.py [--workers 8]
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings  # noqa: E402
+from app.services.enrichment_service import enrichment_service  # noqa: E402
+
+
+async def run(workers: int) -> None:
+    """Run the pool until interrupted."""
+    enrichment_service.start(workers)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await enrichment_service.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=max(settings.ENRICHMENT_WORKERS, 1))
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    try:
+        asyncio.run(run(args.workers))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
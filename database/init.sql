@@ -4,6 +4,9 @@
 -- Enable UUID extension
 CREATE EXTENSION IF NOT EXISTS "uuid-ossp";
 
+-- Trigram matching for event search
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
 -- Reporters table (patients and healthcare professionals)
 CREATE TABLE reporters (
   id SERIAL PRIMARY KEY,
@@ -42,9 +45,27 @@ CREATE TABLE events (
   comorbidities TEXT,
   medications TEXT, -- Concomitant medications
   
+  -- Normalized terms (from the terminology dictionary at ingest)
+  drug_code VARCHAR(20), -- ATC code of suspected_drug
+  drug_term TEXT,
+  reaction_code VARCHAR(100),
+  reaction_term TEXT,
+  
+  -- Near-duplicate detection
+  duplicate_of INTEGER REFERENCES events(id) ON DELETE SET NULL, -- Original case
+  duplicate_score FLOAT, -- Estimated Jaccard similarity to it
+  duplicate_status VARCHAR(20) CHECK (duplicate_status IN ('suspected', 'not_duplicate')),
+  
+  -- Search (maintained by triggers from the drug, reaction, history and follow-up answers)
+  search_vector TSVECTOR,
+  search_text TEXT,
+  
   -- Follow-up management
   followup_status VARCHAR(20) DEFAULT 'pending' CHECK (followup_status IN ('pending', 'in_progress', 'completed', 'escalated')),
   missing_fields JSONB, -- Array of missing field names
+  enrichment_status VARCHAR(20) CHECK (enrichment_status IN ('pending', 'running', 'completed', 'failed', 'skipped')),
+  completed_at TIMESTAMP, -- When the last missing field was answered
+  regulatory_due_at TIMESTAMP, -- Expedited reporting deadline, set by a trigger (7 / 15 / 90 days)
   
   -- Consent and compliance
   consent BOOLEAN DEFAULT FALSE,
@@ -55,6 +76,9 @@ CREATE TABLE events (
   risk_class VARCHAR(20) CHECK (risk_class IN ('low', 'medium', 'high', 'critical')),
   hospitalization_risk FLOAT,
   mortality_risk FLOAT,
+  risk_reasoning TEXT,
+  risk_input_hash VARCHAR(64), -- Hash of the inputs the stored score was computed from
+  risk_scored_at TIMESTAMP,
   
   -- Metadata
   encrypted_data BYTEA, -- AES-256 encrypted PHI
@@ -103,6 +127,71 @@ CREATE TABLE followup_questions (
   answered_at TIMESTAMP
 );
 
+-- Generated regulatory narratives (one per event)
+CREATE TABLE narratives (
+  id SERIAL PRIMARY KEY,
+  event_id INT NOT NULL UNIQUE REFERENCES events(id) ON DELETE CASCADE,
+  narrative TEXT NOT NULL,
+  model VARCHAR(50),
+  input_hash VARCHAR(64) NOT NULL, -- SHA-256 of the normalized narrative inputs
+  event_updated_at TIMESTAMP, -- Event revision the narrative was generated from
+  generated_at TIMESTAMP DEFAULT NOW()
+);
+
+-- Background AI enrichment queue
+CREATE TABLE enrichment_jobs (
+  id SERIAL PRIMARY KEY,
+  event_id INT NOT NULL REFERENCES events(id) ON DELETE CASCADE,
+  kind VARCHAR(30) NOT NULL DEFAULT 'triage',
+  priority SMALLINT NOT NULL DEFAULT 100, -- Lower runs first
+  status VARCHAR(20) NOT NULL DEFAULT 'queued' CHECK (status IN ('queued', 'running', 'succeeded', 'failed')),
+  attempts INT NOT NULL DEFAULT 0,
+  max_attempts INT NOT NULL DEFAULT 5,
+  run_after TIMESTAMP NOT NULL DEFAULT NOW(),
+  locked_by VARCHAR(100),
+  locked_at TIMESTAMP,
+  last_error TEXT,
+  created_at TIMESTAMP DEFAULT NOW(),
+  finished_at TIMESTAMP
+);
+
+-- Sharded dashboard counters, maintained by the triggers below
+CREATE TABLE metric_counters (
+  name VARCHAR(100) NOT NULL, -- e.g. 'events_total', 'events_risk:high'
+  shard SMALLINT NOT NULL,
+  value BIGINT NOT NULL DEFAULT 0,
+  PRIMARY KEY (name, shard)
+);
+
+-- Reports per normalized (suspected drug, adverse effect) pair, maintained by the triggers below
+CREATE TABLE drug_event_counts (
+  drug TEXT NOT NULL, -- signal_term(COALESCE(drug_term, suspected_drug))
+  reaction TEXT NOT NULL, -- signal_term(COALESCE(reaction_term, adverse_effect))
+  count BIGINT NOT NULL DEFAULT 0,
+  PRIMARY KEY (drug, reaction)
+);
+
+-- Hourly and daily dashboard rollups, refreshed by the rollup job
+CREATE TABLE metric_rollups (
+  granularity VARCHAR(5) NOT NULL CHECK (granularity IN ('hour', 'day')),
+  bucket_start TIMESTAMP NOT NULL, -- UTC
+  events_ingested INT NOT NULL DEFAULT 0,
+  risk_low INT NOT NULL DEFAULT 0,
+  risk_medium INT NOT NULL DEFAULT 0,
+  risk_high INT NOT NULL DEFAULT 0,
+  risk_critical INT NOT NULL DEFAULT 0,
+  risk_unscored INT NOT NULL DEFAULT 0,
+  questions_sent INT NOT NULL DEFAULT 0,
+  questions_answered INT NOT NULL DEFAULT 0,
+  answer_latency_p50 DOUBLE PRECISION, -- Seconds
+  answer_latency_p90 DOUBLE PRECISION,
+  events_completed INT NOT NULL DEFAULT 0,
+  completion_time_p50 DOUBLE PRECISION, -- Seconds
+  completion_time_p90 DOUBLE PRECISION,
+  computed_at TIMESTAMP DEFAULT NOW(),
+  PRIMARY KEY (granularity, bucket_start)
+);
+
 -- Indexes for performance
 CREATE INDEX idx_reporters_phone ON reporters(phone);
 CREATE INDEX idx_reporters_email ON reporters(email);
@@ -111,11 +200,27 @@ CREATE INDEX idx_events_reporter_id ON events(reporter_id);
 CREATE INDEX idx_events_followup_status ON events(followup_status);
 CREATE INDEX idx_events_risk_class ON events(risk_class);
 CREATE INDEX idx_events_created_at ON events(created_at DESC);
+CREATE INDEX idx_events_completed_at ON events(completed_at);
+CREATE INDEX idx_events_drug_code ON events(drug_code);
+CREATE INDEX idx_events_reaction_code ON events(reaction_code);
+CREATE INDEX idx_events_duplicate_of ON events(duplicate_of);
+CREATE INDEX idx_events_search_vector ON events USING GIN (search_vector);
+CREATE INDEX idx_events_search_text_trgm ON events USING GIN (search_text gin_trgm_ops);
+-- Keyset-paginated worklists: highest risk first (unscored last), then oldest; or earliest due date first
+CREATE INDEX idx_events_risk_queue ON events((-COALESCE(risk_score, -1)), created_at, id);
+CREATE INDEX idx_events_status_risk_queue ON events(followup_status, (-COALESCE(risk_score, -1)), created_at, id);
+CREATE INDEX idx_events_due_queue ON events(regulatory_due_at, (-COALESCE(risk_score, -1)), id);
+CREATE INDEX idx_events_status_due_queue ON events(followup_status, regulatory_due_at, (-COALESCE(risk_score, -1)), id);
 CREATE INDEX idx_otp_tokens_expires_at ON otp_tokens(expires_at);
 CREATE INDEX idx_otp_tokens_reporter_id ON otp_tokens(reporter_id);
+CREATE INDEX idx_otp_tokens_phone_or_email ON otp_tokens(phone_or_email, created_at);
 CREATE INDEX idx_audit_logs_event_id ON audit_logs(event_id);
 CREATE INDEX idx_audit_logs_timestamp ON audit_logs(timestamp DESC);
 CREATE INDEX idx_followup_questions_event_id ON followup_questions(event_id);
+CREATE INDEX idx_followup_questions_sent_at ON followup_questions(sent_at);
+CREATE INDEX idx_followup_questions_answered_at ON followup_questions(answered_at);
+CREATE INDEX idx_enrichment_jobs_event_id ON enrichment_jobs(event_id);
+CREATE INDEX idx_enrichment_jobs_claim ON enrichment_jobs(priority, id) WHERE status = 'queued';
 
 -- Trigger to update updated_at timestamp
 CREATE OR REPLACE FUNCTION update_updated_at_column()
@@ -131,3 +236,279 @@ FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
 
 CREATE TRIGGER update_events_updated_at BEFORE UPDATE ON events
 FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
+-- Dashboard counters (kept in sync with app/models/triggers.py)
+CREATE OR REPLACE FUNCTION event_metric_keys(risk_class TEXT, followup_status TEXT, missing_fields JSONB)
+RETURNS TEXT[] AS $$
+    SELECT ARRAY[
+        'events_total',
+        'events_risk:' || COALESCE(risk_class, 'none'),
+        'events_followup:' || COALESCE(followup_status, 'none'),
+        CASE WHEN missing_fields IS NULL OR missing_fields = '[]'::jsonb THEN 'events_complete' ELSE 'events_incomplete' END
+    ]
+$$ LANGUAGE sql IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION question_metric_keys(answered BOOLEAN)
+RETURNS TEXT[] AS $$
+    SELECT CASE WHEN answered THEN ARRAY['questions_total', 'questions_answered'] ELSE ARRAY['questions_total'] END
+$$ LANGUAGE sql IMMUTABLE;
+
+-- Statement-level: one counter upsert per touched key, however many rows changed
+CREATE OR REPLACE FUNCTION events_metric_counters() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO metric_counters (name, shard, value)
+        SELECT key, floor(random() * 16)::smallint, count(*)
+        FROM new_rows, unnest(event_metric_keys(new_rows.risk_class, new_rows.followup_status, new_rows.missing_fields)) AS key
+        GROUP BY key ORDER BY key
+        ON CONFLICT (name, shard) DO UPDATE SET value = metric_counters.value + EXCLUDED.value;
+    ELSIF TG_OP = 'DELETE' THEN
+        INSERT INTO metric_counters (name, shard, value)
+        SELECT key, floor(random() * 16)::smallint, -count(*)
+        FROM old_rows, unnest(event_metric_keys(old_rows.risk_class, old_rows.followup_status, old_rows.missing_fields)) AS key
+        GROUP BY key ORDER BY key
+        ON CONFLICT (name, shard) DO UPDATE SET value = metric_counters.value + EXCLUDED.value;
+    ELSE
+        INSERT INTO metric_counters (name, shard, value)
+        SELECT key, floor(random() * 16)::smallint, sum(delta)
+        FROM (
+            SELECT key, 1 AS delta
+            FROM new_rows, unnest(event_metric_keys(new_rows.risk_class, new_rows.followup_status, new_rows.missing_fields)) AS key
+            UNION ALL
+            SELECT key, -1
+            FROM old_rows, unnest(event_metric_keys(old_rows.risk_class, old_rows.followup_status, old_rows.missing_fields)) AS key
+        ) deltas
+        GROUP BY key HAVING sum(delta) <> 0 ORDER BY key
+        ON CONFLICT (name, shard) DO UPDATE SET value = metric_counters.value + EXCLUDED.value;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION followup_questions_metric_counters() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO metric_counters (name, shard, value)
+        SELECT key, floor(random() * 16)::smallint, count(*)
+        FROM new_rows, unnest(question_metric_keys(new_rows.answered)) AS key
+        GROUP BY key ORDER BY key
+        ON CONFLICT (name, shard) DO UPDATE SET value = metric_counters.value + EXCLUDED.value;
+    ELSIF TG_OP = 'DELETE' THEN
+        INSERT INTO metric_counters (name, shard, value)
+        SELECT key, floor(random() * 16)::smallint, -count(*)
+        FROM old_rows, unnest(question_metric_keys(old_rows.answered)) AS key
+        GROUP BY key ORDER BY key
+        ON CONFLICT (name, shard) DO UPDATE SET value = metric_counters.value + EXCLUDED.value;
+    ELSE
+        INSERT INTO metric_counters (name, shard, value)
+        SELECT key, floor(random() * 16)::smallint, sum(delta)
+        FROM (
+            SELECT key, 1 AS delta FROM new_rows, unnest(question_metric_keys(new_rows.answered)) AS key
+            UNION ALL
+            SELECT key, -1 FROM old_rows, unnest(question_metric_keys(old_rows.answered)) AS key
+        ) deltas
+        GROUP BY key HAVING sum(delta) <> 0 ORDER BY key
+        ON CONFLICT (name, shard) DO UPDATE SET value = metric_counters.value + EXCLUDED.value;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE TRIGGER events_metric_counters_insert AFTER INSERT ON events
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION events_metric_counters();
+
+CREATE OR REPLACE TRIGGER events_metric_counters_update AFTER UPDATE ON events
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION events_metric_counters();
+
+CREATE OR REPLACE TRIGGER events_metric_counters_delete AFTER DELETE ON events
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT EXECUTE FUNCTION events_metric_counters();
+
+CREATE OR REPLACE TRIGGER followup_questions_metric_counters_insert AFTER INSERT ON followup_questions
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION followup_questions_metric_counters();
+
+CREATE OR REPLACE TRIGGER followup_questions_metric_counters_update AFTER UPDATE ON followup_questions
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION followup_questions_metric_counters();
+
+CREATE OR REPLACE TRIGGER followup_questions_metric_counters_delete AFTER DELETE ON followup_questions
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT EXECUTE FUNCTION followup_questions_metric_counters();
+
+-- Rebuild every counter from the source tables in one pass each; writers wait meanwhile
+CREATE OR REPLACE FUNCTION reconcile_metric_counters() RETURNS void AS $$
+BEGIN
+    LOCK TABLE events, followup_questions IN SHARE MODE;
+    DELETE FROM metric_counters;
+    INSERT INTO metric_counters (name, shard, value)
+    SELECT key, 0, count(*)
+    FROM events, unnest(event_metric_keys(events.risk_class, events.followup_status, events.missing_fields)) AS key
+    GROUP BY key
+    UNION ALL
+    SELECT key, 0, count(*)
+    FROM followup_questions, unnest(question_metric_keys(followup_questions.answered)) AS key
+    GROUP BY key;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Backfill when the triggers are first installed on existing data
+SELECT reconcile_metric_counters() WHERE NOT EXISTS (SELECT 1 FROM metric_counters);
+
+-- Drug-event contingency counts for signal detection (kept in sync with app/models/triggers.py)
+-- Case- and whitespace-insensitive term used as the contingency-table key
+CREATE OR REPLACE FUNCTION signal_term(term TEXT) RETURNS TEXT AS $$
+    SELECT NULLIF(lower(regexp_replace(btrim(term), '\s+', ' ', 'g')), '')
+$$ LANGUAGE sql IMMUTABLE;
+
+-- Events flagged as duplicates are left out; flagging or clearing one is an UPDATE delta
+CREATE OR REPLACE FUNCTION events_drug_event_counts() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO drug_event_counts (drug, reaction, count)
+        SELECT drug, reaction, count(*)
+        FROM (SELECT signal_term(COALESCE(drug_term, suspected_drug)) AS drug, signal_term(COALESCE(reaction_term, adverse_effect)) AS reaction FROM new_rows WHERE duplicate_of IS NULL) terms
+        WHERE drug IS NOT NULL AND reaction IS NOT NULL
+        GROUP BY drug, reaction ORDER BY drug, reaction
+        ON CONFLICT (drug, reaction) DO UPDATE SET count = drug_event_counts.count + EXCLUDED.count;
+    ELSIF TG_OP = 'DELETE' THEN
+        INSERT INTO drug_event_counts (drug, reaction, count)
+        SELECT drug, reaction, -count(*)
+        FROM (SELECT signal_term(COALESCE(drug_term, suspected_drug)) AS drug, signal_term(COALESCE(reaction_term, adverse_effect)) AS reaction FROM old_rows WHERE duplicate_of IS NULL) terms
+        WHERE drug IS NOT NULL AND reaction IS NOT NULL
+        GROUP BY drug, reaction ORDER BY drug, reaction
+        ON CONFLICT (drug, reaction) DO UPDATE SET count = drug_event_counts.count + EXCLUDED.count;
+    ELSE
+        INSERT INTO drug_event_counts (drug, reaction, count)
+        SELECT drug, reaction, sum(delta)
+        FROM (
+            SELECT signal_term(COALESCE(drug_term, suspected_drug)) AS drug, signal_term(COALESCE(reaction_term, adverse_effect)) AS reaction, 1 AS delta FROM new_rows WHERE duplicate_of IS NULL
+            UNION ALL
+            SELECT signal_term(COALESCE(drug_term, suspected_drug)), signal_term(COALESCE(reaction_term, adverse_effect)), -1 FROM old_rows WHERE duplicate_of IS NULL
+        ) deltas
+        WHERE drug IS NOT NULL AND reaction IS NOT NULL
+        GROUP BY drug, reaction HAVING sum(delta) <> 0 ORDER BY drug, reaction
+        ON CONFLICT (drug, reaction) DO UPDATE SET count = drug_event_counts.count + EXCLUDED.count;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE TRIGGER events_drug_event_counts_insert AFTER INSERT ON events
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION events_drug_event_counts();
+
+CREATE OR REPLACE TRIGGER events_drug_event_counts_update AFTER UPDATE ON events
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION events_drug_event_counts();
+
+CREATE OR REPLACE TRIGGER events_drug_event_counts_delete AFTER DELETE ON events
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT EXECUTE FUNCTION events_drug_event_counts();
+
+-- Rebuild the contingency counts from events; writers wait meanwhile
+CREATE OR REPLACE FUNCTION reconcile_drug_event_counts() RETURNS void AS $$
+BEGIN
+    LOCK TABLE events IN SHARE MODE;
+    DELETE FROM drug_event_counts;
+    INSERT INTO drug_event_counts (drug, reaction, count)
+    SELECT drug, reaction, count(*)
+    FROM (SELECT signal_term(COALESCE(drug_term, suspected_drug)) AS drug, signal_term(COALESCE(reaction_term, adverse_effect)) AS reaction FROM events WHERE duplicate_of IS NULL) terms
+    WHERE drug IS NOT NULL AND reaction IS NOT NULL
+    GROUP BY drug, reaction;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Backfill when the triggers are first installed on existing data
+SELECT reconcile_drug_event_counts() WHERE NOT EXISTS (SELECT 1 FROM drug_event_counts);
+
+-- Event search documents (kept in sync with app/models/triggers.py)
+-- Follow-up answers of an event, oldest first
+CREATE OR REPLACE FUNCTION event_answers_text(target_event_id INTEGER) RETURNS TEXT AS $$
+    SELECT string_agg(answer_text, ' ' ORDER BY id)
+    FROM followup_questions
+    WHERE event_id = target_event_id AND answer_text IS NOT NULL
+$$ LANGUAGE sql STABLE;
+
+-- Weighted search document: drug and reaction A, history B, follow-up answers C
+CREATE OR REPLACE FUNCTION event_search_vector(e events, answers TEXT) RETURNS tsvector AS $$
+    SELECT setweight(to_tsvector('english', concat_ws(' ', e.suspected_drug, e.drug_term, e.adverse_effect, e.reaction_term)), 'A')
+        || setweight(to_tsvector('english', concat_ws(' ', e.comorbidities, e.medications)), 'B')
+        || setweight(to_tsvector('english', COALESCE(answers, '')), 'C')
+$$ LANGUAGE sql IMMUTABLE;
+
+-- The same text lowercased, for substring and trigram matching
+CREATE OR REPLACE FUNCTION event_search_text(e events, answers TEXT) RETURNS TEXT AS $$
+    SELECT lower(concat_ws(' ', e.suspected_drug, e.drug_term, e.adverse_effect, e.reaction_term, e.comorbidities, e.medications, answers))
+$$ LANGUAGE sql IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION events_search_document() RETURNS TRIGGER AS $$
+DECLARE
+    answers TEXT;
+BEGIN
+    IF TG_OP = 'UPDATE' THEN
+        answers := event_answers_text(NEW.id);
+    END IF;
+    NEW.search_vector := event_search_vector(NEW, answers);
+    NEW.search_text := event_search_text(NEW, answers);
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE TRIGGER events_search_document
+BEFORE INSERT OR UPDATE OF suspected_drug, drug_term, adverse_effect, reaction_term, comorbidities, medications ON events
+FOR EACH ROW EXECUTE FUNCTION events_search_document();
+
+-- An answer changed: rebuild its event's document
+CREATE OR REPLACE FUNCTION followup_questions_search_document() RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE events e
+    SET (search_vector, search_text) = (SELECT event_search_vector(e, a), event_search_text(e, a) FROM event_answers_text(e.id) a)
+    WHERE e.id = COALESCE(NEW.event_id, OLD.event_id);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE TRIGGER followup_questions_search_document_insert AFTER INSERT ON followup_questions
+FOR EACH ROW WHEN (NEW.answer_text IS NOT NULL) EXECUTE FUNCTION followup_questions_search_document();
+
+CREATE OR REPLACE TRIGGER followup_questions_search_document_update AFTER UPDATE OF answer_text ON followup_questions
+FOR EACH ROW WHEN (NEW.answer_text IS DISTINCT FROM OLD.answer_text) EXECUTE FUNCTION followup_questions_search_document();
+
+CREATE OR REPLACE TRIGGER followup_questions_search_document_delete AFTER DELETE ON followup_questions
+FOR EACH ROW WHEN (OLD.answer_text IS NOT NULL) EXECUTE FUNCTION followup_questions_search_document();
+
+-- Backfill events stored before the triggers were installed
+UPDATE events e
+SET (search_vector, search_text) = (SELECT event_search_vector(e, a), event_search_text(e, a) FROM event_answers_text(e.id) a)
+WHERE search_text IS NULL;
+
+-- Regulatory due dates (kept in sync with app/models/triggers.py)
+-- Expedited reporting clocks, counted in calendar days from receipt: 7 for
+-- fatal cases, 15 for serious ones, 90 otherwise. Cases the risk model rates
+-- critical or high are held to the 7- or 15-day clock until assessed.
+CREATE OR REPLACE FUNCTION event_regulatory_clock(e events) RETURNS INTERVAL AS $$
+    SELECT CASE
+        WHEN e.outcome = 'fatal' OR e.risk_class = 'critical' THEN INTERVAL '7 days'
+        WHEN e.seriousness = 'serious' OR e.hospitalization OR e.risk_class = 'high' THEN INTERVAL '15 days'
+        ELSE INTERVAL '90 days'
+    END
+$$ LANGUAGE sql IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION events_regulatory_due_at() RETURNS TRIGGER AS $$
+BEGIN
+    NEW.regulatory_due_at := NEW.created_at + event_regulatory_clock(NEW);
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE TRIGGER events_regulatory_due_at
+BEFORE INSERT OR UPDATE OF created_at, seriousness, hospitalization, outcome, risk_class ON events
+FOR EACH ROW EXECUTE FUNCTION events_regulatory_due_at();
+
+-- Backfill events stored before the trigger was installed
+UPDATE events e
+SET regulatory_due_at = e.created_at + event_regulatory_clock(e)
+WHERE regulatory_due_at IS NULL;
@@ -1,7 +1,7 @@
 import React, { useState } from 'react';
 import OTPModal from '../components/OTPModal';
 import RiskDashboard from '../components/RiskDashboard';
-import { createReporter, initializeReport, sendOTP, verifyOTP, sendFollowupQuestion } from '../services/api';
+import { createReporter, initializeReport, getEvent, getEnrichmentStatus, sendOTP, verifyOTP, sendFollowupQuestion } from '../services/api';
 
 const DemoPage = () => {
     const [step, setStep] = useState(1);
@@ -59,6 +59,17 @@ const DemoPage = () => {
 
             setEvent(eventRes.data);
             setStep(2);
+
+            // Risk and missing fields are filled in by the background enrichment workers
+            for (let attempt = 0; attempt < 30; attempt++) {
+                await new Promise((resolve) => setTimeout(resolve, 1000));
+                const statusRes = await getEnrichmentStatus(eventRes.data.id);
+                if (['completed', 'failed'].includes(statusRes.data.enrichment_status)) {
+                    const enrichedRes = await getEvent(eventRes.data.id);
+                    setEvent(enrichedRes.data);
+                    break;
+                }
+            }
         } catch (error) {
             throw error;
         }
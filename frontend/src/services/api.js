@@ -32,6 +32,18 @@ export const getEvent = (eventId) => {
     return api.get(`/report/event/${eventId}`);
 };
 
+export const getEnrichmentStatus = (eventId) => {
+    return api.get(`/report/event/${eventId}/enrichment`);
+};
+
+export const getDuplicateCandidates = (eventId, minSimilarity = 0.5) => {
+    return api.get(`/report/event/${eventId}/duplicates`, { params: { min_similarity: minSimilarity } });
+};
+
+export const markNotDuplicate = (eventId) => {
+    return api.post(`/report/event/${eventId}/not-duplicate`);
+};
+
 export const detectMissingFields = (eventId) => {
     return api.post(`/report/missing-fields/${eventId}`);
 };
@@ -58,7 +70,36 @@ export const getRiskScore = (eventId) => {
     return api.get(`/risk/score/${eventId}`);
 };
 
+export const recalculateRiskScore = (eventId) => {
+    return api.post(`/risk/score/${eventId}`);
+};
+
 // Dashboard Services
 export const getDashboardMetrics = () => {
     return api.get('/dashboard/metrics');
 };
+
+export const getDashboardTrends = (granularity = 'day', params = {}) => {
+    return api.get('/dashboard/trends', { params: { granularity, ...params } });
+};
+
+// Signal Detection Services
+export const getSignals = (params = {}) => {
+    return api.get('/signals', { params });
+};
+
+export const normalizeTerms = (drugs = [], adverseEffects = []) => {
+    return api.post('/terminology/normalize', { drugs, adverse_effects: adverseEffects });
+};
+
+export const searchEvents = (q, params = {}) => {
+    return api.get('/search/events', { params: { q, ...params } });
+};
+
+export const listEvents = (params = {}) => {
+    return api.get('/events', { params });
+};
+
+export const getEscalationWorklist = (params = {}) => {
+    return api.get('/events/escalations', { params });
+};